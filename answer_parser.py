@@ -0,0 +1,215 @@
+"""
+Answer Parser
+=============
+Turns a transcribed spoken answer into option letters, so check_answer and the
+mock exam grade what the student said without the LLM rewriting it first.
+
+Speech-to-text rarely produces a clean "B". Students say "bee", "I think it's
+C", "the second one", "worm", or "bee, see and a" for a three-question quiz.
+Each answer segment goes through these rules, first match wins:
+
+1. the whole answer is one letter, homophone or NATO word ("bee", "charlie")
+2. a letter after a cue word ("it's C", "I'll go with D", "option be")
+3. exactly one unambiguous letter anywhere ("B, because it spreads itself")
+4. the option text, matched word by word with a phonetic key so "fishing"
+   finds Phishing rather than Vishing and "root kit" finds Rootkit
+5. an ordinal ("two", "the second one", "number three", "the last one"); after
+   the option text, so an option read out as "activates on January 1st" is
+   not taken for the first option
+6. the option text again, by closest spelling for misheard words ("worn"
+   finds Worm)
+
+"a", "be" and "see" are ordinary words too, so they only count as letters in
+rules 1 and 2. A multi-question answer is split on commas, "and" and "then",
+or read as a run of letters ("bee see a").
+
+Patterns are compiled at import and each question's option words once per
+question, so grading an answer takes microseconds (see
+benchmarks/answer_parsing.py and its corpus of transcribed answers).
+"""
+
+import difflib
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Spoken forms of each letter; WEAK_FORMS are also common English words
+LETTER_FORMS = {
+    "A": ("a", "ay", "alpha"),
+    "B": ("b", "bee", "be", "bravo"),
+    "C": ("c", "see", "sea", "cee", "charlie"),
+    "D": ("d", "dee", "delta"),
+    "E": ("e", "echo"),
+}
+WEAK_FORMS = {"a", "be", "see"}
+ORDINALS = {
+    "first": 0, "1st": 0, "one": 0, "1": 0,
+    "second": 1, "2nd": 1, "two": 1, "2": 1,
+    "third": 2, "3rd": 2, "three": 2, "3": 2,
+    "fourth": 3, "4th": 3, "four": 3, "4": 3,
+    "fifth": 4, "5th": 4, "five": 4, "5": 4,
+    "last": -1,
+}
+# Words that carry no answer ("I think it's", "um", "my answer is")
+FILLERS = {
+    "i", "im", "id", "ill", "think", "its", "it", "is", "the", "answer", "my", "final", "option",
+    "letter", "choice", "um", "uh", "hmm", "er", "okay", "ok", "so", "well", "maybe", "probably",
+    "guess", "go", "with", "pick", "choose", "say", "would", "going", "to", "thats", "that",
+    "sure", "pretty", "definitely", "please", "oh", "like", "gonna",
+}
+# Option words too common to identify an option
+STOPWORDS = {"a", "an", "the", "of", "to", "and", "or", "in", "on", "for", "with", "by", "is", "data"}
+# Least similarity for a misheard word to count as an option word
+FUZZY_CUTOFF = 0.75
+
+_LETTER_OF = {form: letter for letter, forms in LETTER_FORMS.items() for form in forms}
+_STRONG_OF = {form: letter for form, letter in _LETTER_OF.items() if form not in WEAK_FORMS}
+_FORMS = "|".join(sorted(_LETTER_OF, key=len, reverse=True))
+_CUED = re.compile(
+    rf"\b(?:is|its|with|pick|choose|say|option|answer|letter|choice|guess)\s+(?:letter\s+|option\s+)?({_FORMS})"
+    rf"(?:\s+(?:please|i\s+think|final\s+answer|for\s+sure))?$"
+)
+_ORDINAL = re.compile(
+    r"\b(?:the\s+)?(first|second|third|fourth|fifth|last|1st|2nd|3rd|4th|5th)\b(?:\s+(?:one|option|answer|choice))?"
+    r"|\b(?:number|option|answer|choice)\s+(one|two|three|four|five|[1-5])\b"
+)
+_SPLIT = re.compile(r"\s*(?:,|;|\band then\b|\bthen\b|\band\b)\s*")
+_NON_WORD = re.compile(r"[^a-z0-9,;\s]+")
+_OPTION_PREFIX = re.compile(r"^([A-Z])\)\s*")
+_PHONETIC = ((re.compile(r"ph"), "f"), (re.compile(r"ck"), "k"), (re.compile(r"ks"), "x"), (re.compile(r"(.)\1"), r"\1"))
+
+
+def phonetic(word: str) -> str:
+    """A rough sound-alike key: "phishing" and "fishing" share one."""
+    for pattern, repl in _PHONETIC:
+        word = pattern.sub(repl, word)
+    return word
+
+
+def normalize(text: str) -> str:
+    """Lowercase, apostrophes dropped ("it's" -> "its"), punctuation other than , and ; removed."""
+    return " ".join(_NON_WORD.sub(" ", text.lower().replace("'", "").replace("’", "")).split())
+
+
+class CompiledQuestion(NamedTuple):
+    letters: Tuple[str, ...]
+    # Phonetic keys of each option's identifying words
+    words: Tuple[frozenset, ...]
+
+
+_compiled: Dict[str, CompiledQuestion] = {}
+
+
+def compile_question(question: dict) -> CompiledQuestion:
+    """Letters and option words of a question, built once per question ID."""
+    key = question.get("id") or "\n".join(question["options"])
+    compiled = _compiled.get(key)
+    if compiled is None:
+        letters, words = [], []
+        for i, option in enumerate(question["options"]):
+            match = _OPTION_PREFIX.match(option)
+            letters.append(match.group(1) if match else chr(ord("A") + i))
+            text = normalize(option[match.end():] if match else option).replace(",", " ").replace(";", " ")
+            words.append(frozenset(phonetic(w) for w in text.split() if w not in STOPWORDS))
+        compiled = _compiled[key] = CompiledQuestion(tuple(letters), tuple(words))
+    return compiled
+
+
+def parse_answer(text: str, question: dict) -> Optional[str]:
+    """The option letter a spoken answer picks for one question, or None if it is unclear."""
+    return _parse(normalize(text).replace(",", " ").replace(";", " "), compile_question(question))
+
+
+def parse_answers(text: str, questions: Sequence[dict]) -> List[Optional[str]]:
+    """Option letters for each question of a quiz from one spoken answer (None where unclear)."""
+    if len(questions) == 1:
+        return [parse_answer(text, questions[0])]
+    text = normalize(text)
+    segments = [s for s in _SPLIT.split(text) if s]
+    if len(segments) != len(questions):
+        # "bee see a": a run of letters and nothing else
+        words = [w for w in text.replace(",", " ").replace(";", " ").split() if w not in FILLERS]
+        if len(words) == len(questions) and all(w in _LETTER_OF for w in words):
+            segments = words
+        else:
+            return [None] * len(questions)
+    return [_parse(segment, compile_question(q)) for segment, q in zip(segments, questions)]
+
+
+def _letter(letter: str, compiled: CompiledQuestion) -> Optional[str]:
+    return letter if letter in compiled.letters else None
+
+
+def _ordinal(index: int, compiled: CompiledQuestion) -> Optional[str]:
+    return compiled.letters[index] if index < len(compiled.letters) else None
+
+
+def _parse(text: str, compiled: CompiledQuestion) -> Optional[str]:
+    words = text.split()
+    if not words:
+        return None
+    content = [w for w in words if w not in FILLERS]
+    # 1. Just a letter ("bee")
+    if len(content) == 1 and content[0] in _LETTER_OF:
+        return _letter(_LETTER_OF[content[0]], compiled)
+    # 2. A letter right after a cue, at the end ("I think it's a")
+    match = _CUED.search(text)
+    if match:
+        return _letter(_LETTER_OF[match.group(1)], compiled)
+    # 3. One unambiguous letter anywhere
+    strong = {_STRONG_OF[w] for w in words if w in _STRONG_OF}
+    if len(strong) == 1:
+        return _letter(strong.pop(), compiled)
+    # 4. The option text; word pairs are joined too, as "root kit" is often one option word
+    spoken = [w for w in content if w not in STOPWORDS]
+    spoken = [phonetic(w) for w in spoken + [a + b for a, b in zip(spoken, spoken[1:])]]
+    # Share of the option's words that were said, then how many (a longer option read in full beats a shorter one)
+    scores = [(len(words.intersection(spoken)) / len(words), len(words)) if words else (0.0, 0) for words in compiled.words]
+    if any(score for score, _ in scores):
+        return _best(scores, compiled)
+    # 5. An ordinal, or a bare number
+    if len(content) == 1 and content[0] in ORDINALS:
+        return _ordinal(ORDINALS[content[0]], compiled)
+    match = _ORDINAL.search(text)
+    if match:
+        return _ordinal(ORDINALS[match.group(1) or match.group(2)], compiled)
+    # 6. Misheard words: credit each option by its closest spelling
+    scores = [
+        (max((difflib.SequenceMatcher(None, s, w).ratio() for s in spoken for w in words), default=0.0), 0)
+        for words in compiled.words
+    ]
+    return _best([(score, 0) if score >= FUZZY_CUTOFF else (0.0, 0) for score, _ in scores], compiled)
+
+
+def _best(scores: List[Tuple[float, int]], compiled: CompiledQuestion) -> Optional[str]:
+    best = max(scores)
+    if best[0] == 0.0 or scores.count(best) > 1:
+        return None
+    return compiled.letters[scores.index(best)]
+
+
+_SKIP = re.compile(r"\b(?:skip|pass|next question|dont know|no idea)\b")
+_DONE = re.compile(r"\b(?:done|finish|finished|stop the exam|end the exam|grade it)\b")
+
+
+def exam_command(text: str, question: Optional[dict] = None) -> Optional[str]:
+    """"skip" or "done" when a mock exam answer is one of those instead of a letter.
+
+    With the current ``question``, an answer that also picks an option ("I don't
+    know, maybe B") is that option rather than a command.
+    """
+    if question is not None and parse_answer(text, question) is not None:
+        return None
+    text = normalize(text)
+    if _DONE.search(text):
+        return "done"
+    if _SKIP.search(text):
+        return "skip"
+    return None
+
+
+_QUESTION = re.compile(r"^(?:what|whats|how|why|when|where|who|which|can|could|would|does|do|repeat|explain|tell me|wait)\b")
+
+
+def asks_question(text: str) -> bool:
+    """True for an utterance that is a question to the tutor ("what does trojan mean?"), not an answer."""
+    return bool(_QUESTION.search(normalize(text)))
@@ -0,0 +1,112 @@
+"""
+Audio Clips
+===========
+Preallocated PCM frames for sounds that never need a TTS request: silence for
+pauses ([break:2s], section markers) and short earcons for quiz feedback and
+lesson checkpoints.
+
+Every clip is cut into fixed FRAME_MS frames once, when the library for a
+sample rate is first built. Playing a pause of any length yields the same
+silent frame object over and over, and playing an earcon yields the same
+prebuilt frames each time, so nothing is allocated or synthesized per pause.
+
+Frames are built by a ``make_frame(pcm, samples_per_channel)`` factory, so the
+agent gets ``rtc.AudioFrame`` objects while this module stays free of LiveKit.
+"""
+
+import math
+import threading
+from array import array
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+FRAME_MS = 20
+
+# Earcons as (frequency Hz, duration ms) notes; 0 Hz is a rest
+EARCONS: Dict[str, List[Tuple[float, int]]] = {
+    "correct": [(659.3, 90), (0, 20), (987.8, 160)],
+    "incorrect": [(392.0, 120), (0, 20), (311.1, 200)],
+    "checkpoint": [(784.0, 140)],
+}
+# Peak amplitude as a fraction of full scale; earcons sit well under speech level
+EARCON_VOLUME = 0.2
+
+
+def _tone(sample_rate: int, notes: List[Tuple[float, int]], volume: float) -> array:
+    """Mono 16-bit PCM for a sequence of notes, each with a short attack and a decaying tail."""
+    pcm = array("h")
+    peak = volume * 32767
+    attack = int(sample_rate * 0.005)
+    for frequency, ms in notes:
+        count = int(sample_rate * ms / 1000)
+        if not frequency:
+            pcm.extend([0] * count)
+            continue
+        step = 2 * math.pi * frequency / sample_rate
+        for i in range(count):
+            envelope = min(1.0, i / attack) if attack else 1.0
+            envelope *= math.exp(-3.0 * i / count)
+            pcm.append(int(peak * envelope * math.sin(step * i)))
+    return pcm
+
+
+class ClipLibrary:
+    """Prebuilt silence and earcon frames for one output format.
+
+    Args:
+        sample_rate: Output sample rate in Hz
+        num_channels: Output channel count
+        make_frame: Builds a frame from 16-bit interleaved PCM bytes and its samples per channel
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        num_channels: int = 1,
+        make_frame: Optional[Callable[[bytes, int], object]] = None,
+    ):
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.samples_per_frame = sample_rate * FRAME_MS // 1000
+        self._make_frame = make_frame or (lambda pcm, samples: pcm)
+
+        self._silence = self._make_frame(bytes(self.samples_per_frame * num_channels * 2), self.samples_per_frame)
+        self._earcons = {name: self._frames(_tone(sample_rate, notes, EARCON_VOLUME)) for name, notes in EARCONS.items()}
+
+    def _frames(self, mono: array) -> List[object]:
+        # Pad to whole frames, then interleave channels and cut once
+        mono.extend([0] * (-len(mono) % self.samples_per_frame))
+        if self.num_channels > 1:
+            mono = array("h", (sample for sample in mono for _ in range(self.num_channels)))
+        data = mono.tobytes()
+        frame_bytes = self.samples_per_frame * self.num_channels * 2
+        return [
+            self._make_frame(data[i:i + frame_bytes], self.samples_per_frame)
+            for i in range(0, len(data), frame_bytes)
+        ]
+
+    def silence(self, seconds: float) -> Iterator[object]:
+        """Silence rounded to whole frames; every item is the same preallocated frame."""
+        for _ in range(round(seconds * 1000 / FRAME_MS)):
+            yield self._silence
+
+    def earcon(self, name: str) -> List[object]:
+        """Prebuilt frames for an earcon ("correct", "incorrect", "checkpoint")."""
+        return self._earcons[name]
+
+
+_libraries: Dict[Tuple[int, int], ClipLibrary] = {}
+_libraries_lock = threading.Lock()
+
+
+def clip_library(
+    sample_rate: int,
+    num_channels: int = 1,
+    make_frame: Optional[Callable[[bytes, int], object]] = None,
+) -> ClipLibrary:
+    """Process-wide library for an output format, built on first use (with the first caller's make_frame)."""
+    key = (sample_rate, num_channels)
+    with _libraries_lock:
+        library = _libraries.get(key)
+        if library is None:
+            library = _libraries[key] = ClipLibrary(sample_rate, num_channels, make_frame)
+    return library
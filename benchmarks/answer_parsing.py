@@ -0,0 +1,112 @@
+"""
+Answer Parsing Benchmark
+========================
+Accuracy and grading time of answer_parser over spoken_answers.jsonl, a corpus
+of transcribed answers (letters, homophones, ordinals, option text, misheard
+words, multi-question answers, and non-answers that must not be graded),
+against the old comma-split comparison check_answer used to do.
+
+Each corpus line has the transcript, the options of each question in the
+quiz, and the expected letter per question (null where the answer is unclear
+and the student should be asked again). A wrong letter is worse than None: it
+grades the student on something they did not say.
+
+It also reads every option of every bank question out word for word, which
+must always grade as that option (option text can hold ordinals and letters,
+e.g. "Virus that activates on January 1st").
+
+    python benchmarks/answer_parsing.py
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from answer_parser import parse_answer, parse_answers  # noqa: E402
+from kb_snapshot import load_content  # noqa: E402
+
+CORPUS = os.path.join(HERE, "spoken_answers.jsonl")
+REPEATS = 200
+
+
+def load_corpus(path: str = CORPUS) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def quiz(entry: dict) -> list:
+    return [{"options": options} for options in entry["options"]]
+
+
+def split_compare(transcript: str, questions: list) -> list:
+    """check_answer before the parser: a comma split, upper-cased, taken as letters."""
+    answers = [a.strip().upper() for a in transcript.split(",")]
+    if len(answers) != len(questions):
+        return [None] * len(questions)
+    return [a if a in ("A", "B", "C", "D") else None for a in answers]
+
+
+def score(parse, corpus: list) -> tuple:
+    right = unclear = wrong = 0
+    for entry in corpus:
+        for got, expected in zip(parse(entry["transcript"], quiz(entry)), entry["expected"]):
+            if got == expected:
+                right += 1
+            elif got is None:
+                unclear += 1
+            else:
+                wrong += 1
+    return right, unclear, wrong
+
+
+def verbatim_misses(questions: list) -> list:
+    """Options of bank questions that, read out in full, do not grade as themselves."""
+    misses = []
+    for q in questions:
+        for option in q["options"]:
+            letter, _, text = option.partition(") ")
+            if parse_answer(text, q) != letter:
+                misses.append((q["id"], option))
+    return misses
+
+
+def timings(corpus: list) -> list:
+    """Microseconds per transcript, best of REPEATS (question compilation is cached after the first)."""
+    samples = []
+    for n, entry in enumerate(corpus):
+        questions = [{"id": f"{n}:{j}", **q} for j, q in enumerate(quiz(entry))]
+        best = float("inf")
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            parse_answers(entry["transcript"], questions)
+            best = min(best, time.perf_counter() - start)
+        samples.append(best * 1e6)
+    return sorted(samples)
+
+
+def main() -> None:
+    corpus = load_corpus()
+    total = sum(len(entry["expected"]) for entry in corpus)
+    print(f"{len(corpus)} transcripts, {total} answers")
+    print(f"{'':<14}{'right':>7}{'unclear':>9}{'wrong':>7}")
+    for label, parse in (("split compare", split_compare), ("answer_parser", parse_answers)):
+        right, unclear, wrong = score(parse, corpus)
+        print(f"{label:<14}{right:>7}{unclear:>9}{wrong:>7}")
+    questions = load_content().questions
+    misses = verbatim_misses(questions)
+    print(f"verbatim options: {sum(len(q['options']) for q in questions) - len(misses)} of "
+          f"{sum(len(q['options']) for q in questions)} grade as themselves")
+    for qid, option in misses:
+        print(f"  {qid}: {option}")
+    micros = timings(corpus)
+    p95 = micros[min(len(micros) - 1, int(len(micros) * 0.95))]
+    print(f"grading time: p50 {statistics.median(micros):.1f}us, p95 {p95:.1f}us, max {micros[-1]:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
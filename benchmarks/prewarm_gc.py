@@ -0,0 +1,53 @@
+"""
+Prewarm GC Benchmark
+====================
+Full-collection pause in a job process after prewarm_indexes(), with and
+without the gc.freeze() prewarm does. Each mode runs in a fresh interpreter
+that prewarms the same way the worker does, allocates a session's worth of
+objects, then times gc.collect() (best of REPEATS).
+
+    python benchmarks/prewarm_gc.py
+"""
+
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+REPEATS = 20
+
+CHILD = """
+import gc, sys, time
+import prewarm
+if sys.argv[1] == "off":
+    prewarm.freeze_heap = gc.collect
+prewarm.prewarm_indexes()
+session = [{"turn": i, "text": "x" * 40, "tags": [i]} for i in range(2000)]
+best = float("inf")
+for _ in range(%d):
+    start = time.perf_counter()
+    gc.collect()
+    best = min(best, time.perf_counter() - start)
+print(gc.get_freeze_count(), len(gc.get_objects()), best * 1000)
+""" % REPEATS
+
+
+def measure(mode: str) -> tuple:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, mode], capture_output=True, text=True, check=True,
+        cwd=os.path.join(HERE, ".."),
+    ).stdout.split()
+    return int(out[0]), int(out[1]), float(out[2])
+
+
+def main() -> None:
+    print(f"{'gc.freeze':<10}{'frozen':>9}{'walked':>9}{'full gc':>10}")
+    for mode in ("off", "on"):
+        frozen, tracked, millis = measure(mode)
+        print(f"{mode:<10}{frozen:>9}{tracked:>9}{millis:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+TTS First-Audio Benchmark
+=========================
+Time to first audio and mid-speech stalls over every lesson and explanation
+in the knowledge base, spoken three ways: as one TTS request, sentence by
+sentence, and with tts_chunker's progressive chunks plus pipelining.
+
+The TTS is simulated with a non-streaming provider's latency profile (the
+whole input is synthesized before any audio comes back: a fixed request
+overhead plus a per-character cost), and playback takes audio through a
+PLAYBACK_BUFFER-deep output in real time. Everything runs on a virtual clock
+that jumps to the next timer whenever the loop is idle, so the results are
+exact and the run takes about a second.
+
+    python benchmarks/tts_first_audio.py
+"""
+
+import asyncio
+import heapq
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from kb_snapshot import load_content  # noqa: E402
+from lesson_playback import sentence_stream, split_sentences  # noqa: E402
+from render_cache import RenderCache  # noqa: E402
+from tts_chunker import chunk_stream, pipeline  # noqa: E402
+from voice_cues import Speech, parse_cues  # noqa: E402
+
+# Simulated provider: seconds before audio for a request of n characters
+REQUEST_OVERHEAD = 0.35
+SECONDS_PER_CHAR = 0.004
+# Spoken audio per character of text, and playback frame size
+AUDIO_PER_CHAR = 1 / 15
+FRAME_SECONDS = 0.2
+# Audio the output accepts ahead of what is playing (LiveKit's AudioSource queue)
+PLAYBACK_BUFFER = 1.0
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock skips straight to the next timer instead of sleeping."""
+
+    def __init__(self):
+        super().__init__()
+        self._now = 0.0
+
+    def time(self) -> float:
+        return self._now
+
+    def _run_once(self):
+        while self._scheduled and self._scheduled[0]._cancelled:
+            heapq.heappop(self._scheduled)._scheduled = False
+        if not self._ready and self._scheduled:
+            self._now = max(self._now, self._scheduled[0]._when)
+        super()._run_once()
+
+
+async def fake_tts(text: str):
+    """Audio frames (their durations) for ``text`` once the whole request is synthesized."""
+    await asyncio.sleep(REQUEST_OVERHEAD + SECONDS_PER_CHAR * len(text))
+    remaining = AUDIO_PER_CHAR * len(text)
+    while remaining > 0:
+        yield min(FRAME_SECONDS, remaining)
+        remaining -= FRAME_SECONDS
+
+
+async def whole_block(text: str):
+    """The response as one TTS request."""
+    async for frame in fake_tts(text):
+        yield frame
+
+
+async def sequential(text: str):
+    """Each sentence synthesized once the previous one has been handed to playback."""
+    for sentence in split_sentences(text):
+        async for frame in fake_tts(sentence):
+            yield frame
+
+
+async def chunked(text: str):
+    """Progressive chunks, the next chunk synthesized during playback (tts_chunker)."""
+    async for frame in pipeline(chunk_stream(sentence_stream([text])), fake_tts):
+        yield frame
+
+
+async def play(frames):
+    """Play frames through the output; returns (time to first audio, total stall) in seconds."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    first = None
+    stalled = 0.0
+    played_until = 0.0
+    async for seconds in frames:
+        arrived = loop.time() - start
+        if first is None:
+            first = played_until = arrived
+        elif arrived > played_until:
+            stalled += arrived - played_until
+            played_until = arrived
+        played_until += seconds
+        # Like an audio source with a full queue, stop pulling frames until there is room
+        ahead = played_until - (loop.time() - start)
+        if ahead > PLAYBACK_BUFFER:
+            await asyncio.sleep(ahead - PLAYBACK_BUFFER)
+    return first, stalled
+
+
+async def play_all(source, samples):
+    return await asyncio.gather(*(play(source(text)) for text in samples))
+
+
+def run(source, samples):
+    loop = VirtualClockLoop()
+    try:
+        return loop.run_until_complete(play_all(source, samples))
+    finally:
+        loop.close()
+
+
+def texts(content):
+    """What teach_lesson, explain_topic and deliver_scripted_lesson would have spoken, per topic."""
+    cache = RenderCache(content)
+    for domain_id, domain in content.domains.items():
+        for key, topic in domain["topics"].items():
+            yield cache.render("lesson", domain_id, key)
+            yield cache.render("explanation", domain_id, key)
+            if topic.get("scripted_lesson"):
+                yield "".join(s.text for s in parse_cues(topic["scripted_lesson"]) if isinstance(s, Speech))
+
+
+def main() -> None:
+    samples = list(texts(load_content()))
+    print(f"{len(samples)} lessons and explanations, {sum(len(text) for text in samples)} chars")
+    print(f"{'':<12}{'first audio p50':>16}{'p95':>8}{'stalls total':>14}")
+    for label, source in (("whole block", whole_block), ("sentences", sequential), ("chunked", chunked)):
+        results = run(source, samples)
+        firsts = sorted(r[0] for r in results)
+        p95 = firsts[min(len(firsts) - 1, int(len(firsts) * 0.95))]
+        stalled = sum(r[1] for r in results)
+        print(f"{label:<12}{statistics.median(firsts):>15.2f}s{p95:>7.2f}s{stalled:>13.1f}s")
+
+
+if __name__ == "__main__":
+    main()
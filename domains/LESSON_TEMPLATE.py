@@ -17,6 +17,8 @@ Voice Cues Reference:
 - [recap] - Signal summary section
 - [emph] and [/emph] - Emphasize text
 - [slow] and [/slow] - Speak slowly for definitions
+
+Cues are executed on the way to TTS (see voice_cues.py) and never read aloud.
 """
 
 LESSON_METADATA = {
@@ -2,22 +2,65 @@
 Security+ Domains Package
 =========================
 Organized knowledge base and lessons by CompTIA Security+ exam domains.
+
+ALL_DOMAINS is a lazy mapping: a domain's knowledge module is imported the first
+time that domain is accessed. Domain names, weights and topic keys are available
+from DOMAIN_MANIFEST without importing any knowledge module.
 """
 
-from .domain_1.knowledge import DOMAIN_1_KNOWLEDGE
-from .domain_2.knowledge import DOMAIN_2_KNOWLEDGE
-from .domain_3.knowledge import DOMAIN_3_KNOWLEDGE
-from .domain_4.knowledge import DOMAIN_4_KNOWLEDGE
-from .domain_5.knowledge import DOMAIN_5_KNOWLEDGE
+import importlib
+from collections.abc import Mapping
+
+from .manifest import DOMAIN_MANIFEST
+
+
+class LazyDomains(Mapping):
+    """Read-only mapping of domain id to knowledge, importing each domain on first access.
+
+    Membership, iteration and len() come from the manifest and never import anything.
+    """
+
+    def __init__(self, manifest: dict):
+        self._manifest = manifest
+        self._loaded = {}
+
+    def __getitem__(self, domain_id: str) -> dict:
+        knowledge = self._loaded.get(domain_id)
+        if knowledge is None:
+            entry = self._manifest[domain_id]
+            knowledge = getattr(importlib.import_module(entry["module"]), entry["attr"])
+            self._loaded[domain_id] = knowledge
+        return knowledge
+
+    def __contains__(self, domain_id) -> bool:
+        return domain_id in self._manifest
+
+    def __iter__(self):
+        return iter(self._manifest)
+
+    def __len__(self) -> int:
+        return len(self._manifest)
+
+    def loaded(self) -> list:
+        """Domain ids whose knowledge module has been imported so far."""
+        return list(self._loaded)
+
+    def __repr__(self) -> str:
+        return f"LazyDomains({list(self._manifest)}, loaded={self.loaded()})"
+
 
 # Consolidated knowledge base for easy access
-ALL_DOMAINS = {
-    "domain_1": DOMAIN_1_KNOWLEDGE,
-    "domain_2": DOMAIN_2_KNOWLEDGE,
-    "domain_3": DOMAIN_3_KNOWLEDGE,
-    "domain_4": DOMAIN_4_KNOWLEDGE,
-    "domain_5": DOMAIN_5_KNOWLEDGE,
-}
+ALL_DOMAINS = LazyDomains(DOMAIN_MANIFEST)
+
+_KNOWLEDGE_NAMES = {entry["attr"]: domain_id for domain_id, entry in DOMAIN_MANIFEST.items()}
+
+
+def __getattr__(name):
+    # DOMAIN_N_KNOWLEDGE names stay importable, but only load their own domain
+    if name in _KNOWLEDGE_NAMES:
+        return ALL_DOMAINS[_KNOWLEDGE_NAMES[name]]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "DOMAIN_1_KNOWLEDGE",
@@ -26,4 +69,6 @@ __all__ = [
     "DOMAIN_4_KNOWLEDGE",
     "DOMAIN_5_KNOWLEDGE",
     "ALL_DOMAINS",
-]
\ No newline at end of file
+    "DOMAIN_MANIFEST",
+    "LazyDomains",
+]
@@ -0,0 +1,85 @@
+"""
+Security+ Domain Manifest
+=========================
+Names, exam weights and topic keys for every domain, available without importing
+any knowledge module.
+
+Anything that only needs to list or label domains (exam overview, quiz domain
+lists, greetings) should read this instead of ALL_DOMAINS, so the full content
+and scripted lessons are only imported by processes that actually teach them.
+
+Keep in sync with domains/domain_*/knowledge.py (tests/test_domains_lazy.py checks it).
+"""
+
+DOMAIN_MANIFEST = {
+    "domain_1": {
+        "name": "General Security Concepts",
+        "weight": "12%",
+        "module": "domains.domain_1.knowledge",
+        "attr": "DOMAIN_1_KNOWLEDGE",
+        "topics": [
+            "security_controls",
+            "fundamental_concepts",
+            "zero_trust",
+            "physical_security",
+            "deception_technology",
+            "change_management",
+            "cryptography",
+        ],
+    },
+    "domain_2": {
+        "name": "Threats, Vulnerabilities, and Mitigations",
+        "weight": "22%",
+        "module": "domains.domain_2.knowledge",
+        "attr": "DOMAIN_2_KNOWLEDGE",
+        "topics": [
+            "threat_actors",
+            "threat_vectors",
+            "social_engineering",
+            "vulnerabilities",
+            "malicious_activity",
+            "mitigation_techniques",
+        ],
+    },
+    "domain_3": {
+        "name": "Security Architecture",
+        "weight": "18%",
+        "module": "domains.domain_3.knowledge",
+        "attr": "DOMAIN_3_KNOWLEDGE",
+        "topics": [
+            "architecture_models",
+            "enterprise_infrastructure",
+            "data_protection",
+            "resilience_recovery",
+        ],
+    },
+    "domain_4": {
+        "name": "Security Operations",
+        "weight": "28%",
+        "module": "domains.domain_4.knowledge",
+        "attr": "DOMAIN_4_KNOWLEDGE",
+        "topics": [
+            "security_techniques",
+            "asset_management",
+            "vulnerability_management",
+            "security_alerting_monitoring",
+            "identity_access_management",
+            "modifying_enterprise_capabilities",
+            "data_sources",
+        ],
+    },
+    "domain_5": {
+        "name": "Security Program Management and Oversight",
+        "weight": "20%",
+        "module": "domains.domain_5.knowledge",
+        "attr": "DOMAIN_5_KNOWLEDGE",
+        "topics": [
+            "security_governance",
+            "risk_management",
+            "third_party_risk",
+            "compliance",
+            "audits_assessments",
+            "security_awareness",
+        ],
+    },
+}
@@ -0,0 +1,295 @@
+"""
+Item Response Model
+===================
+Per-student, per-domain ability and per-question difficulty under a 1PL
+(Rasch) or 2PL item-response model, updated one answer at a time, and quiz
+selection by Fisher information.
+
+Under the 2PL model a student with ability theta answers question i correctly
+with probability ``p = 1 / (1 + exp(-a_i * (theta - b_i)))``, where b_i is the
+question's difficulty and a_i its discrimination (fixed at 1 under 1PL).
+Each graded answer moves both sides by a stochastic-gradient step on the
+log-likelihood, the online form of IRT calibration (Elo-style):
+
+    theta += K_theta * a_i * (y - p)
+    b_i   -= K_item  * a_i * (y - p)
+    a_i   += K_item  * A_RATE * (y - p) * (theta - b_i)        (2PL only)
+
+Step sizes shrink as a student or question gathers answers, so early answers
+move estimates quickly and later ones refine them.
+
+``ItemBank`` holds a, b and answer counts for the whole bank as NumPy arrays,
+shared by every session in a worker process and saved to $IRT_ITEMS at job end.
+Worker processes share that file, so a save re-reads it under a lock and adds
+only what this process learned since it last loaded or saved. Counts merge
+exactly, but a and b merge as summed steps that each worker took against its
+own copy, which overshoots a little when several workers answer the same
+question between saves. Without fcntl (Windows) saves are not locked, and two
+at the same moment can still lose one worker's steps.
+``StudentModel`` holds one student's abilities and which questions are not due
+again yet (their spaced-repetition cards, see review_scheduler.py), and picks
+the next questions by scoring the information ``a^2 * p * (1 - p)`` of the
+candidates in one vectorized pass. Candidates come from the student's
+no-repeat rotation plus due reviews, so adaptive quizzes never repeat a
+question within a rotation.
+"""
+
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ITEMS_PATH = "irt_items.npz"
+# "2pl" also learns each question's discrimination; "1pl" keeps it at 1
+DEFAULT_MODEL = "2pl"
+
+# Ability step: K_THETA / (1 + n / THETA_HALF_LIFE) after n answers in a domain, never below MIN_K
+K_THETA = 0.6
+THETA_HALF_LIFE = 10
+# Item step, likewise per question across all students
+K_ITEM = 0.3
+ITEM_HALF_LIFE = 30
+MIN_K = 0.05
+# Discrimination learns more slowly than difficulty, and stays in a sane range
+A_RATE = 0.2
+A_RANGE = (0.25, 3.0)
+# Abilities and difficulties stay within this many logits of average
+THETA_RANGE = (-4.0, 4.0)
+
+
+def _step(base: float, count: int, half_life: int) -> float:
+    return max(MIN_K, base / (1 + count / half_life))
+
+
+def _clip(value: float, bounds: Tuple[float, float]) -> float:
+    return min(max(value, bounds[0]), bounds[1])
+
+
+def probability(theta, a, b):
+    """Chance of a correct answer; works on scalars and arrays alike."""
+    return 1.0 / (1.0 + np.exp(-a * (theta - b)))
+
+
+class ItemBank:
+    """Difficulty, discrimination and answer counts for every practice question.
+
+    Args:
+        questions: The question bank in content order (each with "id" and "domain")
+        model: "2pl" or "1pl"
+    """
+
+    def __init__(self, questions: Sequence[dict], model: str = DEFAULT_MODEL):
+        if model not in ("1pl", "2pl"):
+            raise ValueError(f"IRT model must be 1pl or 2pl, not {model!r}")
+        self.model = model
+        self.ids = tuple(q["id"] for q in questions)
+        self.index = {qid: i for i, qid in enumerate(self.ids)}
+        self.domains = tuple(sorted({q["domain"] for q in questions}))
+        domain_index = {domain: d for d, domain in enumerate(self.domains)}
+        self.domain_of = np.fromiter((domain_index[q["domain"]] for q in questions), dtype=np.intp, count=len(self.ids))
+        self.a = np.ones(len(self.ids))
+        self.b = np.zeros(len(self.ids))
+        self.count = np.zeros(len(self.ids), dtype=np.int64)
+        # Parameters as last loaded or saved; save merges the difference into the file
+        self._base = (self.a.copy(), self.b.copy(), self.count.copy())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def update(self, i: int, theta: float, correct: bool) -> float:
+        """Fold one answer to question ``i`` into its parameters; returns p before the update."""
+        a, b = float(self.a[i]), float(self.b[i])
+        p = float(probability(theta, a, b))
+        residual = float(correct) - p
+        k = _step(K_ITEM, int(self.count[i]), ITEM_HALF_LIFE)
+        self.b[i] = _clip(b - k * a * residual, THETA_RANGE)
+        if self.model == "2pl":
+            self.a[i] = _clip(a + k * A_RATE * residual * (theta - b), A_RANGE)
+        self.count[i] += 1
+        return p
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Merge this process's updates into the saved parameters and write them atomically.
+
+        The file is re-read under a lock and each question gets the steps and
+        answer counts added here since the last load or save, so workers
+        sharing the file do not overwrite each other. The merged parameters
+        are kept in memory too.
+        """
+        path = path or os.getenv("IRT_ITEMS", DEFAULT_ITEMS_PATH)
+        with open(path + ".lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            base_a, base_b, base_count = self._base
+            a, b, count = self.a - base_a, self.b - base_b, self.count - base_count
+            self.a[:], self.b[:], self.count[:] = base_a, base_b, base_count
+            self._read(path)
+            np.clip(self.a + a, *A_RANGE, out=self.a)
+            np.clip(self.b + b, *THETA_RANGE, out=self.b)
+            self.count += count
+            self._write(path)
+            self._base = (self.a.copy(), self.b.copy(), self.count.copy())
+
+    def load(self, path: Optional[str] = None) -> int:
+        """Take saved parameters for questions still in the bank; returns how many matched."""
+        path = path or os.getenv("IRT_ITEMS", DEFAULT_ITEMS_PATH)
+        matched = self._read(path)
+        self._base = (self.a.copy(), self.b.copy(), self.count.copy())
+        return matched
+
+    def _read(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        with np.load(path) as saved:
+            matched = 0
+            for j, qid in enumerate(saved["ids"].tolist()):
+                i = self.index.get(qid)
+                if i is not None:
+                    self.a[i], self.b[i], self.count[i] = saved["a"][j], saved["b"][j], saved["count"][j]
+                    matched += 1
+        return matched
+
+    def _write(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, ids=np.array(self.ids), a=self.a, b=self.b, count=self.count)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class StudentModel:
+    """One student's per-domain abilities over a shared item bank.
+
+    Args:
+        items: The process-wide ItemBank
+        ability: The student's progress["ability"] ({domain: [theta, answers]}), read once
+        reviews: The student's progress["reviews"] cards; questions not yet due are skipped
+        rng: Breaks ties between equally informative questions
+    """
+
+    def __init__(
+        self,
+        items: ItemBank,
+        ability: Mapping[str, list],
+        reviews: Mapping[str, list],
+        rng: Optional[np.random.Generator] = None,
+    ):
+        self.items = items
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.theta = np.zeros(len(items.domains))
+        self.answers = np.zeros(len(items.domains), dtype=np.int64)
+        for d, domain in enumerate(items.domains):
+            if domain in ability:
+                self.theta[d], self.answers[d] = ability[domain]
+        # Epoch time each question is next due for review; 0 for never answered
+        self.due = np.zeros(len(items))
+        for qid, card in reviews.items():
+            i = items.index.get(qid)
+            if i is not None:
+                self.due[i] = card[3]
+
+    def information(self, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """Fisher information of questions (all, or the ``candidates`` indices) at the student's ability."""
+        items = self.items
+        if candidates is None:
+            a, b, domain_of = items.a, items.b, items.domain_of
+        else:
+            a, b, domain_of = items.a[candidates], items.b[candidates], items.domain_of[candidates]
+        p = probability(self.theta[domain_of], a, b)
+        return a * a * p * (1.0 - p)
+
+    def select(
+        self,
+        k: int,
+        unseen: Sequence[str],
+        domain: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> List[str]:
+        """IDs of the ``k`` most informative questions a quiz may serve, optionally within one domain.
+
+        Candidates are the ``unseen`` questions of the student's no-repeat
+        rotation (quiz_sampler.py) plus answered questions whose review is due.
+        Unseen questions whose review is not due yet are left out unless that
+        leaves fewer than ``k``. Ties (a new student, a fresh bank) go to a
+        random candidate rather than always the same one.
+        """
+        now = time.time() if now is None else now
+        unseen_mask = np.zeros(len(self.items), dtype=bool)
+        unseen_mask[[self.items.index[qid] for qid in unseen if qid in self.items.index]] = True
+        due = (self.due > 0) & (self.due <= now)
+        if domain is not None:
+            due &= self.items.domain_of == self.items.domains.index(domain)
+        eligible = (unseen_mask & (self.due <= now)) | due
+        if np.count_nonzero(eligible) < k:
+            eligible |= unseen_mask
+        # Score only the candidates, in random order so ties are broken randomly
+        candidates = np.flatnonzero(eligible)
+        self.rng.shuffle(candidates)
+        info = self.information(candidates)
+        k = min(k, len(info))
+        if k <= 0:
+            return []
+        top = np.argpartition(info, len(info) - k)[-k:]
+        top = candidates[top[np.argsort(-info[top], kind="stable")]]
+        return [self.items.ids[i] for i in top]
+
+    def observe(self, graded: Sequence[Tuple[str, bool]]) -> Dict[str, list]:
+        """Update abilities and question parameters from graded answers.
+
+        Returns the new ``[theta, answers]`` of each domain that changed, for
+        the quiz progress event.
+        """
+        changed: Dict[str, list] = {}
+        for qid, correct in graded:
+            i = self.items.index.get(qid)
+            if i is None:
+                continue
+            d = int(self.items.domain_of[i])
+            theta = float(self.theta[d])
+            a = float(self.items.a[i])
+            p = self.items.update(i, theta, correct)
+            k = _step(K_THETA, int(self.answers[d]), THETA_HALF_LIFE)
+            self.theta[d] = _clip(theta + k * a * (float(correct) - p), THETA_RANGE)
+            self.answers[d] += 1
+            changed[self.items.domains[d]] = [round(float(self.theta[d]), 4), int(self.answers[d])]
+        return changed
+
+    def reschedule(self, question_id: str, due: float) -> None:
+        """Record a question's new review due time after grading."""
+        i = self.items.index.get(question_id)
+        if i is not None:
+            self.due[i] = due
+
+    def abilities(self) -> Dict[str, float]:
+        return {domain: float(self.theta[d]) for d, domain in enumerate(self.items.domains)}
+
+
+_default_items: Optional[ItemBank] = None
+
+
+def default_item_bank(questions: Optional[Sequence[dict]] = None) -> ItemBank:
+    """Process-wide item bank over the default content, with saved parameters loaded."""
+    global _default_items
+    if _default_items is None:
+        if questions is None:
+            from kb_snapshot import default_content
+
+            questions = default_content().questions
+        _default_items = ItemBank(questions, os.getenv("IRT_MODEL", DEFAULT_MODEL))
+        matched = _default_items.load()
+        logger.info("Item bank: %d questions, %d with saved parameters", len(_default_items), matched)
+    return _default_items
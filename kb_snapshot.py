@@ -0,0 +1,284 @@
+"""
+Knowledge Base Snapshot
+=======================
+Compiles the knowledge base (ALL_DOMAINS) and the practice question bank
+(DOMAIN_PRACTICE_QUESTIONS) into one versioned binary file that job processes
+mmap read-only.
+
+Loading from the snapshot skips importing and executing the large dict literals
+in domains/ and security_plus_knowledge_base.py. The question bank is decoded at
+load; each domain is decoded on first access, so a process that only quizzes
+never decodes the scripted lessons. The mapping stays open for as long as the
+content that reads from it. Decoded sections are ordinary Python objects owned
+by the process that decoded them: the snapshot saves startup work, not memory.
+
+File layout (little-endian):
+- header: magic, format version, section count, Python tag, source fingerprint
+- section table: name, offset and length of every section
+- sections: one marshal-encoded payload per domain and per domain's questions
+
+The source fingerprint is a hash of the knowledge modules the snapshot was built
+from. A snapshot whose fingerprint no longer matches the sources (or that was
+built by a different Python) is ignored, and content loads from the modules.
+
+Build it as part of a deploy:
+
+    python kb_snapshot.py build [--output kb_snapshot.bin]
+"""
+
+import argparse
+import hashlib
+import logging
+import marshal
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = "kb_snapshot.bin"
+MAGIC = b"SPKBSNAP"
+FORMAT_VERSION = 1
+# marshal output is only guaranteed readable by the interpreter version that wrote it
+PYTHON_TAG = f"{sys.implementation.name}-{sys.version_info[0]}.{sys.version_info[1]}-m{marshal.version}"
+
+HEADER = struct.Struct("<8sHH16s32s")
+SECTION = struct.Struct("<H")
+SPAN = struct.Struct("<QQ")
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE_FILES = [
+    "domains/manifest.py",
+    "domains/domain_1/knowledge.py",
+    "domains/domain_2/knowledge.py",
+    "domains/domain_3/knowledge.py",
+    "domains/domain_4/knowledge.py",
+    "domains/domain_5/knowledge.py",
+    "security_plus_knowledge_base.py",
+]
+
+
+def source_fingerprint(root: str = _HERE) -> bytes:
+    """SHA-256 over the knowledge source files; changes whenever any content changes."""
+    digest = hashlib.sha256()
+    for name in SOURCE_FILES:
+        digest.update(name.encode("utf-8"))
+        with open(os.path.join(root, name), "rb") as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+def build_snapshot(path: Optional[str] = None) -> str:
+    """Compile the knowledge modules into a snapshot file and return its path.
+
+    The file is written next to its destination and renamed into place, so job
+    processes that already mapped the old snapshot keep reading it unharmed.
+    """
+    from domains import ALL_DOMAINS
+    from security_plus_knowledge_base import DOMAIN_PRACTICE_QUESTIONS
+
+    path = path or os.getenv("KB_SNAPSHOT", DEFAULT_SNAPSHOT_PATH)
+    sections: List[Tuple[str, bytes]] = []
+    for domain_id in ALL_DOMAINS:
+        sections.append((f"domain/{domain_id}", marshal.dumps(ALL_DOMAINS[domain_id])))
+    for domain_id, questions in DOMAIN_PRACTICE_QUESTIONS.items():
+        sections.append((f"questions/{domain_id}", marshal.dumps(questions)))
+
+    table_size = sum(SECTION.size + len(name.encode("utf-8")) + SPAN.size for name, _ in sections)
+    offset = HEADER.size + table_size
+    entries = []
+    for name, payload in sections:
+        encoded = name.encode("utf-8")
+        entries.append(SECTION.pack(len(encoded)) + encoded + SPAN.pack(offset, len(payload)))
+        offset += len(payload)
+
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        len(sections),
+        PYTHON_TAG.encode("ascii")[:16],
+        source_fingerprint(),
+    )
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(b"".join(entries))
+        for _, payload in sections:
+            f.write(payload)
+    os.replace(tmp_path, path)
+    return path
+
+
+class KnowledgeSnapshot:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    Args:
+        path: Snapshot file written by build_snapshot
+
+    Raises:
+        ValueError: If the file is not a snapshot this code can read
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, python_tag, fingerprint = (
+            HEADER.unpack_from(self._mm, 0) if len(self._mm) >= HEADER.size else (b"", 0, 0, b"", b"")
+        )
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} knowledge snapshot")
+        self.python_tag = python_tag.rstrip(b"\0").decode("ascii")
+        self.fingerprint = fingerprint
+
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        self._decoded: Dict[str, object] = {}
+        pos = HEADER.size
+        for _ in range(count):
+            (name_length,) = SECTION.unpack_from(self._mm, pos)
+            pos += SECTION.size
+            name = self._mm[pos:pos + name_length].decode("utf-8")
+            pos += name_length
+            self._sections[name] = SPAN.unpack_from(self._mm, pos)
+            pos += SPAN.size
+
+    def section(self, name: str):
+        """Decode one section on first access; later calls return the same object."""
+        value = self._decoded.get(name)
+        if value is None:
+            offset, length = self._sections[name]
+            # marshal reads straight from the mapping, without copying the payload first
+            with memoryview(self._mm) as view:
+                value = marshal.loads(view[offset:offset + length])
+            self._decoded[name] = value
+        return value
+
+    def section_names(self, prefix: str) -> List[str]:
+        """Names after ``prefix`` for every section starting with it, in file order."""
+        return [name[len(prefix):] for name in self._sections if name.startswith(prefix)]
+
+    def is_current(self, fingerprint: Optional[bytes] = None) -> bool:
+        """Whether the snapshot was built by this Python from the current sources."""
+        fingerprint = fingerprint if fingerprint is not None else source_fingerprint()
+        return self.python_tag == PYTHON_TAG[:16] and self.fingerprint == fingerprint
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mm.close()
+
+
+class SnapshotDomains(Mapping):
+    """ALL_DOMAINS-shaped mapping that decodes each domain from the snapshot on first access.
+
+    Holds the snapshot, so the file stays mapped while the content is in use.
+    """
+
+    def __init__(self, snapshot: KnowledgeSnapshot):
+        self._snapshot = snapshot
+        self._domain_ids = snapshot.section_names("domain/")
+
+    def __getitem__(self, domain_id: str) -> dict:
+        if domain_id not in self._domain_ids:
+            raise KeyError(domain_id)
+        return self._snapshot.section(f"domain/{domain_id}")
+
+    def __contains__(self, domain_id) -> bool:
+        return domain_id in self._domain_ids
+
+    def __iter__(self):
+        return iter(self._domain_ids)
+
+    def __len__(self) -> int:
+        return len(self._domain_ids)
+
+    def __repr__(self) -> str:
+        return f"SnapshotDomains({self._domain_ids}, path={self._snapshot.path!r})"
+
+
+class KnowledgeContent(NamedTuple):
+    """Everything the agent reads from the static knowledge base."""
+
+    domains: Mapping
+    domain_questions: Dict[str, List[dict]]
+    questions: List[dict]
+    questions_by_id: Dict[str, dict]
+    version: str
+    source: str
+
+
+def _question_bank(domain_questions: Dict[str, List[dict]]) -> Tuple[List[dict], Dict[str, dict]]:
+    questions = [q for domain in domain_questions.values() for q in domain]
+    return questions, {q["id"]: q for q in questions}
+
+
+def load_content(path: Optional[str] = None) -> KnowledgeContent:
+    """Load the knowledge base from the snapshot when it is current, else from the modules.
+
+    Args:
+        path: Snapshot file (defaults to $KB_SNAPSHOT or ./kb_snapshot.bin)
+    """
+    path = path or os.getenv("KB_SNAPSHOT", DEFAULT_SNAPSHOT_PATH)
+    fingerprint = source_fingerprint()
+
+    if os.path.exists(path):
+        try:
+            snapshot = KnowledgeSnapshot(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring knowledge snapshot %s: %s", path, e)
+        else:
+            if snapshot.is_current(fingerprint):
+                domain_questions = {
+                    domain_id: snapshot.section(f"questions/{domain_id}")
+                    for domain_id in snapshot.section_names("questions/")
+                }
+                questions, by_id = _question_bank(domain_questions)
+                return KnowledgeContent(
+                    SnapshotDomains(snapshot), domain_questions, questions, by_id,
+                    fingerprint.hex(), path,
+                )
+            logger.warning("Knowledge snapshot %s is stale; rebuild it with 'python kb_snapshot.py build'", path)
+            snapshot.close()
+
+    from domains import ALL_DOMAINS
+    from security_plus_knowledge_base import DOMAIN_PRACTICE_QUESTIONS
+
+    questions, by_id = _question_bank(DOMAIN_PRACTICE_QUESTIONS)
+    return KnowledgeContent(
+        ALL_DOMAINS, DOMAIN_PRACTICE_QUESTIONS, questions, by_id, fingerprint.hex(), "modules"
+    )
+
+
+_default_content: Optional[KnowledgeContent] = None
+
+
+def default_content() -> KnowledgeContent:
+    """Process-wide knowledge content, loaded on first use."""
+    global _default_content
+    if _default_content is None:
+        _default_content = load_content()
+    return _default_content
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Build or inspect the knowledge base snapshot")
+    parser.add_argument("command", choices=["build", "check"])
+    parser.add_argument("--output", default=None, help="Snapshot path (default: $KB_SNAPSHOT or kb_snapshot.bin)")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        path = build_snapshot(args.output)
+        print(f"Wrote {path} ({os.path.getsize(path)} bytes)")
+    else:
+        content = load_content(args.output)
+        print(f"Knowledge content from {content.source} (version {content.version[:12]})")
+        if content.source == "modules":
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Knowledge Base Search
+=====================
+BM25 full-text search over every field in ``domains/domain_*/knowledge.py``.
+
+Each description, list item, key point and scripted-lesson paragraph becomes one
+small document that remembers where it came from (domain, topic, field). Free-form
+student questions ("what's a compensating control?") are answered with the
+top-k matching snippets instead of the LLM guessing or chaining several tools.
+
+The inverted index is built once per process; a query only touches the postings
+of its own terms.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from",
+    "how", "i", "in", "is", "it", "its", "me", "of", "on", "or", "so", "that", "the",
+    "this", "to", "was", "what", "whats", "when", "where", "which", "who", "why", "with",
+    "you", "your", "s",
+}
+
+
+class SearchHit(NamedTuple):
+    domain: str
+    topic: str
+    field: str
+    text: str
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords dropped and plurals folded ("controls" -> "control")."""
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower().replace("'", "")):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class KnowledgeIndex:
+    """BM25 index over knowledge base snippets.
+
+    Args:
+        domains: Knowledge base in the ALL_DOMAINS shape
+        k1: BM25 term-frequency saturation
+        b: BM25 length normalization
+    """
+
+    def __init__(self, domains: dict, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs: List[Tuple[str, str, str, str]] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+        for domain_id, domain_data in domains.items():
+            for topic_key, topic_data in domain_data["topics"].items():
+                for field_name, text in self._snippets(topic_data):
+                    self._add(domain_id, topic_key, field_name, text)
+
+        self.avg_length = sum(self.doc_lengths) / max(len(self.doc_lengths), 1)
+        self.idf = {
+            term: math.log(1 + (len(self.docs) - len(hits) + 0.5) / (len(hits) + 0.5))
+            for term, hits in self.postings.items()
+        }
+
+    @staticmethod
+    def _snippets(topic_data: dict):
+        for field_name, field_data in topic_data.items():
+            if isinstance(field_data, (list, tuple)):
+                for item in field_data:
+                    yield field_name, item
+            elif field_name == "scripted_lesson":
+                # Lessons are long; index them paragraph by paragraph
+                for paragraph in field_data.split("\n\n"):
+                    if paragraph.strip():
+                        yield field_name, paragraph.strip()
+            elif isinstance(field_data, str):
+                yield field_name, field_data
+
+    def _add(self, domain: str, topic: str, field: str, text: str) -> None:
+        # Topic and field names are indexed with the text so "zero trust data plane" finds its items
+        tokens = tokenize(f"{topic.replace('_', ' ')} {field.replace('_', ' ')} {text}")
+        doc_id = len(self.docs)
+        self.docs.append((domain, topic, field, text))
+        self.doc_lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            self.postings[term].append((doc_id, tf))
+
+    def search(self, query: str, top_k: int = 3) -> List[SearchHit]:
+        """Return the top-k snippets for a free-form query, best first."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [SearchHit(*self.docs[doc_id], score) for doc_id, score in best]
+
+
+_default_index: Optional[KnowledgeIndex] = None
+
+
+def default_index() -> KnowledgeIndex:
+    """Process-wide index built from the knowledge base on first use."""
+    global _default_index
+    if _default_index is None:
+        from kb_snapshot import default_content
+
+        _default_index = KnowledgeIndex(default_content().domains)
+    return _default_index
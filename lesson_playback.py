@@ -0,0 +1,116 @@
+"""
+Lesson Playback
+===============
+Plays scripted lessons straight to TTS instead of routing them through the LLM.
+
+A scripted lesson is thousands of characters of finished prose. Returned as a
+tool result, the LLM has to read it and then re-generate it token by token
+before the first word is spoken. Instead, deliver_scripted_lesson splits the
+script into sentences, hands them to ``session.say`` as a text stream, and gives
+the LLM a short "lesson is playing" result. Time to first audio becomes the
+time to synthesize one sentence.
+
+Quiz questions picked by quiz_me and quiz_domain are played the same way, so
+what will be spoken is known up front and can be synthesized ahead of time
+(see speech_prefetch.py).
+
+Cue tags on their own line ("[break:1s]", "[checkpoint]") are kept as their own
+items so later stages can act on them without re-splitting.
+"""
+
+import re
+from typing import AsyncIterator, Iterable, List
+
+# Words ending in a period that do not end a sentence
+ABBREVIATIONS = {"e.g.", "i.e.", "etc.", "vs.", "mr.", "mrs.", "ms.", "dr.", "u.s.", "no."}
+
+# Spoken pace used to estimate playback length
+WORDS_PER_MINUTE = 150
+
+# Paragraph breaks, and line breaks around a cue tag on its own line
+_BLOCK_BREAK = re.compile(r"\n\s*\n|\n(?=[ \t]*\[)|(?<=\])[ \t]*\n")
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s)")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split lesson text into sentences, whitespace-normalized, in order."""
+    sentences = []
+    for block in _BLOCK_BREAK.split(text or ""):
+        block = " ".join(block.split())
+        start = 0
+        for match in _SENTENCE_END.finditer(block):
+            candidate = block[start:match.end()].strip()
+            if candidate.rsplit(" ", 1)[-1].lower() in ABBREVIATIONS:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        tail = block[start:].strip()
+        if tail:
+            sentences.append(tail)
+    return sentences
+
+
+def _last_boundary(text: str) -> int:
+    """End of the last complete sentence in ``text`` (0 if there is none yet)."""
+    last = 0
+    for match in _SENTENCE_END.finditer(text):
+        if text[:match.end()].rsplit(None, 1)[-1].lower() not in ABBREVIATIONS:
+            last = match.end()
+    return last
+
+
+async def sentence_stream(sentences: Iterable[str]) -> AsyncIterator[str]:
+    """Text stream for ``session.say``: one sentence per chunk, space-separated."""
+    for sentence in sentences:
+        yield sentence + " "
+
+
+def quiz_sentences(title: str, questions: List[dict]) -> List[str]:
+    """What is spoken for a quiz: each question with its options, a pause between questions."""
+    sentences = [f"{title}."]
+    for i, q in enumerate(questions, 1):
+        if i > 1:
+            sentences.append("[break:1s]")
+        sentences.append(f"Question {i}.")
+        sentences += split_sentences(q["question"]) + _spoken_options(q)
+    sentences.append("[break:1s]")
+    sentences.append("Tell me your answers, for example A, or B, C, A." if len(questions) > 1 else "What is your answer?")
+    return sentences
+
+
+def exam_question_sentences(number: int, total: int, question: dict, minutes_left: int) -> List[str]:
+    """What is spoken for one mock exam question, with the time remaining."""
+    sentences = [f"Question {number} of {total}."]
+    if number > 1:
+        sentences.append(f"{minutes_left} minute{'s' if minutes_left != 1 else ''} left.")
+    return sentences + split_sentences(question["question"]) + _spoken_options(question)
+
+
+def _spoken_options(question: dict) -> List[str]:
+    # "A) Worm" reads as "A: Worm."
+    return [re.sub(r"^([A-Z])\)\s*", r"\1: ", option).rstrip(".") + "." for option in question["options"]]
+
+
+def estimate_seconds(sentences: Iterable[str]) -> int:
+    """Rough playback length at WORDS_PER_MINUTE."""
+    words = sum(len(sentence.split()) for sentence in sentences)
+    return round(words * 60 / WORDS_PER_MINUTE)
+
+
+def playing_result(topic: str, domain_name: str, sentences: List[str]) -> str:
+    """The short tool result the LLM sees while the lesson plays."""
+    minutes = max(1, round(estimate_seconds(sentences) / 60))
+    return (
+        f"The scripted lesson on {topic.replace('_', ' ').title()} ({domain_name}) is now playing "
+        f"to the student, about {minutes} minute(s) long. Do not repeat or summarize it. "
+        "When it finishes, check their understanding or offer a quick quiz; use "
+        "search_knowledge or explain_topic to answer follow-up questions."
+    )
+
+
+def quiz_playing_result(quiz_text: str) -> str:
+    """Tool result for a quiz whose questions are being read out; the LLM keeps the text for follow-ups."""
+    return (
+        "The questions below are being read to the student right now. Do not read them again; "
+        "wait for their answers, then call check_answer.\n\n" + quiz_text
+    )
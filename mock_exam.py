@@ -0,0 +1,160 @@
+"""
+Mock Exam
+=========
+A timed practice exam shaped like the real one: questions stratified by the
+exam's domain weights (12/22/18/28/20%), one at a time against the clock, and
+graded in a single pass at the end.
+
+Scores use tables built once at import: SCALED_SCORES maps (questions, raw
+correct) to the 100-900 scale, and DOMAIN_BANDS maps (questions, correct) in a
+domain to a percentage and a readiness band. CompTIA does not publish its raw
+to scaled conversion, so the table is an estimate: piecewise linear through
+100 at zero, PASSING_SCORE at PASS_FRACTION correct, and 900 at a perfect score.
+
+The bank may hold fewer questions in a domain than a full 90-question exam
+asks for; the exam then shrinks as a whole, so the domain mix stays weighted.
+"""
+
+import random
+import time
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+EXAM_QUESTIONS = 90
+EXAM_MINUTES = 90
+MIN_SCORE, MAX_SCORE = 100, 900
+PASSING_SCORE = 750
+# Raw fraction correct assumed to map to PASSING_SCORE
+PASS_FRACTION = 0.8
+# Per-domain readiness, by minimum percent correct
+BANDS = ((85, "Strong"), (70, "Borderline"), (0, "Needs work"))
+
+
+def _scaled(correct: int, total: int) -> int:
+    fraction = correct / total
+    if fraction <= PASS_FRACTION:
+        score = MIN_SCORE + (PASSING_SCORE - MIN_SCORE) * fraction / PASS_FRACTION
+    else:
+        score = PASSING_SCORE + (MAX_SCORE - PASSING_SCORE) * (fraction - PASS_FRACTION) / (1 - PASS_FRACTION)
+    return int(round(score))
+
+
+def _band(percent: int) -> str:
+    return next(label for floor, label in BANDS if percent >= floor)
+
+
+# SCALED_SCORES[total][correct] -> scaled score, for every exam length up to EXAM_QUESTIONS
+SCALED_SCORES: Tuple[Tuple[int, ...], ...] = ((),) + tuple(
+    tuple(_scaled(correct, total) for correct in range(total + 1)) for total in range(1, EXAM_QUESTIONS + 1)
+)
+# DOMAIN_BANDS[total][correct] -> (percent, band)
+DOMAIN_BANDS: Tuple[Tuple[Tuple[int, str], ...], ...] = ((),) + tuple(
+    tuple((round(correct * 100 / total), _band(round(correct * 100 / total))) for correct in range(total + 1))
+    for total in range(1, EXAM_QUESTIONS + 1)
+)
+
+
+def domain_weights(manifest: Mapping[str, dict]) -> Dict[str, float]:
+    """Exam weight of each domain as a fraction, from the manifest's "12%" strings."""
+    return {domain: float(str(info["weight"]).rstrip("%")) / 100 for domain, info in manifest.items()}
+
+
+def allocate(weights: Mapping[str, float], total: int, available: Mapping[str, int]) -> Dict[str, int]:
+    """Questions per domain for an exam of ``total``: largest remainder, shrunk to fit the bank."""
+    weight_sum = sum(weights.values())
+    while total > 0:
+        shares = {domain: total * weight / weight_sum for domain, weight in weights.items()}
+        counts = {domain: int(share) for domain, share in shares.items()}
+        by_remainder = sorted(shares, key=lambda d: (shares[d] - counts[d], weights[d]), reverse=True)
+        for domain in by_remainder[:total - sum(counts.values())]:
+            counts[domain] += 1
+        if all(counts[domain] <= available.get(domain, 0) for domain in counts):
+            return counts
+        total -= 1
+    return {domain: 0 for domain in weights}
+
+
+class ExamResult(NamedTuple):
+    correct: int
+    total: int
+    scaled: int
+    passed: bool
+    # domain -> (correct, total, percent, band)
+    domains: Dict[str, Tuple[int, int, int, str]]
+    results: List[bool]
+
+
+class MockExam:
+    """One student's exam in progress.
+
+    Args:
+        questions: The exam's questions, in the order they are asked
+        minutes: Time allowed
+    """
+
+    def __init__(self, questions: Sequence[dict], minutes: float):
+        self.questions = list(questions)
+        self.answers: List[Optional[str]] = [None] * len(self.questions)
+        self.position = 0
+        self.minutes = minutes
+        self.started = time.monotonic()
+
+    @property
+    def current(self) -> Optional[dict]:
+        return self.questions[self.position] if self.position < len(self.questions) else None
+
+    def answer(self, letter: Optional[str]) -> None:
+        """Record the answer to the current question (None skips it) and move on."""
+        self.answers[self.position] = letter
+        self.position += 1
+
+    def remaining(self) -> float:
+        """Seconds left on the clock."""
+        return max(0.0, self.minutes * 60 - (time.monotonic() - self.started))
+
+    @property
+    def finished(self) -> bool:
+        return self.current is None or self.remaining() <= 0
+
+    def grade(self) -> ExamResult:
+        """Grade every question in one pass; unanswered questions count as wrong."""
+        results = [answer == q["correct"] for answer, q in zip(self.answers, self.questions)]
+        tallies: Dict[str, List[int]] = {}
+        for q, is_correct in zip(self.questions, results):
+            tally = tallies.setdefault(q["domain"], [0, 0])
+            tally[0] += is_correct
+            tally[1] += 1
+        correct, total = sum(results), len(results)
+        scaled = SCALED_SCORES[total][correct] if total else MIN_SCORE
+        domains = {
+            domain: (hits, count) + DOMAIN_BANDS[count][hits]
+            for domain, (hits, count) in sorted(tallies.items())
+        }
+        return ExamResult(correct, total, scaled, scaled >= PASSING_SCORE, domains, results)
+
+
+def build_exam(
+    domain_questions: Mapping[str, Sequence[dict]],
+    weights: Mapping[str, float],
+    total: int = EXAM_QUESTIONS,
+    rng: random.Random = random,
+) -> MockExam:
+    """A stratified exam: each domain's share drawn without replacement, then shuffled together."""
+    counts = allocate(weights, total, {domain: len(qs) for domain, qs in domain_questions.items()})
+    questions = [q for domain, k in counts.items() for q in rng.sample(list(domain_questions[domain]), k)]
+    rng.shuffle(questions)
+    # The real exam gives a minute per question; keep that pace for shorter exams
+    return MockExam(questions, minutes=EXAM_MINUTES * len(questions) / EXAM_QUESTIONS)
+
+
+def exam_report(result: ExamResult, domain_names: Mapping[str, str]) -> str:
+    """Results text for the student, straight from the score tables."""
+    verdict = "PASS" if result.passed else "Not yet passing"
+    lines = [
+        "📝 Mock Exam Results\n\n",
+        f"Scaled Score: {result.scaled} / {MAX_SCORE} ({verdict}; passing is {PASSING_SCORE})\n",
+        f"Correct: {result.correct}/{result.total}\n\n",
+        "By Domain:\n",
+    ]
+    for domain, (hits, count, percent, band) in result.domains.items():
+        lines.append(f"• {domain_names.get(domain, domain)}: {hits}/{count} ({percent}%) - {band}\n")
+    return "".join(lines)
@@ -0,0 +1,106 @@
+"""
+Worker Prewarm
+==============
+Per-process setup that LiveKit runs in each job process before it is handed a
+job, so a job starts with the static content already loaded and indexed instead
+of building it itself.
+
+``prewarm_content`` loads the process-wide knowledge content (from the
+snapshot when there is one, see kb_snapshot.py) and moves every object alive
+at that point into the garbage collector's permanent generation with
+``gc.freeze()``. The objects are frozen where they are, not copied, and domains
+the snapshot has not decoded yet stay undecoded. The cyclic GC then never walks
+them, so collections during a session only traverse what the session allocated.
+``prewarm_indexes`` does the same for the topic resolver, search index and
+render cache built from that content. benchmarks/prewarm_gc.py measures a full
+collection after prewarm at about 3ms without the freeze and 0.2ms with it.
+Nothing is shared between job processes by this: LiveKit runs prewarm in each
+one, so every process loads and freezes its own objects.
+
+``memory_usage`` reports resident, proportional and unique (private) memory for
+a process, so per-job memory can be watched as the number of sessions grows.
+"""
+
+import gc
+import logging
+import os
+from typing import Dict, Optional
+
+import kb_snapshot
+from kb_snapshot import KnowledgeContent
+from knowledge_search import default_index
+from render_cache import default_render_cache
+from topic_resolver import default_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def prewarm_content() -> KnowledgeContent:
+    """Load the process-wide knowledge content, then gc.freeze() it.
+
+    Safe to call more than once; later calls return the same content.
+    """
+    content = kb_snapshot.default_content()
+    freeze_heap()
+    return content
+
+
+def prewarm_indexes() -> Dict[str, object]:
+    """Build the resolver, search index and render cache from the content, and freeze them too.
+
+    Returns the shared objects keyed the way the worker stores them in ``proc.userdata``.
+    """
+    content = prewarm_content()
+    shared = {
+        "knowledge_content": content,
+        "topic_resolver": default_resolver(),
+        "knowledge_index": default_index(),
+        "render_cache": default_render_cache(),
+    }
+    freeze_heap()
+    return shared
+
+
+def freeze_heap() -> None:
+    """Move every object alive now into the permanent generation, after dropping garbage."""
+    gc.collect()
+    gc.freeze()
+    logger.info("Prewarm froze %d objects", gc.get_freeze_count())
+
+
+def memory_usage(pid: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """Memory of a process in bytes: rss, pss, shared and uss (unique to the process).
+
+    Reads /proc/<pid>/smaps_rollup, so it returns None where that is unavailable
+    (non-Linux hosts, kernels older than 4.14).
+    """
+    path = f"/proc/{pid or os.getpid()}/smaps_rollup"
+    try:
+        with open(path) as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    fields = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == "kB":
+            fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "uss": private,
+    }
+
+
+def log_memory_usage(label: str) -> None:
+    """Log this process's memory usage, tagged with ``label`` (e.g. a job or room name)."""
+    usage = memory_usage()
+    if usage is None:
+        return
+    logger.info(
+        "Memory %s: uss=%.1fMB pss=%.1fMB rss=%.1fMB",
+        label, usage["uss"] / 2**20, usage["pss"] / 2**20, usage["rss"] / 2**20,
+    )
@@ -0,0 +1,233 @@
+"""
+SQLite Progress Backend
+=======================
+Optional progress store for hosts running several workers (PROGRESS_BACKEND=sqlite).
+
+The database runs in WAL mode so worker processes can read while another one
+commits, and every batch handed over by ProgressWriter lands in a single
+transaction (group commit) no matter how many sessions contributed to it.
+
+History lives in tables instead of one growing document:
+- students: counters plus the small profile (current topic, weak/strong areas,
+  running stats, quiz rotations, review cards, abilities)
+- quizzes / attempts: one row per graded quiz and per answered question, kept
+  as an append-only record; nothing reads them back at runtime
+- sessions: one row per class session
+- topics: one row per topic a student has covered
+
+Nothing loads a student's full history into memory: sessions read the profile
+and running stats, which progress reports summarize like the JSON backend's.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from student_progress import apply_event, new_progress, question_domain
+
+DEFAULT_DB_PATH = "student_progress.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL DEFAULT 0,
+    questions_answered INTEGER NOT NULL DEFAULT 0,
+    correct_answers INTEGER NOT NULL DEFAULT 0,
+    session_count INTEGER NOT NULL DEFAULT 0,
+    profile TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS quizzes (
+    quiz_id INTEGER PRIMARY KEY,
+    student_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    score REAL NOT NULL,
+    correct INTEGER NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    quiz_id INTEGER NOT NULL,
+    student_id TEXT NOT NULL,
+    question TEXT NOT NULL,
+    domain TEXT,
+    answer TEXT NOT NULL,
+    correct INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    student_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    PRIMARY KEY (student_id, session_id)
+);
+CREATE INDEX IF NOT EXISTS sessions_by_student_start ON sessions (student_id, start_time);
+CREATE TABLE IF NOT EXISTS topics (
+    student_id TEXT NOT NULL,
+    topic_key TEXT NOT NULL,
+    PRIMARY KEY (student_id, topic_key)
+) WITHOUT ROWID;
+"""
+
+# Statements are module constants so sqlite3's statement cache prepares each one once
+SELECT_STUDENT = "SELECT seq, questions_answered, correct_answers, session_count, profile FROM students WHERE student_id = ?"
+UPSERT_STUDENT = """
+INSERT INTO students (student_id, seq, questions_answered, correct_answers, session_count, profile)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (student_id) DO UPDATE SET
+    seq = excluded.seq,
+    questions_answered = excluded.questions_answered,
+    correct_answers = excluded.correct_answers,
+    session_count = excluded.session_count,
+    profile = excluded.profile
+"""
+SELECT_SEQ = "SELECT seq FROM students WHERE student_id = ?"
+SELECT_TOPICS = "SELECT topic_key FROM topics WHERE student_id = ?"
+INSERT_TOPIC = "INSERT OR IGNORE INTO topics (student_id, topic_key) VALUES (?, ?)"
+INSERT_QUIZ = "INSERT INTO quizzes (student_id, timestamp, score, correct, total) VALUES (?, ?, ?, ?, ?)"
+INSERT_ATTEMPT = "INSERT INTO attempts (quiz_id, student_id, question, domain, answer, correct) VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_SESSION = "INSERT OR REPLACE INTO sessions (student_id, session_id, start_time) VALUES (?, ?, ?)"
+END_SESSION = "UPDATE sessions SET end_time = ? WHERE student_id = ? AND session_id = ?"
+RECENT_SESSIONS = """
+SELECT session_id, start_time, end_time FROM sessions
+WHERE student_id = ? AND end_time IS NOT NULL
+ORDER BY start_time DESC LIMIT ?
+"""
+
+# Profile fields kept as JSON on the students row; everything else has its own table
+PROFILE_FIELDS = (
+    "current_domain", "current_topic", "current_session", "last_session",
+    "weak_areas", "strong_areas", "stats", "quiz_rotation", "reviews",
+    "ability",
+)
+
+
+class SQLiteProgressStore:
+    """Progress store backed by a WAL-mode SQLite database.
+
+    Args:
+        path: Database file (defaults to $PROGRESS_DB or ./student_progress.db)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("PROGRESS_DB", DEFAULT_DB_PATH)
+        # ProgressWriter calls in from worker threads; the lock serialises use of the connection
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+
+    def load(self, student_id: str) -> dict:
+        """Load a student's profile, counters and running stats.
+
+        Full quiz history stays in the database; only the most recent sessions
+        are loaded, which is all the reports show.
+        """
+        with self._lock:
+            progress = self._load_profile(student_id)
+            progress["topics_covered"] = {
+                row[0] for row in self._conn.execute(SELECT_TOPICS, (student_id,))
+            }
+            recent = self._conn.execute(RECENT_SESSIONS, (student_id, 3)).fetchall()
+            progress["sessions_completed"] = [
+                {"session_id": session_id, "start_time": start_time, "end_time": end_time}
+                for session_id, start_time, end_time in reversed(recent)
+            ]
+        return progress
+
+    def version(self, student_id: str) -> int:
+        """Change marker for a student's record: the last committed event sequence number."""
+        with self._lock:
+            row = self._conn.execute(SELECT_SEQ, (student_id,)).fetchone()
+        return row[0] if row else 0
+
+    def append_batch(self, batch: Dict[str, List[dict]]) -> Dict[str, int]:
+        """Apply events for every student in the batch inside one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for student_id, events in batch.items():
+                    self._apply_events(student_id, events)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        # Nothing to compact: every event is already in its final table
+        return {}
+
+    def append(self, student_id: str, events: List[dict]) -> int:
+        """Apply one student's events in their own transaction."""
+        self.append_batch({student_id: events})
+        return 0
+
+    def compact(self, student_id: str) -> None:
+        """No-op: the database has no journal to fold."""
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _load_profile(self, student_id: str) -> dict:
+        progress = new_progress()
+        row = self._conn.execute(SELECT_STUDENT, (student_id,)).fetchone()
+        if row:
+            seq, answered, correct, session_count, profile = row
+            progress.update(json.loads(profile))
+            progress.update(
+                seq=seq,
+                questions_answered=answered,
+                correct_answers=correct,
+                session_count=session_count,
+            )
+        return progress
+
+    def _apply_events(self, student_id: str, events: List[dict]) -> None:
+        progress = self._load_profile(student_id)
+
+        for event in events:
+            if event.get("seq", 0) and event["seq"] <= progress["seq"]:
+                continue
+
+            if event["type"] == "topic":
+                self._conn.execute(INSERT_TOPIC, (student_id, f"{event['domain']}_{event['topic']}"))
+            elif event["type"] == "quiz":
+                self._insert_quiz(student_id, event)
+            elif event["type"] == "session_start":
+                session = event["session"]
+                self._conn.execute(INSERT_SESSION, (student_id, session["session_id"], session["start_time"]))
+            elif event["type"] == "session_end" and progress.get("current_session"):
+                session_id = progress["current_session"]["session_id"]
+                self._conn.execute(END_SESSION, (event["end_time"], student_id, session_id))
+
+            # The shared reducer keeps counters and weak/strong areas identical to the JSON backend
+            apply_event(progress, event)
+
+        profile = {field: progress[field] for field in PROFILE_FIELDS if field in progress}
+        self._conn.execute(
+            UPSERT_STUDENT,
+            (
+                student_id,
+                progress["seq"],
+                progress["questions_answered"],
+                progress["correct_answers"],
+                progress["session_count"],
+                json.dumps(profile, default=str),
+            ),
+        )
+
+    def _insert_quiz(self, student_id: str, event: dict) -> None:
+        cursor = self._conn.execute(
+            INSERT_QUIZ,
+            (student_id, event["timestamp"], event["score"], event["correct"], event["total"]),
+        )
+        quiz_id = cursor.lastrowid
+        self._conn.executemany(
+            INSERT_ATTEMPT,
+            [
+                (quiz_id, student_id, qid, question_domain(qid), answer, is_correct)
+                for qid, answer, is_correct in zip(event["questions"], event["answers"], event["results"])
+            ],
+        )
@@ -0,0 +1,348 @@
+"""
+Student Progress Store
+======================
+Per-student persistence for SecurityPlusTeacher progress.
+
+Every student is keyed by their LiveKit participant identity and gets a record
+of their own, so loading or saving one student's progress never reads or
+rewrites anybody else's history. Changes are journaled as small events (see
+student_progress.py) rather than rewriting the whole record.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from student_progress import apply_event, from_json, to_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROGRESS_DIR = "student_progress"
+
+
+def student_key(identity: str) -> str:
+    """Map a participant identity to a filesystem-safe, collision-free record key."""
+    identity = identity or "anonymous"
+    readable = re.sub(r"[^A-Za-z0-9_.-]", "_", identity)[:48]
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:12]
+    return f"{readable}-{digest}"
+
+
+class JsonProgressStore:
+    """Per-student snapshot plus append-only journal, sharded by key hash.
+
+    Each progress change is one JSON line appended to ``<key>.journal``, so a write
+    costs the same no matter how long the student's history is. ``compact`` folds
+    the journal into the ``<key>.json`` snapshot in the background, and ``load``
+    replays snapshot plus journal tail.
+
+    Args:
+        root: Directory holding the records (defaults to $STUDENT_PROGRESS_DIR
+            or ./student_progress)
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("STUDENT_PROGRESS_DIR", DEFAULT_PROGRESS_DIR)
+
+    def path_for(self, student_id: str) -> str:
+        """Return the snapshot path for a student."""
+        key = student_key(student_id)
+        return os.path.join(self.root, key[-2:], f"{key}.json")
+
+    def journal_path_for(self, student_id: str) -> str:
+        """Return the journal path for a student."""
+        return self.path_for(student_id)[: -len(".json")] + ".journal"
+
+    def load(self, student_id: str) -> dict:
+        """Rebuild a student's progress from their snapshot and journal tail."""
+        progress = from_json(self._read_snapshot(student_id) or {})
+        for event in self._read_journal(student_id):
+            apply_event(progress, event)
+        return progress
+
+    def version(self, student_id: str) -> Optional[tuple]:
+        """Cheap change marker for a student's record: stat() of snapshot and journal, no reads."""
+        stamp = []
+        for path in (self.path_for(student_id), self.journal_path_for(student_id)):
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def append(self, student_id: str, events: List[dict]) -> int:
+        """Append events to a student's journal. Returns the journal size in bytes."""
+        path = self.journal_path_for(student_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lines = "".join(json.dumps(event, default=str) + "\n" for event in events)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            return f.tell()
+
+    def append_batch(self, batch: Dict[str, List[dict]]) -> Dict[str, int]:
+        """Append events for several students. Returns each journal's size in bytes."""
+        sizes = {}
+        for student_id, events in batch.items():
+            try:
+                sizes[student_id] = self.append(student_id, events)
+            except Exception as e:
+                logger.error(f"Could not save progress for {student_id}: {e}")
+        return sizes
+
+    def compact(self, student_id: str) -> None:
+        """Fold the journal into a fresh snapshot and truncate it.
+
+        Events carry sequence numbers and the snapshot records the last one it
+        includes, so a crash between writing the snapshot and truncating the
+        journal only means some events are skipped on the next replay.
+        """
+        self.save(student_id, to_json(self.load(student_id)))
+        with open(self.journal_path_for(student_id), "w", encoding="utf-8"):
+            pass
+
+    def save(self, student_id: str, data: dict) -> None:
+        """Atomically replace a student's snapshot."""
+        path = self.path_for(student_id)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temp file in the same directory and rename over the old record,
+        # so a crash mid-write never leaves a truncated file behind
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read_snapshot(self, student_id: str) -> Optional[dict]:
+        path = self.path_for(student_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _read_journal(self, student_id: str) -> List[dict]:
+        path = self.journal_path_for(student_id)
+        if not os.path.exists(path):
+            return []
+        events = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    # A torn final line from a crash mid-append; everything before it is intact
+                    logger.warning(f"Skipping unreadable journal line for {student_id}")
+        return events
+
+
+class ProfileCache:
+    """Process-wide LRU cache of loaded student progress with a TTL.
+
+    A job process often serves the same student several times a day; cached
+    profiles let reconnects and back-to-back sessions skip reading and parsing
+    their record. Each entry remembers the store's ``version`` of the record,
+    and a mismatch on lookup (another worker wrote it) drops the entry.
+
+    Args:
+        max_entries: Profiles kept before the least recently used is evicted
+        ttl: Seconds a profile may be served before it is reloaded
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 6 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        # The writer thread updates versions while the event loop reads entries
+        self._lock = threading.Lock()
+
+    def get(self, student_id: str, version) -> Optional[dict]:
+        """Return the cached profile if it is fresh and still matches ``version``."""
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is None:
+                return None
+            progress, cached_version, loaded_at = entry
+            if cached_version != version or time.monotonic() - loaded_at > self.ttl:
+                del self._entries[student_id]
+                return None
+            self._entries.move_to_end(student_id)
+            return progress
+
+    def put(self, student_id: str, progress: dict, version) -> None:
+        """Cache a freshly loaded profile, evicting the least recently used past the bound."""
+        with self._lock:
+            self._entries[student_id] = [progress, version, time.monotonic()]
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def set_version(self, student_id: str, version) -> None:
+        """Record the version our own write produced, so it is not mistaken for an external change."""
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is not None:
+                entry[1] = version
+
+    def invalidate(self, student_id: str) -> None:
+        """Drop a student's cached profile."""
+        with self._lock:
+            self._entries.pop(student_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ProgressWriter:
+    """Coalescing background writer for student progress events.
+
+    Tools hand events to the writer instead of writing synchronously. Events that
+    land within ``delay`` seconds of each other go out in one append per student,
+    and the file I/O runs in a worker thread so the event loop keeps moving audio
+    frames. Once a journal grows past ``compact_bytes`` it is compacted in the
+    same background thread.
+
+    Loads also go through the writer: profiles are served from ``cache`` and
+    any events still queued for a student are replayed on top of a disk load.
+
+    Args:
+        store: Store that performs the actual writes (JsonProgressStore or
+            progress_sqlite.SQLiteProgressStore)
+        delay: Seconds to wait for further events before writing
+        compact_bytes: Journal size that triggers compaction into the snapshot
+        cache: Profile cache shared by every session using this writer
+    """
+
+    def __init__(
+        self,
+        store,
+        delay: float = 0.5,
+        compact_bytes: int = 64 * 1024,
+        cache: Optional[ProfileCache] = None,
+    ):
+        self.store = store
+        self.delay = delay
+        self.compact_bytes = compact_bytes
+        self.cache = cache or ProfileCache()
+        self._pending: Dict[str, List[dict]] = {}
+        self._inflight: Dict[str, List[dict]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def load(self, student_id: str) -> dict:
+        """Load a student's progress, from the cache when the record has not changed on disk."""
+        version = self.store.version(student_id)
+        progress = self.cache.get(student_id, version)
+        if progress is None:
+            progress = self.store.load(student_id)
+            # Events not yet on disk are replayed on top; sequence numbers make this idempotent
+            for events in (self._inflight.get(student_id, []), self._pending.get(student_id, [])):
+                for event in events:
+                    apply_event(progress, event)
+            self.cache.put(student_id, progress, version)
+        return progress
+
+    def append(self, student_id: str, event: dict) -> None:
+        """Queue an event for a student's journal.
+
+        Outside an event loop (scripts, tests) the event is written immediately.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_batch({student_id: [event]})
+            return
+
+        self._pending.setdefault(student_id, []).append(event)
+        self._ensure_task()
+        self._wakeup.set()
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything pending now. Returns False if ``timeout`` expired first."""
+        if self._flush_lock is None:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(self._write_pending()), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Progress flush did not finish within {timeout}s")
+            return False
+
+    def _ensure_task(self) -> None:
+        # Loop-bound primitives are created lazily so the writer can be built at import time
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.delay)
+            self._wakeup.clear()
+            await self._write_pending()
+
+    async def _write_pending(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._inflight = batch
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            finally:
+                self._inflight = {}
+
+    def _write_batch(self, batch: Dict[str, List[dict]]) -> None:
+        # One call per batch lets stores that support it group-commit every student at once
+        try:
+            sizes = self.store.append_batch(batch)
+        except Exception as e:
+            logger.error(f"Could not save progress for {', '.join(batch)}: {e}")
+            return
+        for student_id, size in sizes.items():
+            if size > self.compact_bytes:
+                try:
+                    self.store.compact(student_id)
+                except Exception as e:
+                    logger.error(f"Could not compact progress for {student_id}: {e}")
+        # Our own writes change the record's version; keep cached profiles valid
+        for student_id in batch:
+            self.cache.set_version(student_id, self.store.version(student_id))
+
+
+def default_store():
+    """Build the store selected by $PROGRESS_BACKEND ("json" or "sqlite")."""
+    backend = os.getenv("PROGRESS_BACKEND", "json").lower()
+    if backend == "sqlite":
+        from progress_sqlite import SQLiteProgressStore
+
+        return SQLiteProgressStore()
+    if backend != "json":
+        raise ValueError(f"Unknown PROGRESS_BACKEND: {backend} (use json or sqlite)")
+    return JsonProgressStore()
+
+
+_default_writer: Optional[ProgressWriter] = None
+
+
+def default_writer() -> ProgressWriter:
+    """Process-wide writer shared by every session on this worker."""
+    global _default_writer
+    if _default_writer is None:
+        _default_writer = ProgressWriter(default_store())
+    return _default_writer
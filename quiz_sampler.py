@@ -0,0 +1,172 @@
+"""
+Quiz Sampler
+============
+No-repeat question selection: each student works through every question in a
+pool (the whole bank for quiz_me, one domain for quiz_domain) before seeing any
+question again, across sessions.
+
+A pool's order is a pseudo-random permutation of its indices, defined by a
+64-bit seed instead of being stored. ``permuted_index`` maps a position to a
+question index with a small Feistel network, cycle-walking values that fall
+outside the pool, so drawing k questions costs O(k) whatever the bank size and
+the saved state is three integers per pool: the seed, how far the student has
+got (cursor), and the pool size the permutation was made for. When the cursor
+reaches the end, a new seed starts the next rotation.
+
+Questions added to the bank join at the next rotation; if the bank shrinks,
+positions past its end are skipped.
+
+Adaptive selection (irt.py) serves questions out of order through
+``draw_ranked``: it picks among the next RANK_WINDOW unseen questions of the
+rotation, and the picked positions past the cursor are kept in ``ahead`` until
+the cursor catches up with them. The window keeps a ranked draw at
+O(RANK_WINDOW + k) whatever the pool size, and ``ahead`` within it; as the
+order is random, the window is a random sample of what the student has not seen.
+"""
+
+import random
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+# Feistel rounds; four make a well-mixed permutation for any round function
+ROUNDS = 4
+# Unseen questions a ranked draw chooses from
+RANK_WINDOW = 64
+_MASK64 = (1 << 64) - 1
+
+
+class Rotation(NamedTuple):
+    """Where a student is in one pool's current permutation."""
+
+    seed: int
+    cursor: int
+    size: int
+    # Positions past the cursor already served out of order
+    ahead: Tuple[int, ...] = ()
+
+
+def _mix(value: int, seed: int, round_: int) -> int:
+    """SplitMix64 finalizer over (value, seed, round), the Feistel round function."""
+    z = (value * 0x9E3779B97F4A7C15 + seed + round_ * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def permuted_index(position: int, size: int, seed: int) -> int:
+    """The index at ``position`` of the seed's permutation of range(size), in O(1) expected time."""
+    if size <= 1:
+        return 0
+    half = ((size - 1).bit_length() + 1) // 2
+    mask = (1 << half) - 1
+    x = position
+    # The network permutes range(4**half), at most 4x the pool; walk until back inside it
+    while True:
+        left, right = x >> half, x & mask
+        for round_ in range(ROUNDS):
+            left, right = right, left ^ (_mix(right, seed, round_) & mask)
+        x = (left << half) | right
+        if x < size:
+            return x
+
+
+def new_rotation(size: int, rng: random.Random = random) -> Rotation:
+    return Rotation(seed=rng.getrandbits(64), cursor=0, size=size)
+
+
+def draw(
+    rotation: Optional[Rotation],
+    size: int,
+    k: int,
+    rng: random.Random = random,
+) -> Tuple[List[int], Rotation]:
+    """Next ``k`` distinct question indices for a pool of ``size``, and the rotation after them.
+
+    Starts a rotation when there is none, and reshuffles when the current one
+    runs out (a quiz that straddles a reshuffle still has no duplicates).
+    """
+    k = min(k, size)
+    if rotation is None:
+        rotation = new_rotation(size, rng)
+    seed, cursor, rotation_size, ahead = rotation
+    ahead = set(ahead)
+    picked: List[int] = []
+    while len(picked) < k:
+        if cursor >= rotation_size:
+            seed, cursor, rotation_size, _ = new_rotation(size, rng)
+            ahead = set()
+        index = permuted_index(cursor, rotation_size, seed)
+        served = cursor in ahead
+        ahead.discard(cursor)
+        cursor += 1
+        if index < size and index not in picked and not served:
+            picked.append(index)
+    return picked, serve(Rotation(seed, cursor, rotation_size, tuple(sorted(ahead))), ())
+
+
+def draw_ranked(
+    rotation: Optional[Rotation],
+    size: int,
+    k: int,
+    rank: Callable[[int, List[int]], List[int]],
+    rng: random.Random = random,
+) -> Tuple[List[int], Rotation]:
+    """Like ``draw``, but ``rank(n, unseen)`` picks which questions to serve.
+
+    ``rank`` gets the indices of the next RANK_WINDOW questions not yet served
+    this rotation and returns up to ``n`` indices, mostly from those (it may add
+    questions due for review). A quiz that straddles the end of a rotation
+    takes the rest from the next one.
+    """
+    k = min(k, size)
+    picked: List[int] = []
+    while len(picked) < k:
+        unseen, rotation = remaining(rotation, size, rng, RANK_WINDOW)
+        position_of = {index: position for position, index in unseen if index not in picked}
+        chosen = [i for i in rank(k - len(picked), list(position_of)) if i not in picked]
+        if not chosen:
+            break
+        rotation = serve(rotation, [position_of[i] for i in chosen if i in position_of])
+        picked += chosen
+    if rotation is None:
+        rotation = new_rotation(size, rng)
+    return picked, rotation
+
+
+def remaining(
+    rotation: Optional[Rotation],
+    size: int,
+    rng: random.Random = random,
+    limit: Optional[int] = None,
+) -> Tuple[List[Tuple[int, int]], Rotation]:
+    """``(position, index)`` of questions not yet served in the rotation, in rotation order.
+
+    Returns the first ``limit`` of them, or all (O(pool)) without one. Starts a
+    new rotation when there is none or the current one is used up.
+    """
+    if rotation is None or not _unserved(rotation, size, 1):
+        rotation = new_rotation(size, rng)
+    return _unserved(rotation, size, limit), rotation
+
+
+def serve(rotation: Rotation, positions: Iterable[int]) -> Rotation:
+    """The rotation after serving ``positions`` (from ``remaining``) in any order."""
+    seed, cursor, size, ahead = rotation
+    ahead = set(ahead).union(positions)
+    while cursor in ahead:
+        ahead.discard(cursor)
+        cursor += 1
+    return Rotation(seed, cursor, size, tuple(sorted(ahead)))
+
+
+def _unserved(rotation: Rotation, size: int, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+    seed, cursor, rotation_size, ahead = rotation
+    ahead = set(ahead)
+    unserved: List[Tuple[int, int]] = []
+    for position in range(cursor, rotation_size):
+        if limit is not None and len(unserved) >= limit:
+            break
+        if position not in ahead:
+            index = permuted_index(position, rotation_size, seed)
+            if index < size:
+                unserved.append((position, index))
+    return unserved
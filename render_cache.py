@@ -0,0 +1,196 @@
+"""
+Render Cache
+============
+Memoized text for tools whose output depends only on the static knowledge base:
+the exam overview, topic lists, quiz domain list, study tips, and the body of
+explain_topic / teach_lesson.
+
+Entries are keyed by (tool, args, content version), where the version is the
+knowledge base source fingerprint (see kb_snapshot.py), so text rendered from an
+older knowledge base is never served after the content changes.
+
+With ``eager=True`` every domain and topic is rendered up front, which the
+worker does at prewarm ($RENDER_CACHE=eager, the default); with ``eager=False``
+each entry is rendered the first time a tool asks for it. Either way, repeat
+calls are a dict lookup.
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from domains import DOMAIN_MANIFEST
+from kb_snapshot import KnowledgeContent, default_content
+
+STUDY_TIPS = [
+    "Understand concepts, don't just memorize",
+    "Use acronyms (CIA, AAA, etc.)",
+    "Practice hands-on labs",
+    "Focus on high-weight domains (25% and 24%)",
+    "Read questions carefully on exam day",
+    "Watch for key words: BEST, MOST, FIRST",
+    "Performance-based questions come first",
+    "Flag difficult questions and return later",
+]
+
+RENDERERS: Dict[str, Callable[..., str]] = {}
+
+
+def renderer(tool: str):
+    """Register a pure render function for ``tool``."""
+    def register(fn):
+        RENDERERS[tool] = fn
+        return fn
+    return register
+
+
+def _title(key: str) -> str:
+    return key.replace("_", " ").title()
+
+
+@renderer("exam_overview")
+def render_exam_overview(content: KnowledgeContent) -> str:
+    lines = [
+        "CompTIA Security+ (SY0-701) Exam:\n\n",
+        "• 90 questions (multiple choice and performance-based)\n",
+        "• 90 minutes duration\n",
+        "• Passing Score: 750 (scale 100-900)\n\n",
+        "Domains:\n",
+    ]
+    lines += [f"• {domain['name']} - {domain['weight']}\n" for domain in DOMAIN_MANIFEST.values()]
+    return "".join(lines)
+
+
+@renderer("topic_list")
+def render_topic_list(content: KnowledgeContent, domain: str) -> str:
+    domain_data = content.domains[domain]
+    lines = [f"{domain_data['name']} ({domain_data['weight']})\n\n"]
+    lines += [
+        f"• {topic_key}: {topic_data['description']}\n"
+        for topic_key, topic_data in domain_data["topics"].items()
+    ]
+    return "".join(lines)
+
+
+@renderer("quiz_domains")
+def render_quiz_domains(content: KnowledgeContent) -> str:
+    lines = ["Available Quiz Domains:\n\n"]
+    for domain_id, questions in content.domain_questions.items():
+        domain_name = DOMAIN_MANIFEST.get(domain_id, {}).get("name", _title(domain_id))
+        lines.append(f"• {domain_id}: {domain_name} ({len(questions)} questions)\n")
+    lines.append("\nUse quiz_domain(domain, num_questions) to start a domain-specific quiz!")
+    return "".join(lines)
+
+
+@renderer("study_tips")
+def render_study_tips(content: KnowledgeContent) -> str:
+    lines = ["🎓 Security+ Study Tips:\n\n"]
+    lines += [f"{i}. {tip}\n" for i, tip in enumerate(STUDY_TIPS, 1)]
+    return "".join(lines)
+
+
+@renderer("explanation")
+def render_explanation(content: KnowledgeContent, domain: str, topic: str) -> str:
+    topic_data = content.domains[domain]["topics"][topic]
+    lines = [f"📚 {_title(topic)}\n\n", f"{topic_data.get('description', '')}\n\n"]
+
+    # Every list field except description and key_points, up to 6 items each
+    for field_name, field_data in topic_data.items():
+        if field_name in ("description", "key_points") or not isinstance(field_data, (list, tuple)):
+            continue
+        lines.append(f"{_title(field_name)}:\n")
+        lines += [f"• {item}\n" for item in field_data[:6]]
+        lines.append("\n")
+
+    if "key_points" in topic_data:
+        lines.append("🎯 Key Points:\n")
+        lines += [f"• {point}\n" for point in topic_data["key_points"]]
+    return "".join(lines)
+
+
+@renderer("lesson")
+def render_lesson(content: KnowledgeContent, domain: str, topic: str) -> str:
+    topic_data = content.domains[domain]["topics"][topic]
+    spoken = topic.replace("_", " ")
+    lines = [
+        f"📚 Today's Lesson: {_title(topic)}\n\n",
+        f"Alright class, today we're going to cover {spoken}. This is an important topic for your Security+ exam.\n\n",
+        f"Let me start with the fundamentals. {topic_data.get('description', '')}\n\n",
+        "Let me pause here for a moment so you can write that down.\n\n",
+    ]
+
+    # Every list field except key_points, up to 5 items each
+    field_count = 0
+    for field_name, field_data in topic_data.items():
+        if field_name in ("description", "key_points") or not isinstance(field_data, (list, tuple)):
+            continue
+        field_count += 1
+        display_name = field_name.replace("_", " ")
+        if field_count == 1:
+            lines.append(f"Now, let me walk you through the {display_name} you need to know:\n\n")
+        else:
+            lines.append(f"Next, let's look at the {display_name}:\n\n")
+        lines += [f"{i}. {item}\n" for i, item in enumerate(field_data[:5], 1)]
+        lines.append("\nTake a moment to note these down. These are exam favorites.\n\n")
+
+    if "key_points" in topic_data:
+        lines.append("🎯 Here are the critical points you absolutely must remember:\n\n")
+        lines += [f"• {point}\n" for point in topic_data["key_points"]]
+        lines.append("\nThese often appear on the exam, so highlight them in your notes.\n\n")
+
+    lines.append("Now, before we move on - do you have any questions about what we've covered so far?")
+    return "".join(lines)
+
+
+class RenderCache:
+    """Memoized tool output keyed by (tool, args, content version).
+
+    Args:
+        content: Knowledge content to render from
+        eager: Render every tool for every domain and topic now instead of on first use
+    """
+
+    def __init__(self, content: KnowledgeContent, eager: bool = False):
+        self.content = content
+        self._entries: Dict[Tuple[str, tuple, str], str] = {}
+        self._lock = threading.Lock()
+        if eager:
+            self.fill()
+
+    def render(self, tool: str, *args: str) -> str:
+        """Cached output of ``tool`` for ``args``, rendering it on a miss."""
+        key = (tool, args, self.content.version)
+        text = self._entries.get(key)
+        if text is None:
+            text = RENDERERS[tool](self.content, *args)
+            with self._lock:
+                self._entries[key] = text
+        return text
+
+    def fill(self) -> int:
+        """Render every static tool output for every domain and topic; returns the entry count."""
+        for tool in ("exam_overview", "quiz_domains", "study_tips"):
+            self.render(tool)
+        for domain_id in self.content.domains:
+            self.render("topic_list", domain_id)
+            for topic_key in self.content.domains[domain_id]["topics"]:
+                self.render("explanation", domain_id, topic_key)
+                self.render("lesson", domain_id, topic_key)
+        return len(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_default_render_cache: Optional[RenderCache] = None
+
+
+def default_render_cache() -> RenderCache:
+    """Process-wide cache over the default content, filled per $RENDER_CACHE (eager or lazy)."""
+    global _default_render_cache
+    if _default_render_cache is None:
+        mode = os.getenv("RENDER_CACHE", "eager").lower()
+        if mode not in ("eager", "lazy"):
+            raise ValueError(f"Unknown RENDER_CACHE mode: {mode} (use 'eager' or 'lazy')")
+        _default_render_cache = RenderCache(default_content(), eager=mode == "eager")
+    return _default_render_cache
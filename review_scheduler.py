@@ -0,0 +1,118 @@
+"""
+Review Scheduler
+================
+SM-2 spaced repetition over the practice questions a student has answered.
+
+Every graded answer updates that question's card: the ease factor, the
+interval in days, the run of correct reviews, and the time it is next due. A
+correct answer pushes the question out (1 day, 6 days, then interval x ease); a
+wrong one brings it back tomorrow and lowers its ease. A question comes due
+about when the student would otherwise forget it, so reviews go to those first.
+
+Cards live in progress["reviews"] as ``[ease, interval, reps, due]`` lists and
+are updated by the quiz event reducer, so they are replayed from journals like
+every other statistic. ``ReviewQueue`` keeps a min-heap over due times beside
+them: an updated card is pushed again and its old entry is dropped when it
+surfaces (lazy deletion), so grading and popping the most overdue question are
+both O(log n).
+"""
+
+import datetime
+import heapq
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# SM-2 answer quality (0-5) for a spoken multiple-choice answer, which is only right or wrong
+CORRECT_QUALITY = 4
+WRONG_QUALITY = 1
+DAY = 86400
+
+
+class Card(NamedTuple):
+    ease: float
+    interval: int
+    reps: int
+    due: float
+
+
+def review(card: Optional[Card], correct: bool, at: float) -> Card:
+    """SM-2 update of ``card`` (None for a first answer) after an answer at epoch time ``at``."""
+    ease, interval, reps, _ = card or Card(DEFAULT_EASE, 0, 0, at)
+    quality = CORRECT_QUALITY if correct else WRONG_QUALITY
+    if quality >= 3:
+        interval = 1 if reps == 0 else 6 if reps == 1 else round(interval * ease)
+        reps += 1
+    else:
+        interval, reps = 1, 0
+    miss = 5 - quality
+    ease = max(MIN_EASE, ease + 0.1 - miss * (0.08 + miss * 0.02))
+    return Card(round(ease, 4), interval, reps, at + interval * DAY)
+
+
+def record_answer(cards: Dict[str, list], question_id: str, correct: bool, timestamp: str) -> None:
+    """Apply one graded answer (with its event's ISO timestamp) to a student's cards."""
+    card = cards.get(question_id)
+    at = datetime.datetime.fromisoformat(timestamp).timestamp()
+    cards[question_id] = list(review(Card(*card) if card else None, correct, at))
+
+
+class ReviewQueue:
+    """Due-time heap over a student's cards, which it reads but never changes.
+
+    Args:
+        cards: The student's progress["reviews"] mapping, kept by reference
+    """
+
+    def __init__(self, cards: Dict[str, list]):
+        self._cards = cards
+        self._heap: List[Tuple[float, str]] = [(card[3], qid) for qid, card in cards.items()]
+        heapq.heapify(self._heap)
+
+    def update(self, question_id: str) -> None:
+        """Re-queue a question after its card changed."""
+        card = self._cards.get(question_id)
+        if card is None:
+            return
+        heapq.heappush(self._heap, (card[3], question_id))
+        # Stale entries are dropped lazily; rebuild once they dominate the heap
+        if len(self._heap) > 2 * len(self._cards) + 16:
+            self._heap = [(card[3], qid) for qid, card in self._cards.items()]
+            heapq.heapify(self._heap)
+
+    def due(self, k: int, now: float) -> List[str]:
+        """Up to ``k`` questions due by ``now``, most overdue first.
+
+        They stay queued until an answer reschedules them, so a review that is
+        never answered comes up again.
+        """
+        popped: List[Tuple[float, str]] = []
+        while self._heap and len(popped) < k:
+            entry = self._peek()
+            if entry is None or entry[0] > now:
+                break
+            entry = heapq.heappop(self._heap)
+            # A card re-queued at an unchanged due time leaves a duplicate behind
+            if all(qid != entry[1] for _, qid in popped):
+                popped.append(entry)
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return [qid for _, qid in popped]
+
+    def next_due(self) -> Optional[float]:
+        """When the soonest question comes due, or None if the student has no cards."""
+        entry = self._peek()
+        return entry[0] if entry else None
+
+    def _peek(self) -> Optional[Tuple[float, str]]:
+        # Drop entries for cards that were rescheduled since they were pushed
+        while self._heap:
+            due, qid = self._heap[0]
+            card = self._cards.get(qid)
+            if card is not None and card[3] == due:
+                return self._heap[0]
+            heapq.heappop(self._heap)
+        return None
+
+    def __len__(self) -> int:
+        return len(self._cards)
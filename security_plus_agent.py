@@ -5,24 +5,85 @@ An interactive voice agent that helps students prepare for the CompTIA Security+
 """
 
 from dotenv import load_dotenv
-from livekit import agents
-from livekit.agents import Agent, AgentSession, RunContext
-from livekit.agents.llm import function_tool
+from livekit import agents, rtc
+from livekit.agents import Agent, AgentSession, ModelSettings, RunContext, StopResponse
+from livekit.agents.llm import ChatContext, ChatMessage, function_tool
 from livekit.plugins import openai, deepgram, silero
+import asyncio
 import os
-import json
 import datetime
-import random
-from domains import ALL_DOMAINS
-from security_plus_knowledge_base import PRACTICE_QUESTIONS, DOMAIN_PRACTICE_QUESTIONS
+import time
+from typing import AsyncIterable, List, Optional, Union
+from domains import DOMAIN_MANIFEST
+from kb_snapshot import KnowledgeContent, default_content
+from prewarm import log_memory_usage, prewarm_indexes
+from progress_store import JsonProgressStore, ProgressWriter, default_writer
+from progress_sqlite import SQLiteProgressStore
+from student_progress import new_progress, record, summarize
+from topic_resolver import TopicResolver, default_resolver
+from knowledge_search import KnowledgeIndex, default_index
+from render_cache import RenderCache, default_render_cache
+from lesson_playback import (
+    exam_question_sentences,
+    playing_result,
+    quiz_playing_result,
+    quiz_sentences,
+    sentence_stream,
+    split_sentences,
+)
+from answer_parser import asks_question, exam_command, parse_answer, parse_answers
+from mock_exam import EXAM_QUESTIONS, MockExam, build_exam, domain_weights, exam_report
+from irt import ItemBank, StudentModel, default_item_bank, probability
+from quiz_sampler import Rotation, draw, draw_ranked
+from review_scheduler import ReviewQueue
+from speech_prefetch import SpeechPrefetcher
+from tts_chunker import chunk_stream, pipeline, plan_chunks
+from tts_cache import TTSAudioCache, Voice, cache_key, default_tts_cache
+from audio_clips import ClipLibrary, clip_library
+from voice_cues import SLOW_SPEED, render_cues, set_speed, spoken_text, supports_ssml
 
 # Load environment variables
 load_dotenv(".env")
 
+# Identity of the session's TTS voice, part of every TTS cache key
+TTS_VOICE = Voice(provider="openai", model="gpt-4o-mini-tts", voice="echo")
+
+
+def make_tts() -> openai.TTS:
+    """A TTS client speaking as TTS_VOICE at normal speed."""
+    return openai.TTS(model=TTS_VOICE.model, voice=TTS_VOICE.voice)
+
+
+def audio_clips_for(sample_rate: int, num_channels: int) -> ClipLibrary:
+    """Shared silence and earcon frames as LiveKit audio frames."""
+    return clip_library(
+        sample_rate,
+        num_channels,
+        make_frame=lambda pcm, samples: rtc.AudioFrame(
+            data=pcm,
+            sample_rate=sample_rate,
+            num_channels=num_channels,
+            samples_per_channel=samples,
+        ),
+    )
+
+
 class SecurityPlusTeacher(Agent):
     """Security+ exam teaching assistant with comprehensive knowledge base."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        student_id: str = "default",
+        store: Optional[Union[JsonProgressStore, SQLiteProgressStore]] = None,
+        writer: Optional[ProgressWriter] = None,
+        content: Optional[KnowledgeContent] = None,
+        topic_resolver: Optional[TopicResolver] = None,
+        knowledge_index: Optional[KnowledgeIndex] = None,
+        render_cache: Optional[RenderCache] = None,
+        tts_cache: Optional[TTSAudioCache] = None,
+        item_bank: Optional[ItemBank] = None,
+        prefetch_tts: Optional[openai.TTS] = None,
+    ):
         super().__init__(
             instructions="""
 You are a certified CompTIA Security+ instructor conducting an engaging, voice-based class.  
@@ -108,11 +169,14 @@ Interactive Teaching Requirements:
 - **Ask prediction questions**: "What do you think happens when...?"
 
 When to Use Quizzes:
+- **At the start of a session** call review_due, which quizzes the questions the student is about to forget
 - **Before starting a topic** to assess prior knowledge
 - **During explanations** to check understanding
 - **After completing a concept** to reinforce learning
 - **When students seem confused** to identify knowledge gaps
 - **At the end of sessions** to summarize and test retention
+- **When the student wants exam practice** call start_mock_exam, then answer_mock_exam for each answer; give no hints or explanations until it is graded
+- Pass quiz and exam answers to check_answer and answer_mock_exam exactly as the student said them; they understand "bee", "the second one" or "the worm"
 
 Question Types to Use:
 - **Recall questions**: "What is the purpose of...?"
@@ -183,78 +247,246 @@ Vary structure, tone, and pacing naturally so the class feels spontaneous and re
 
 
 
-        # Initialize knowledge base and tracking from imported data
-        self.knowledge_base = ALL_DOMAINS
-        self.practice_questions = PRACTICE_QUESTIONS
-        self.domain_practice_questions = DOMAIN_PRACTICE_QUESTIONS
-        self.memory_file = "student_memory.json"
+        # Initialize knowledge base and tracking from the shared snapshot (or the modules)
+        content = content or default_content()
+        self.knowledge_base = content.domains
+        # Names, weights and topic keys without importing any domain's content
+        self.domain_manifest = DOMAIN_MANIFEST
+        self.practice_questions = content.questions
+        self.domain_practice_questions = content.domain_questions
+        self.questions_by_id = content.questions_by_id
+        # Resolves spoken domain/topic names ("domain three", "zero trust", "ZTA")
+        self.topic_resolver = topic_resolver or default_resolver()
+        # BM25 index over every knowledge base field, for free-form questions
+        self.knowledge_index = knowledge_index or default_index()
+        # Static tool output (overview, topic lists, explanations, lessons), rendered once per KB version
+        self.render_cache = render_cache or default_render_cache()
+        # Progress is stored per student, keyed by LiveKit participant identity
+        self.student_id = student_id
+        # Saves are queued on a background writer shared by all sessions in this process
+        self.writer = writer or (ProgressWriter(store) if store else default_writer())
+        self.store = self.writer.store
+        # Scripted lessons play through TTS directly ("tts") or come back as text for the LLM ("llm")
+        self.lesson_playback = os.getenv("LESSON_PLAYBACK", "tts")
+        self.lesson_speech = None
+        # Sentence audio shared on disk by every job process (None when TTS_CACHE=off)
+        self.tts_cache = tts_cache if tts_cache is not None else default_tts_cache()
+        # Quiz questions are read straight through TTS ("tts") or by the LLM ("llm")
+        self.quiz_playback = os.getenv("QUIZ_PLAYBACK", "tts")
+        # Warms the cache with upcoming lesson and quiz speech while the current chunk plays.
+        # It has its own TTS client, as [slow] playback changes the session's speed
+        self.prefetch_tts = prefetch_tts
+        # Cache keys of the known text now playing (scripted lessons and quizzes); free-form
+        # LLM replies are never cached, so they cannot push that audio out
+        self.script_keys: set = set()
+        self.prefetcher = (
+            SpeechPrefetcher(self._warm) if self.tts_cache is not None and prefetch_tts is not None else None
+        )
         
         # Initialize student progress
-        self.student_progress = {
-            "questions_answered": 0,
-            "correct_answers": 0,
-            "topics_covered": set(),
-            "sessions_completed": [],
-            "last_session": None,
-            "current_domain": None,
-            "current_topic": None,
-            "quiz_history": [],
-            "weak_areas": [],
-            "strong_areas": []
-        }
+        self.student_progress = new_progress()
         
         # Load previous session data
         self.load_memory()
+        # Spaced-repetition due queue over the cards loaded with progress
+        self.review_queue = ReviewQueue(self.student_progress["reviews"])
+        # IRT abilities over the process-wide question parameters; quizzes pick the most
+        # informative questions ("adaptive") or walk the no-repeat rotation ("rotation")
+        self.item_bank = item_bank or default_item_bank(content.questions)
+        self.student_model = StudentModel(
+            self.item_bank, self.student_progress["ability"], self.student_progress["reviews"]
+        )
+        self.quiz_selection = os.getenv("QUIZ_SELECTION", "adaptive")
+        # Mock exam in progress, drawn by the exam's domain weights, and its time-up notice
+        self.exam_weights = domain_weights(DOMAIN_MANIFEST)
+        self.mock_exam: Optional[MockExam] = None
+        self.exam_timer: Optional[asyncio.TimerHandle] = None
 
     def load_memory(self):
-        """Load student progress and session history from file."""
+        """Load this student's progress (cached per process, else snapshot plus journal tail)."""
         try:
-            if os.path.exists(self.memory_file):
-                with open(self.memory_file, 'r') as f:
-                    data = json.load(f)
-                    # Convert lists back to sets where needed
-                    if 'topics_covered' in data:
-                        data['topics_covered'] = set(data['topics_covered'])
-                    self.student_progress.update(data)
+            self.student_progress = self.writer.load(self.student_id)
         except Exception as e:
-            print(f"Could not load memory file: {e}")
+            print(f"Could not load progress for {self.student_id}: {e}")
+
+    def record_progress(self, event: dict):
+        """Apply a progress event and queue it for the student's journal (never blocks)."""
+        self.writer.append(self.student_id, record(self.student_progress, event))
+
+    def progress_summary(self) -> dict:
+        """Numbers for progress reports, served from the running aggregates in O(1)."""
+        return summarize(self.student_progress)
+
+    async def flush_progress(self, timeout: float = 5.0):
+        """Close out the current session and wait (bounded) for progress to hit disk."""
+        self.end_session()
+        if not await self.writer.flush(timeout=timeout):
+            print(f"Progress for {self.student_id} may not have been fully saved")
     
-    def save_memory(self):
-        """Save student progress and session history to file."""
-        try:
-            # Convert sets to lists for JSON serialization
-            data_to_save = self.student_progress.copy()
-            if 'topics_covered' in data_to_save:
-                data_to_save['topics_covered'] = list(data_to_save['topics_covered'])
-            
-            with open(self.memory_file, 'w') as f:
-                json.dump(data_to_save, f, indent=2, default=str)
-        except Exception as e:
-            print(f"Could not save memory file: {e}")
+    def stop_lesson(self):
+        """Interrupt a scripted lesson or quiz that is still playing, and its prefetching."""
+        if self.lesson_speech is not None and not self.lesson_speech.done():
+            self.lesson_speech.interrupt()
+        self.lesson_speech = None
+        if self.prefetcher is not None:
+            self.prefetcher.cancel()
+
+    def play_script(self, session: AgentSession, sentences: List[str]):
+        """Play known text straight through TTS, prefetching its upcoming chunks."""
+        self.stop_lesson()
+        speech = self.lesson_speech = session.say(sentence_stream(sentences), add_to_chat_ctx=False)
+        if self.tts_cache is None:
+            return speech
+        tts = session.tts
+        plan = plan_chunks("".join(f"{s} " for s in sentences), ssml=supports_ssml(tts))
+        keys = [
+            cache_key(chunk, TTS_VOICE._replace(speed=SLOW_SPEED if slow else 1.0), tts.sample_rate, tts.num_channels)
+            for chunk, slow in plan
+        ]
+        self.script_keys = set(keys)
+        if self.prefetcher is not None:
+            # The prefetch client only speaks at normal speed, so slow chunks are left to
+            # playback, as is the first chunk, which playback streams straight away
+            self.prefetcher.schedule([
+                (key, chunk) for key, (chunk, slow) in list(zip(keys, plan))[1:] if not slow
+            ])
+            speech.add_done_callback(self._speech_done)
+        return speech
+
+    def _speech_done(self, speech):
+        if speech.interrupted and self.prefetcher is not None:
+            self.prefetcher.cancel()
     
+    async def tts_node(self, text: AsyncIterable[str], model_settings: ModelSettings) -> AsyncIterable[rtc.AudioFrame]:
+        """Speak with voice cues executed: [break:Xs] is real silence, [slow] slows the voice, and no tag is read aloud."""
+        tts = self.session.tts
+
+        async def synthesize(chunks, slow):
+            slowed = slow and set_speed(tts, SLOW_SPEED)
+            voice = TTS_VOICE._replace(speed=SLOW_SPEED if slowed else 1.0)
+            # A short first chunk, then longer ones synthesized while the previous one plays
+            frames = pipeline(chunk_stream(chunks), lambda chunk: self._speak(chunk, voice, model_settings))
+            try:
+                async for frame in frames:
+                    yield frame
+            finally:
+                await frames.aclose()
+                if slowed:
+                    set_speed(tts, 1.0)
+
+        clips = self._clips()
+
+        async def silence(seconds):
+            for frame in clips.silence(seconds):
+                yield frame
+
+        async def earcon(name):
+            for frame in clips.earcon(name):
+                yield frame
+
+        async for frame in render_cues(text, synthesize, silence, ssml=supports_ssml(tts), earcon=earcon):
+            yield frame
+
+    async def _speak(self, text: str, voice: Voice, model_settings: ModelSettings):
+        """One chunk of speech; known text comes from the TTS cache when possible, else is synthesized and cached."""
+        tts = self.session.tts
+        key = cache_key(text, voice, tts.sample_rate, tts.num_channels)
+        if self.tts_cache is None or key not in self.script_keys:
+            async for frame in Agent.default.tts_node(self, sentence_stream([text]), model_settings):
+                yield frame
+            return
+
+        sample_bytes = 2 * tts.num_channels
+
+        if self.prefetcher is not None:
+            self.prefetcher.played(key)
+            pending = self.prefetcher.in_flight(key)
+            if pending is not None:
+                # Already synthesizing in the background: wait for it rather than asking twice
+                await asyncio.wait([pending])
+
+        cached = await self.tts_cache.stream_frames(key, self._clips().samples_per_frame * sample_bytes)
+        if cached is not None:
+            try:
+                async for pcm in cached:
+                    yield rtc.AudioFrame(
+                        data=pcm,
+                        sample_rate=tts.sample_rate,
+                        num_channels=tts.num_channels,
+                        samples_per_channel=len(pcm) // sample_bytes,
+                    )
+            finally:
+                # Interrupted playback closes the cached file right away
+                await cached.aclose()
+            return
+
+        # An interrupted chunk leaves the block early and is discarded, not cached
+        async with self.tts_cache.entry(key, tts.sample_rate, tts.num_channels) as entry:
+            async for frame in Agent.default.tts_node(self, sentence_stream([text]), model_settings):
+                entry.write(bytes(frame.data))
+                yield frame
+
+    async def _warm(self, key: str, text: str):
+        """Synthesize a chunk into the TTS cache ahead of playback (see speech_prefetch.py)."""
+        if await asyncio.to_thread(self.tts_cache.__contains__, key):
+            return
+        tts = self.prefetch_tts
+        async with self.tts_cache.entry(key, tts.sample_rate, tts.num_channels) as entry:
+            async with tts.synthesize(text) as stream:
+                async for audio in stream:
+                    entry.write(bytes(audio.frame.data))
+
+    def _clips(self) -> ClipLibrary:
+        """Preallocated silence and earcon frames in the session's TTS output format."""
+        return audio_clips_for(self.session.tts.sample_rate, self.session.tts.num_channels)
+
+    async def _answer_chimes(self, graded: list):
+        """One earcon per graded answer, with a short gap between them."""
+        clips = self._clips()
+        for i, is_correct in enumerate(graded):
+            if i:
+                for frame in clips.silence(0.15):
+                    yield frame
+            for frame in clips.earcon("correct" if is_correct else "incorrect"):
+                yield frame
+
+    async def transcription_node(self, text: AsyncIterable[str], model_settings: ModelSettings) -> AsyncIterable[str]:
+        """Keep cue tags out of the transcript the student sees."""
+        async for delta in spoken_text(text):
+            yield delta
+    
+    def _topic_not_found(self, domain: str) -> str:
+        """Fallback when a topic cannot be resolved: list what the domain offers."""
+        domain = self.topic_resolver.resolve_domain(domain, via_topics=False)
+        if domain is None:
+            return "Use domain_1 through domain_5"
+        available = ", ".join(self.domain_manifest[domain]["topics"])
+        return f"Available topics: {available}"
+
     def start_new_session(self):
         """Initialize a new session and return session continuation message."""
         current_time = datetime.datetime.now().isoformat()
-        session_id = f"session_{len(self.student_progress['sessions_completed']) + 1}_{current_time}"
+        session_id = f"session_{self.student_progress['session_count'] + 1}_{current_time}"
         
+        # Link to the previous session by id only, so session records stay a fixed size
+        last_session = self.student_progress.get("last_session") or {}
         session_info = {
             "session_id": session_id,
             "start_time": current_time,
-            "previous_session": self.student_progress.get("last_session")
+            "previous_session": last_session.get("session_id")
         }
         
-        self.student_progress["current_session"] = session_info
+        self.record_progress({"type": "session_start", "session": session_info})
         
         # Generate continuation message
         if self.student_progress.get("last_session"):
-            last_session = self.student_progress["last_session"]
             topics_covered_count = len(self.student_progress["topics_covered"])
             
             continuation_msg = f"Welcome back! [break:1s] I can see we've been making progress. "
-            continuation_msg += f"You've completed {len(self.student_progress['sessions_completed'])} previous sessions and covered {topics_covered_count} topics. "
+            continuation_msg += f"You've completed {self.student_progress['session_count']} previous sessions and covered {topics_covered_count} topics. "
             
             if self.student_progress.get("current_domain") and self.student_progress.get("current_topic"):
-                domain_name = self.knowledge_base.get(self.student_progress["current_domain"], {}).get('name', 'our last topic')
+                domain_name = self.domain_manifest.get(self.student_progress["current_domain"], {}).get('name', 'our last topic')
                 continuation_msg += f"We were working on {domain_name}. "
             
             continuation_msg += "Let's pick up right where we left off! [break:2s]"
@@ -271,187 +503,117 @@ Vary structure, tone, and pacing naturally so the class feels spontaneous and re
 
     def end_session(self):
         """Save session data and update progress."""
-        current_time = datetime.datetime.now().isoformat()
-        
         if "current_session" in self.student_progress:
-            self.student_progress["current_session"]["end_time"] = current_time
-            self.student_progress["sessions_completed"].append(self.student_progress["current_session"])
-            self.student_progress["last_session"] = self.student_progress["current_session"]
-            del self.student_progress["current_session"]
-        
-        self.save_memory()
+            self.record_progress({
+                "type": "session_end",
+                "end_time": datetime.datetime.now().isoformat()
+            })
 
     @function_tool
     async def get_exam_overview(self, context: RunContext) -> str:
         """Get overview of Security+ exam structure."""
-        overview = "CompTIA Security+ (SY0-701) Exam:\n\n"
-        overview += "• 90 questions (multiple choice and performance-based)\n"
-        overview += "• 90 minutes duration\n"
-        overview += "• Passing Score: 750 (scale 100-900)\n\n"
-        overview += "Domains:\n"
-        
-        for domain_id, domain in self.knowledge_base.items():
-            overview += f"• {domain['name']} - {domain['weight']}\n"
-        
-        return overview
+        return self.render_cache.render("exam_overview")
 
     @function_tool
     async def explain_topic(self, context: RunContext, domain: str, topic: str) -> str:
         """Explain a specific Security+ topic.
         
         Args:
-            domain: Domain number (domain_1 through domain_5)
-            topic: Topic name (e.g., malware, cryptography)
+            domain: Domain (e.g., domain_1, "domain three", "security architecture")
+            topic: Topic name (e.g., malware, cryptography, zero trust)
         """
-        domain = domain.lower().replace(" ", "_")
-        topic = topic.lower().replace(" ", "_")
-        
-        if domain not in self.knowledge_base:
-            return "Use domain_1 through domain_5"
-        
-        domain_data = self.knowledge_base[domain]
-        
-        if topic not in domain_data["topics"]:
-            available = ", ".join(domain_data["topics"].keys())
-            return f"Available topics: {available}"
+        match = self.topic_resolver.resolve_topic(topic, domain)
+        if match is None:
+            return self._topic_not_found(domain)
         
-        topic_data = domain_data["topics"][topic]
-        topic_key = f"{domain}_{topic}"
-        self.student_progress["topics_covered"].add(topic_key)
+        # Track the topic and make it the current domain and topic
+        self.record_progress({"type": "topic", "domain": match.domain, "topic": match.topic, "current": True})
         
-        # Track current domain and topic
-        self.student_progress["current_domain"] = domain
-        self.student_progress["current_topic"] = topic
+        return self.render_cache.render("explanation", match.domain, match.topic)
+
+    @function_tool
+    async def search_knowledge(self, context: RunContext, query: str, top_k: int = 3) -> str:
+        """Search the whole knowledge base for a free-form question (e.g., "what's a compensating control?").
         
-        # Save progress to memory
-        self.save_memory()
+        Use this when the student asks about a concept without naming a domain or topic.
         
-        explanation = f"📚 {topic.replace('_', ' ').title()}\n\n"
-        explanation += f"{topic_data.get('description', '')}\n\n"
+        Args:
+            query: The student's question or key terms
+            top_k: Number of snippets to return (1-5)
+        """
+        top_k = min(max(1, top_k), 5)
+        hits = self.knowledge_index.search(query, top_k)
         
-        # Iterate through all fields except description and key_points
-        for field_name, field_data in topic_data.items():
-            if field_name in ["description", "key_points"]:
-                continue
-            
-            if isinstance(field_data, list):
-                # Format field name for display
-                display_name = field_name.replace("_", " ").title()
-                explanation += f"{display_name}:\n"
-                for item in field_data[:6]:  # Show up to 6 items
-                    explanation += f"• {item}\n"
-                explanation += "\n"
+        if not hits:
+            return f"Nothing in the knowledge base matches \"{query}\". Try list_topics to browse a domain."
         
-        if "key_points" in topic_data:
-            explanation += "🎯 Key Points:\n"
-            for point in topic_data["key_points"]:
-                explanation += f"• {point}\n"
+        result = f"🔎 Knowledge base results for \"{query}\":\n\n"
+        for i, hit in enumerate(hits, 1):
+            domain_name = self.domain_manifest[hit.domain]['name']
+            location = f"{domain_name} › {hit.topic.replace('_', ' ').title()} › {hit.field.replace('_', ' ').title()}"
+            snippet = hit.text if len(hit.text) <= 300 else hit.text[:300].rsplit(" ", 1)[0] + "..."
+            result += f"{i}. {location}\n   {snippet}\n"
         
-        return explanation
+        return result
 
     @function_tool
     async def list_topics(self, context: RunContext, domain: str) -> str:
         """List all topics in a domain.
         
         Args:
-            domain: Domain number (domain_1 through domain_5)
+            domain: Domain (e.g., domain_1 or "domain three")
         """
-        domain = domain.lower().replace(" ", "_")
+        domain = self.topic_resolver.resolve_domain(domain)
         
-        if domain not in self.knowledge_base:
+        if domain is None:
             return "Use: domain_1, domain_2, domain_3, domain_4, or domain_5"
         
-        domain_data = self.knowledge_base[domain]
-        result = f"{domain_data['name']} ({domain_data['weight']})\n\n"
-        
-        for topic_key, topic_data in domain_data["topics"].items():
-            result += f"• {topic_key}: {topic_data['description']}\n"
-        
-        return result
+        return self.render_cache.render("topic_list", domain)
 
     @function_tool
     async def teach_lesson(self, context: RunContext, domain: str, topic: str) -> str:
         """Start a structured lesson on a specific topic with teaching format.
         
         Args:
-            domain: Domain number (domain_1 through domain_5)
-            topic: Topic name (e.g., malware, cryptography)
+            domain: Domain (e.g., domain_1, "domain three", "security architecture")
+            topic: Topic name (e.g., malware, cryptography, zero trust)
         """
-        domain = domain.lower().replace(" ", "_")
-        topic = topic.lower().replace(" ", "_")
+        match = self.topic_resolver.resolve_topic(topic, domain)
+        if match is None:
+            return self._topic_not_found(domain)
         
-        if domain not in self.knowledge_base:
-            return "Use domain_1 through domain_5"
-        
-        domain_data = self.knowledge_base[domain]
+        self.record_progress({"type": "topic", "domain": match.domain, "topic": match.topic})
         
-        if topic not in domain_data["topics"]:
-            available = ", ".join(domain_data["topics"].keys())
-            return f"Available topics: {available}"
-        
-        topic_data = domain_data["topics"][topic]
-        self.student_progress["topics_covered"].add(f"{domain}_{topic}")
-        
-        lesson = f"📚 Today's Lesson: {topic.replace('_', ' ').title()}\n\n"
-        lesson += f"Alright class, today we're going to cover {topic.replace('_', ' ')}. This is an important topic for your Security+ exam.\n\n"
-        lesson += f"Let me start with the fundamentals. {topic_data.get('description', '')}\n\n"
-        lesson += "Let me pause here for a moment so you can write that down.\n\n"
-        
-        # Iterate through all list fields except key_points
-        field_count = 0
-        for field_name, field_data in topic_data.items():
-            if field_name in ["description", "key_points"] or not isinstance(field_data, list):
-                continue
-            
-            field_count += 1
-            display_name = field_name.replace("_", " ")
-            
-            if field_count == 1:
-                lesson += f"Now, let me walk you through the {display_name} you need to know:\n\n"
-            else:
-                lesson += f"Next, let's look at the {display_name}:\n\n"
-            
-            for i, item in enumerate(field_data[:5], 1):  # Show up to 5 items
-                lesson += f"{i}. {item}\n"
-            lesson += "\nTake a moment to note these down. These are exam favorites.\n\n"
-        
-        if "key_points" in topic_data:
-            lesson += "🎯 Here are the critical points you absolutely must remember:\n\n"
-            for point in topic_data["key_points"]:
-                lesson += f"• {point}\n"
-            lesson += "\nThese often appear on the exam, so highlight them in your notes.\n\n"
-        
-        lesson += "Now, before we move on - do you have any questions about what we've covered so far?"
-        
-        return lesson
+        return self.render_cache.render("lesson", match.domain, match.topic)
 
     @function_tool
     async def deliver_scripted_lesson(self, context: RunContext, domain: str, topic: str) -> str:
         """Deliver a pre-written scripted lesson for a topic (if available).
         
         Args:
-            domain: Domain number (domain_1 through domain_5)
-            topic: Topic name (e.g., security_controls, cryptography)
+            domain: Domain (e.g., domain_1, "domain three", "security architecture")
+            topic: Topic name (e.g., security controls, cryptography)
         """
-        domain = domain.lower().replace(" ", "_")
-        topic = topic.lower().replace(" ", "_")
-        
-        if domain not in self.knowledge_base:
-            return "Use domain_1 through domain_5"
+        match = self.topic_resolver.resolve_topic(topic, domain)
+        if match is None:
+            return self._topic_not_found(domain)
         
+        domain, topic = match.domain, match.topic
         domain_data = self.knowledge_base[domain]
-        
-        if topic not in domain_data["topics"]:
-            available = ", ".join(domain_data["topics"].keys())
-            return f"Available topics: {available}"
-        
         topic_data = domain_data["topics"][topic]
         
         # Check if topic has a scripted lesson
         if "scripted_lesson" not in topic_data:
             return f"No scripted lesson available for {topic}. Try using 'teach_lesson' or 'explain_topic' instead."
         
-        self.student_progress["topics_covered"].add(f"{domain}_{topic}")
+        self.record_progress({"type": "topic", "domain": domain, "topic": topic})
+        
+        # Play the script straight through TTS; the LLM only hears that it is playing
+        session = getattr(context, "session", None)
+        if self.lesson_playback == "tts" and session is not None:
+            sentences = split_sentences(topic_data["scripted_lesson"])
+            self.play_script(session, sentences)
+            return playing_result(topic, domain_data['name'], sentences)
         
         # Deliver the scripted lesson
         lesson = f"📚 Scripted Lesson: {topic.replace('_', ' ').title()}\n\n"
@@ -460,6 +622,37 @@ Vary structure, tone, and pacing naturally so the class feels spontaneous and re
         
         return lesson
 
+    def draw_questions(self, pool: str, questions: list, k: int) -> list:
+        """Next k questions from a pool ("all" or a domain ID) for this student.
+
+        Both modes serve the pool without repeats until it is used up. Rotation takes
+        questions in its shuffled order; adaptive selection takes the unseen (or due for
+        review) ones that say the most about the student's current ability.
+        """
+        rotation = self.student_progress["quiz_rotation"].get(pool)
+        rotation = Rotation(**rotation) if rotation else None
+        if self.quiz_selection == "adaptive":
+            index_of = {q['id']: i for i, q in enumerate(questions)}
+            domain = None if pool == "all" else pool
+
+            def rank(n: int, unseen: List[int]) -> List[int]:
+                ids = self.student_model.select(n, [questions[i]['id'] for i in unseen], domain)
+                return [index_of[qid] for qid in ids if qid in index_of]
+
+            indices, rotation = draw_ranked(rotation, len(questions), k, rank)
+        else:
+            indices, rotation = draw(rotation, len(questions), k)
+        self.record_progress({"type": "quiz_served", "pool": pool, **rotation._asdict()})
+        return [questions[i] for i in indices]
+
+    def _present_quiz(self, context: RunContext, title: str, questions: list, quiz_text: str) -> str:
+        """Read the questions straight through TTS when a session is live; else the LLM reads quiz_text."""
+        session = getattr(context, "session", None)
+        if self.quiz_playback != "tts" or session is None:
+            return quiz_text
+        self.play_script(session, quiz_sentences(title, questions))
+        return quiz_playing_result(quiz_text)
+
     @function_tool
     async def quiz_me(self, context: RunContext, num_questions: int = 1) -> str:
         """Start practice quiz.
@@ -468,7 +661,7 @@ Vary structure, tone, and pacing naturally so the class feels spontaneous and re
             num_questions: Number of questions (1-5)
         """
         num_questions = min(max(1, num_questions), 5)
-        questions = random.sample(self.practice_questions, min(num_questions, len(self.practice_questions)))
+        questions = self.draw_questions("all", self.practice_questions, num_questions)
 
         quiz_text = f"Practice Quiz - {num_questions} Question(s)\n\n"
         
@@ -481,16 +674,17 @@ Vary structure, tone, and pacing naturally so the class feels spontaneous and re
         quiz_text += "Tell me your answer(s) - e.g., 'A' or 'B, C, A'"
         context.store_metadata("current_quiz", questions)
         
-        return quiz_text
+        return self._present_quiz(context, "Here is your practice quiz", questions, quiz_text)
 
     @function_tool
     async def quiz_domain(self, context: RunContext, domain: str, num_questions: int = 3) -> str:
         """Start practice quiz for a specific Security+ domain.
         
         Args:
-            domain: Domain number (domain_1 through domain_5)
+            domain: Domain (e.g., domain_1 or "domain three")
             num_questions: Number of questions (1-5)
         """
+        domain = self.topic_resolver.resolve_domain(domain) or domain
         if domain not in self.domain_practice_questions:
             available = ", ".join(self.domain_practice_questions.keys())
             return f"Invalid domain. Available domains: {available}"
@@ -498,10 +692,10 @@ Vary structure, tone, and pacing naturally so the class feels spontaneous and re
         domain_questions = self.domain_practice_questions[domain]
         num_questions = min(max(1, num_questions), 5, len(domain_questions))
         
-        questions = random.sample(domain_questions, num_questions)
+        questions = self.draw_questions(domain, domain_questions, num_questions)
         
         # Get domain name for display
-        domain_name = self.knowledge_base.get(domain, {}).get('name', domain.replace('_', ' ').title())
+        domain_name = self.domain_manifest.get(domain, {}).get('name', domain.replace('_', ' ').title())
         
         quiz_text = f"Practice Quiz - {domain_name}\n"
         quiz_text += f"Questions: {num_questions}\n\n"
@@ -515,80 +709,215 @@ Vary structure, tone, and pacing naturally so the class feels spontaneous and re
         quiz_text += "Tell me your answer(s) - e.g., 'A' or 'B, C, A'"
         context.store_metadata("current_quiz", questions)
         
-        return quiz_text
+        return self._present_quiz(context, f"Practice quiz on {domain_name}", questions, quiz_text)
 
     @function_tool
-    async def list_quiz_domains(self, context: RunContext) -> str:
-        """List all available domains for practice quizzes."""
-        result = "Available Quiz Domains:\n\n"
+    async def review_due(self, context: RunContext, num_questions: int = 3) -> str:
+        """Spaced-repetition review: quiz the questions the student is closest to forgetting.
+
+        Args:
+            num_questions: Number of questions (1-5)
+        """
+        num_questions = min(max(1, num_questions), 5)
+        due = [qid for qid in self.review_queue.due(num_questions, time.time()) if qid in self.questions_by_id]
+        if not due:
+            next_due = self.review_queue.next_due()
+            if next_due is None:
+                return "Nothing to review yet. Questions join the review schedule once they're answered in a quiz."
+            hours = max(1, round((next_due - time.time()) / 3600))
+            return f"Nothing is due for review. The next review comes up in about {hours} hour(s); try a new quiz instead."
+
+        questions = [self.questions_by_id[qid] for qid in due]
+        quiz_text = f"Review Quiz - {len(questions)} Question(s) due\n\n"
         
-        for domain_id, questions in self.domain_practice_questions.items():
-            domain_name = self.knowledge_base.get(domain_id, {}).get('name', domain_id.replace('_', ' ').title())
-            result += f"• {domain_id}: {domain_name} ({len(questions)} questions)\n"
+        for i, q in enumerate(questions, 1):
+            quiz_text += f"Q{i}: {q['question']}\n"
+            for option in q['options']:
+                quiz_text += f"{option}\n"
+            quiz_text += "\n"
         
-        result += "\nUse quiz_domain(domain, num_questions) to start a domain-specific quiz!"
+        quiz_text += "Tell me your answer(s) - e.g., 'A' or 'B, C, A'"
+        context.store_metadata("current_quiz", questions)
         
-        return result
+        return self._present_quiz(context, "Time to review a few questions you've seen before", questions, quiz_text)
+
+    def record_quiz(self, questions: list, answers: list, graded: list, exam: bool = False):
+        """Record graded answers: stats, weak areas, review cards and IRT abilities."""
+        correct = sum(graded)
+        # Abilities and question difficulties move with every answer
+        ability = self.student_model.observe([(q['id'], ok) for q, ok in zip(questions, graded)])
+        
+        # Track quiz performance (also updates weak/strong areas)
+        self.record_progress({
+            "type": "quiz",
+            "timestamp": datetime.datetime.now().isoformat(),
+            "score": correct / len(questions) * 100,
+            "correct": correct,
+            "total": len(questions),
+            "questions": [q['id'] for q in questions],
+            "answers": answers,
+            "results": graded,
+            "ability": ability,
+            "exam": exam,
+        })
+        # The reducer rescheduled every graded card; move them in the due queue
+        for q in questions:
+            self.review_queue.update(q['id'])
+            self.student_model.reschedule(q['id'], self.student_progress["reviews"][q['id']][3])
+
+    def _ask_exam_question(self, session: Optional[AgentSession], note: str = "") -> str:
+        """Read the current mock exam question through TTS when a session is live; else the LLM reads it."""
+        exam = self.mock_exam
+        q = exam.current
+        number, total = exam.position + 1, len(exam.questions)
+        minutes_left = max(1, round(exam.remaining() / 60))
+        text = f"{note}Question {number} of {total} ({minutes_left} min left)\n{q['question']}\n"
+        text += "".join(f"{option}\n" for option in q['options'])
+        if self.quiz_playback != "tts" or session is None:
+            return text + "\nRead this question to the student, then pass their answer to answer_mock_exam."
+        self.play_script(session, split_sentences(note) + exam_question_sentences(number, total, q, minutes_left))
+        return (
+            "This mock exam question is being read to the student right now. Do not read it again, "
+            "hint at the answer or explain it; pass their answer to answer_mock_exam.\n\n" + text
+        )
+
+    def _finish_exam(self) -> str:
+        """Grade the whole exam in one pass and record the questions the student answered."""
+        exam, self.mock_exam = self.mock_exam, None
+        if self.exam_timer is not None:
+            self.exam_timer.cancel()
+            self.exam_timer = None
+        result = exam.grade()
+        answered = [i for i, a in enumerate(exam.answers) if a is not None]
+        if answered:
+            self.record_quiz(
+                [exam.questions[i] for i in answered],
+                [exam.answers[i] for i in answered],
+                [result.results[i] for i in answered],
+                exam=True,
+            )
+        names = {domain: info["name"] for domain, info in self.domain_manifest.items()}
+        report = exam_report(result, names)
+        if len(answered) < result.total:
+            report += f"\nUnanswered (scored as wrong): {result.total - len(answered)}\n"
+        return report + "\nRead the scaled score and domain bands as given; suggest lessons for the weakest domain."
+
+    def _exam_time_up(self, session: AgentSession):
+        if self.mock_exam is not None:
+            session.generate_reply(
+                instructions="Time is up on the mock exam. Tell the student, then call answer_mock_exam with 'done' to grade it."
+            )
+
+    @function_tool
+    async def start_mock_exam(self, context: RunContext, num_questions: int = 90) -> str:
+        """Start a timed mock exam weighted by domain like the real one, one question at a time.
+
+        Args:
+            num_questions: Exam length (10-90; the real exam is 90)
+        """
+        num_questions = min(max(10, num_questions), EXAM_QUESTIONS)
+        self.mock_exam = build_exam(self.domain_practice_questions, self.exam_weights, num_questions)
+        exam = self.mock_exam
+        if self.exam_timer is not None:
+            self.exam_timer.cancel()
+            self.exam_timer = None
+        session = getattr(context, "session", None)
+        if session is not None:
+            self.exam_timer = asyncio.get_running_loop().call_later(exam.remaining(), self._exam_time_up, session)
+        note = f"Mock exam: {len(exam.questions)} questions, {exam.minutes:.0f} minutes. "
+        if len(exam.questions) < num_questions:
+            note += "The question bank limits this exam's length; the domain mix still follows the exam weights. "
+        return self._ask_exam_question(session, note + "Answers are graded at the end.\n")
+
+    @function_tool
+    async def answer_mock_exam(self, context: RunContext, answer: str) -> str:
+        """Answer the current mock exam question and get the next one.
+
+        Args:
+            answer: The student's answer as they said it (e.g. 'B' or 'the worm'), 'skip' to leave it blank, or 'done' to finish early
+        """
+        exam = self.mock_exam
+        if exam is None:
+            return "No mock exam in progress. Use start_mock_exam first!"
+        command = exam_command(answer, exam.current)
+        if exam.remaining() > 0 and command != "done":
+            letter = None if command else parse_answer(answer, exam.current)
+            if letter is None and command != "skip":
+                return (
+                    "Couldn't tell which option the student chose. Ask them again, without hints; "
+                    "they can also skip the question."
+                )
+            exam.answer(letter)
+        if exam.finished or command == "done":
+            return self._finish_exam()
+        return self._ask_exam_question(getattr(context, "session", None))
+
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        """Take a clear mock exam answer straight to the next question, without an LLM turn.
+
+        Anything else (unclear answers, the last question, questions for the tutor) goes
+        to the LLM as usual.
+        """
+        exam = self.mock_exam
+        if exam is None or self.quiz_playback != "tts" or exam.position + 1 >= len(exam.questions):
+            return
+        text = new_message.text_content or ""
+        if asks_question(text):
+            return
+        command = exam_command(text, exam.current)
+        letter = None if command else parse_answer(text, exam.current)
+        if exam.remaining() <= 0 or command == "done" or (letter is None and command != "skip"):
+            return
+        exam.answer(letter)
+        self._ask_exam_question(self.session)
+        raise StopResponse()
+
+    @function_tool
+    async def list_quiz_domains(self, context: RunContext) -> str:
+        """List all available domains for practice quizzes."""
+        return self.render_cache.render("quiz_domains")
 
     @function_tool
     async def check_answer(self, context: RunContext, answer: str) -> str:
         """Check quiz answers.
         
         Args:
-            answer: Your answer(s) (e.g., 'A' or 'B, C, A')
+            answer: The student's answer(s) as they said them (e.g., 'B', 'bee, see, a' or 'the second one')
         """
         current_quiz = context.get_metadata("current_quiz")
         
         if not current_quiz:
             return "No active quiz. Use quiz_me or quiz_domain first!"
         
-        answers = [a.strip().upper() for a in answer.split(",")]
+        # Letters, homophones, ordinals and option text are all graded locally
+        answers = parse_answers(answer, current_quiz)
         
-        if len(answers) != len(current_quiz):
-            return f"Provide {len(current_quiz)} answer(s)"
+        unclear = [f"Q{i}" for i, a in enumerate(answers, 1) if a is None]
+        if unclear:
+            return (
+                f"Couldn't tell which option the student chose for {', '.join(unclear)}. "
+                f"Ask them again; they need {len(current_quiz)} answer(s), one per question."
+            )
         
         results = "📊 Results:\n\n"
         correct_count = 0
+        graded = []
         
         for i, (ans, q) in enumerate(zip(answers, current_quiz), 1):
             is_correct = ans == q['correct']
+            graded.append(is_correct)
             if is_correct:
                 correct_count += 1
-                self.student_progress["correct_answers"] += 1
                 results += f"Q{i}: ✓ Correct!\n"
             else:
                 results += f"Q{i}: ✗ Wrong. Answer: {q['correct']}\n"
             
             results += f"{q['explanation']}\n\n"
-            self.student_progress["questions_answered"] += 1
         
         score = (correct_count / len(current_quiz)) * 100
         results += f"Score: {correct_count}/{len(current_quiz)} ({score:.0f}%)\n"
         
-        # Track quiz performance
-        quiz_result = {
-            "timestamp": datetime.datetime.now().isoformat(),
-            "score": score,
-            "correct": correct_count,
-            "total": len(current_quiz),
-            "questions": current_quiz
-        }
-        self.student_progress["quiz_history"].append(quiz_result)
-        
-        # Update weak/strong areas based on performance
-        if score < 70:
-            if self.student_progress.get("current_domain"):
-                domain = self.student_progress["current_domain"]
-                if domain not in self.student_progress["weak_areas"]:
-                    self.student_progress["weak_areas"].append(domain)
-        elif score >= 90:
-            if self.student_progress.get("current_domain"):
-                domain = self.student_progress["current_domain"]
-                if domain not in self.student_progress["strong_areas"]:
-                    self.student_progress["strong_areas"].append(domain)
-        
-        # Save progress to memory
-        self.save_memory()
+        self.record_quiz(current_quiz, answers, graded)
         
         if score == 100:
             results += "🎉 Perfect!"
@@ -597,37 +926,53 @@ Vary structure, tone, and pacing naturally so the class feels spontaneous and re
         else:
             results += "📚 Keep studying!"
         
+        # Right/wrong chimes play straight away from preallocated audio, with no TTS request
+        session = getattr(context, "session", None)
+        if session is not None:
+            session.say("", audio=self._answer_chimes(graded), add_to_chat_ctx=False)
+            results = (
+                "A chime has already told the student which answers were right. Don't announce "
+                "correct/wrong per question; go straight to the score and the explanations they need.\n\n"
+                + results
+            )
+        
         context.store_metadata("current_quiz", None)
         return results
 
     @function_tool
     async def get_study_tips(self, context: RunContext) -> str:
         """Get study tips for Security+ exam."""
-        tips = "🎓 Security+ Study Tips:\n\n"
-        tips += "1. Understand concepts, don't just memorize\n"
-        tips += "2. Use acronyms (CIA, AAA, etc.)\n"
-        tips += "3. Practice hands-on labs\n"
-        tips += "4. Focus on high-weight domains (25% and 24%)\n"
-        tips += "5. Read questions carefully on exam day\n"
-        tips += "6. Watch for key words: BEST, MOST, FIRST\n"
-        tips += "7. Performance-based questions come first\n"
-        tips += "8. Flag difficult questions and return later\n"
-        return tips
+        return self.render_cache.render("study_tips")
 
     @function_tool
     async def get_progress(self, context: RunContext) -> str:
         """Check your study progress."""
+        summary = self.progress_summary()
         progress = "📈 Your Progress:\n\n"
-        progress += f"Questions Answered: {self.student_progress['questions_answered']}\n"
-        progress += f"Correct: {self.student_progress['correct_answers']}\n"
+        progress += f"Questions Answered: {summary['questions_answered']}\n"
+        progress += f"Correct: {summary['correct_answers']}\n"
         
-        if self.student_progress['questions_answered'] > 0:
-            accuracy = (self.student_progress['correct_answers'] / self.student_progress['questions_answered']) * 100
-            progress += f"Accuracy: {accuracy:.1f}%\n"
+        if summary['accuracy'] is not None:
+            progress += f"Accuracy: {summary['accuracy']:.1f}%\n"
         else:
             progress += "Accuracy: N/A\n"
         
-        progress += f"\nTopics Covered: {len(self.student_progress['topics_covered'])}\n"
+        progress += f"\nTopics Covered: {summary['topics_covered']}\n"
+        
+        if summary['recent_accuracy'] is not None:
+            progress += f"Last {summary['recent_window']} Answers: {summary['recent_accuracy']:.1f}%\n"
+            progress += f"Current Streak: {summary['streak']} (best {summary['best_streak']})\n"
+        
+        if summary['domain_accuracy']:
+            progress += "\nBy Domain:\n"
+            for domain, (correct, total) in summary['domain_accuracy'].items():
+                progress += f"• {domain}: {correct}/{total} ({correct / total * 100:.0f}%)\n"
+        
+        if self.student_progress["ability"]:
+            progress += "\nEstimated Chance on a Typical Question:\n"
+            for domain, theta in sorted(self.student_model.abilities().items()):
+                if domain in self.student_progress["ability"]:
+                    progress += f"• {domain}: {float(probability(theta, 1.0, 0.0)) * 100:.0f}%\n"
         
         return progress
 
@@ -645,30 +990,28 @@ Vary structure, tone, and pacing naturally so the class feels spontaneous and re
     @function_tool
     async def get_session_history(self, context: RunContext) -> str:
         """View your learning session history and progress."""
-        sessions = self.student_progress.get('sessions_completed', [])
+        summary = self.progress_summary()
         
-        if not sessions:
+        if not summary['session_count']:
             return "This is your first session! Let's get started."
         
         history = "📚 Your Learning History:\n\n"
-        history += f"Total Sessions: {len(sessions)}\n"
-        history += f"Topics Covered: {len(self.student_progress['topics_covered'])}\n"
-        history += f"Questions Answered: {self.student_progress['questions_answered']}\n"
+        history += f"Total Sessions: {summary['session_count']}\n"
+        history += f"Topics Covered: {summary['topics_covered']}\n"
+        history += f"Questions Answered: {summary['questions_answered']}\n"
         
-        if self.student_progress['questions_answered'] > 0:
-            accuracy = (self.student_progress['correct_answers'] / self.student_progress['questions_answered']) * 100
-            history += f"Overall Accuracy: {accuracy:.1f}%\n"
+        if summary['accuracy'] is not None:
+            history += f"Overall Accuracy: {summary['accuracy']:.1f}%\n"
         
-        if self.student_progress.get('weak_areas'):
-            history += f"\nAreas to Review: {', '.join(self.student_progress['weak_areas'])}\n"
+        if summary['weak_areas']:
+            history += f"\nAreas to Review: {', '.join(summary['weak_areas'])}\n"
         
-        if self.student_progress.get('strong_areas'):
-            history += f"Strong Areas: {', '.join(self.student_progress['strong_areas'])}\n"
+        if summary['strong_areas']:
+            history += f"Strong Areas: {', '.join(summary['strong_areas'])}\n"
         
         # Show last few sessions
         history += f"\nRecent Sessions:\n"
-        for session in sessions[-3:]:  # Show last 3 sessions
-            start_time = session.get('start_time', 'Unknown')
+        for start_time in summary['recent_sessions']:
             history += f"• Session on {start_time[:10]}\n"
         
         return history
@@ -689,31 +1032,87 @@ Vary structure, tone, and pacing naturally so the class feels spontaneous and re
 
     @function_tool
     async def mark_topic_completed(self, context: RunContext, domain: str, topic: str) -> str:
-        """Mark a topic as completed and track progress."""
-        topic_key = f"{domain}_{topic}"
-        self.student_progress['topics_covered'].add(topic_key)
-        self.student_progress['current_domain'] = domain
-        self.student_progress['current_topic'] = topic
-        self.save_memory()
+        """Mark a topic as completed and track progress.
+        
+        Args:
+            domain: Domain (e.g., domain_1, "domain three", "security architecture")
+            topic: Topic name (e.g., malware, cryptography, zero trust)
+        """
+        match = self.topic_resolver.resolve_topic(topic, domain)
+        if match is None:
+            return self._topic_not_found(domain)
+        
+        domain, topic = match.domain, match.topic
+        self.record_progress({"type": "topic", "domain": domain, "topic": topic, "current": True})
         
         return f"Great! I've marked {topic.replace('_', ' ').title()} as completed. [break:1s] You're making excellent progress through {domain.replace('_', ' ').title()}!"
 
 
+def prewarm(proc: agents.JobProcess):
+    """Build everything a job needs once per process, before the job runs.
+
+    Content, resolver, search index and rendered tool output are frozen (see
+    prewarm.py); the VAD model and progress writer are loaded here so a job only
+    wires references together.
+    """
+    proc.userdata.update(prewarm_indexes())
+    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["progress_writer"] = default_writer()
+    proc.userdata["tts_cache"] = default_tts_cache()
+    proc.userdata["item_bank"] = default_item_bank(proc.userdata["knowledge_content"].questions)
+    # Silence and earcons in the OpenAI TTS output format (24kHz mono)
+    audio_clips_for(24000, 1)
+
+
 async def entrypoint(ctx: agents.JobContext):
     """Entry point for the agent."""
 
+    shared = ctx.proc.userdata
+
     # Configure the voice pipeline with the essentials
     session = AgentSession(
         stt=deepgram.STT(model="nova-2"),
         llm=openai.LLM(model=os.getenv("LLM_CHOICE", "gpt-4.1-mini")),
-        tts=openai.TTS(voice="echo"),
-        vad=silero.VAD.load(),
+        tts=make_tts(),
+        vad=shared["vad"],
     )
 
+    # Progress is tracked per student, so wait for them to join before loading it
+    await ctx.connect()
+    participant = await ctx.wait_for_participant()
+
     # Create teacher instance and start new session
-    teacher = SecurityPlusTeacher()
+    teacher = SecurityPlusTeacher(
+        student_id=participant.identity,
+        writer=shared["progress_writer"],
+        content=shared["knowledge_content"],
+        topic_resolver=shared["topic_resolver"],
+        knowledge_index=shared["knowledge_index"],
+        render_cache=shared["render_cache"],
+        tts_cache=shared["tts_cache"],
+        item_bank=shared["item_bank"],
+        prefetch_tts=make_tts(),
+    )
     session_message = teacher.start_new_session()
 
+    # Make sure queued progress is written before the job process exits
+    ctx.add_shutdown_callback(teacher.flush_progress)
+
+    # Unique memory per job, logged at start and end, shows what each session costs
+    log_memory_usage(f"job {ctx.job.id} start")
+
+    async def log_memory_at_exit():
+        log_memory_usage(f"job {ctx.job.id} end")
+
+    ctx.add_shutdown_callback(log_memory_at_exit)
+
+    # Question difficulties learned in this job outlive the worker; the locked
+    # read-merge-write runs on a thread so it never blocks the event loop
+    async def save_item_bank():
+        await asyncio.to_thread(shared["item_bank"].save)
+
+    ctx.add_shutdown_callback(save_item_bank)
+
     # Start the session
     await session.start(
         room=ctx.room,
@@ -736,4 +1135,4 @@ async def entrypoint(ctx: agents.JobContext):
 
 
 if __name__ == "__main__":
-    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
+    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
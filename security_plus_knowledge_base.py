@@ -9,6 +9,7 @@ This file now contains practice questions organized by domain for targeted quizz
 Features:
 - DOMAIN_PRACTICE_QUESTIONS: Questions organized by Security+ domain (1-5)
 - PRACTICE_QUESTIONS: All questions flattened for general quizzes
+- QUESTIONS_BY_ID: Every question keyed by its stable ID (see question_id)
 - Domain-specific quizzing allows focused practice on particular exam areas
 
 Usage:
@@ -17,6 +18,8 @@ Usage:
 - Use list_quiz_domains() to see available domains and question counts
 """
 
+import hashlib
+
 # The comprehensive knowledge base is now in: domains/domain_1/knowledge.py through domain_5/knowledge.py
 # Agent imports ALL_DOMAINS from domains package instead of using this file's old KNOWLEDGE_BASE
 
@@ -654,7 +657,24 @@ DOMAIN_PRACTICE_QUESTIONS = {
     ],
 }
 
-# Flatten all domain questions for general quizzes
+def question_id(domain_id, question_text):
+    """Stable question ID: '<domain>:<hash of question text>'.
+
+    IDs survive reordering and new questions being added, so quiz history can
+    reference questions by ID instead of copying them.
+    """
+    digest = hashlib.sha1(question_text.encode("utf-8")).hexdigest()[:8]
+    return f"{domain_id}:{digest}"
+
+
+# Flatten all domain questions for general quizzes, tagging each with its domain and ID
 PRACTICE_QUESTIONS = []
-for domain_questions in DOMAIN_PRACTICE_QUESTIONS.values():
+QUESTIONS_BY_ID = {}
+for domain_id, domain_questions in DOMAIN_PRACTICE_QUESTIONS.items():
+    for question in domain_questions:
+        question["domain"] = domain_id
+        question["id"] = question_id(domain_id, question["question"])
+        if question["id"] in QUESTIONS_BY_ID:
+            raise ValueError(f"Duplicate practice question in {domain_id}: {question['question']}")
+        QUESTIONS_BY_ID[question["id"]] = question
     PRACTICE_QUESTIONS.extend(domain_questions)
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Speech Prefetch
+===============
+Synthesizes speech that is about to be played into the TTS cache before
+playback reaches it.
+
+Once a scripted lesson or a quiz starts playing, every chunk tts_node will
+synthesize is known (``tts_chunker.plan_chunks``). Pipelining inside tts_node
+only looks one chunk ahead within a run of speech, and starts over after every
+pause or section cue; the prefetcher covers those transitions. It keeps up to
+``ahead`` chunks past the playback position warm, runs at most
+``max_concurrent`` syntheses at a time, and cancels work that is no longer
+wanted: everything when the student interrupts, and whatever is not part of the
+new plan when the topic changes.
+
+Playback finds a prefetched chunk in the TTS cache, and waits for one that is
+still synthesizing instead of requesting it a second time. The first chunk of a
+plan is never prefetched, since playback streams it at once, and warm-ups use
+their own TTS client at normal speed, so [slow] playback changing the session's
+speed cannot leak slowed audio into the cache under a normal-speed key.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Chunks kept warm past the one playing
+PREFETCH_AHEAD = 3
+# Syntheses running at once per session
+PREFETCH_CONCURRENCY = 2
+
+
+class SpeechPrefetcher:
+    """Background warm-up of upcoming speech chunks for one session.
+
+    Args:
+        warm: Coroutine function ``warm(key, text)`` that synthesizes ``text`` into the cache under ``key``
+        ahead: Chunks to keep warm past the playback position
+        max_concurrent: Syntheses running at once
+    """
+
+    def __init__(
+        self,
+        warm: Callable[[str, str], Awaitable[None]],
+        ahead: int = PREFETCH_AHEAD,
+        max_concurrent: int = PREFETCH_CONCURRENCY,
+    ):
+        self._warm = warm
+        self.ahead = ahead
+        self.max_concurrent = max_concurrent
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._plan: List[Tuple[str, str]] = []
+        self._position = -1
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def schedule(self, items: Sequence[Tuple[str, str]]) -> None:
+        """Replace the plan with ``(key, text)`` chunks in playback order and start warming its head.
+
+        Work for chunks that are not in the new plan is cancelled (a topic change).
+        """
+        keys = {key for key, _ in items}
+        for key, task in list(self._tasks.items()):
+            if key not in keys:
+                task.cancel()
+        self._plan = list(items)
+        self._position = -1
+        self._pump()
+
+    def played(self, key: str) -> None:
+        """Playback has reached ``key``; slide the warm window past it."""
+        for i in range(self._position + 1, len(self._plan)):
+            if self._plan[i][0] == key:
+                self._position = i
+                self._pump()
+                return
+
+    def in_flight(self, key: str) -> Optional[asyncio.Task]:
+        """The running warm-up for ``key``, if any."""
+        return self._tasks.get(key)
+
+    def cancel(self) -> None:
+        """Drop the plan and cancel every warm-up (the student interrupted)."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._plan = []
+        self._position = -1
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def _pump(self) -> None:
+        start = self._position + 1
+        for key, text in self._plan[start:start + self.ahead]:
+            if key not in self._tasks:
+                self._tasks[key] = asyncio.ensure_future(self._run(key, text))
+
+    async def _run(self, key: str, text: str) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        try:
+            async with self._semaphore:
+                await self._warm(key, text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Prefetching speech failed: %s", e)
+        finally:
+            self._tasks.pop(key, None)
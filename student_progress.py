@@ -0,0 +1,297 @@
+"""
+Student Progress Model
+======================
+The shape of a student's progress record and the events that change it.
+
+Tools never mutate progress directly. They build a small event and hand it to
+``apply_event``, which is the single place progress changes. The same function
+replays journaled events on load, so the live state and the state rebuilt from
+disk can never drift apart.
+
+Event types:
+- topic: a topic was studied (optionally becoming the current topic)
+- quiz: a quiz was graded (question IDs, chosen answers and per-question results);
+  a mock exam is one quiz event with "exam" set, and its answers count toward
+  their own domains only, never the current topic
+- quiz_served: questions were drawn from a pool; carries the pool's rotation
+  afterwards (see quiz_sampler.py), so repeats are avoided across sessions
+- session_start / session_end: a class session opened or closed
+
+Every graded answer also updates the question's spaced-repetition card in
+``reviews`` (see review_scheduler.py). Quiz events carry the student's updated
+per-domain IRT abilities (see irt.py), which land in ``ability``.
+
+quiz_history keeps only the most recent quizzes. Older ones are rolled up into
+quiz_rollups, a bounded ring buffer of per-day, per-domain answer counts.
+sessions_completed likewise keeps only the last RECENT_SESSIONS sessions;
+session_count is the running total.
+
+``stats`` holds running aggregates updated in O(1) per graded answer, so reports
+never scan history:
+- domains / topics: [correct, answered] per domain and per topic (answers count
+  toward whichever topic was current when the quiz was graded)
+- recent: ring buffer of the last RECENT_WINDOW results, with a running sum
+- streak / best_streak: consecutive correct answers
+"""
+
+import copy
+
+from review_scheduler import record_answer
+
+# Detailed quiz records kept before the oldest is rolled up
+RECENT_QUIZZES = 50
+# Days of per-domain rollups kept before the oldest day is dropped
+ROLLUP_DAYS = 90
+# Answers included in recent-window accuracy
+RECENT_WINDOW = 20
+# Completed session records kept (reports show the last three; session_count has the total)
+RECENT_SESSIONS = 10
+
+EMPTY_PROGRESS = {
+    "seq": 0,
+    "questions_answered": 0,
+    "correct_answers": 0,
+    "topics_covered": set(),
+    "session_count": 0,
+    "sessions_completed": [],
+    "last_session": None,
+    "current_domain": None,
+    "current_topic": None,
+    "quiz_history": [],
+    "quiz_rollups": [],
+    "weak_areas": [],
+    "strong_areas": [],
+    "quiz_rotation": {},
+    "reviews": {},
+    "ability": {},
+    "stats": {
+        "domains": {},
+        "topics": {},
+        "recent": [],
+        "recent_next": 0,
+        "recent_correct": 0,
+        "streak": 0,
+        "best_streak": 0,
+    },
+}
+
+
+def new_progress() -> dict:
+    """Return a fresh progress record for a student with no history."""
+    return copy.deepcopy(EMPTY_PROGRESS)
+
+
+def from_json(data: dict) -> dict:
+    """Build in-memory progress from a JSON snapshot (lists back to sets)."""
+    progress = new_progress()
+    progress.update(data)
+    progress["topics_covered"] = set(progress["topics_covered"])
+    if "session_count" not in data:
+        progress["session_count"] = len(progress["sessions_completed"])
+    # Records from before the cap kept every session
+    del progress["sessions_completed"][:-RECENT_SESSIONS]
+    # Older records copied whole question dicts into history; keep just the scores
+    for entry in progress["quiz_history"]:
+        if any(isinstance(q, dict) for q in entry.get("questions", [])):
+            del entry["questions"]
+    return progress
+
+
+def to_json(progress: dict) -> dict:
+    """Copy in-memory progress into a JSON-ready snapshot."""
+    data = copy.deepcopy(progress)
+    data["topics_covered"] = sorted(data["topics_covered"])
+    return data
+
+
+def record(progress: dict, event: dict) -> dict:
+    """Stamp an event with the next sequence number and apply it."""
+    event["seq"] = progress["seq"] + 1
+    apply_event(progress, event)
+    return event
+
+
+def apply_event(progress: dict, event: dict) -> None:
+    """Apply one event to progress in place. Events already applied are skipped."""
+    seq = event.get("seq", 0)
+    if seq and seq <= progress["seq"]:
+        return
+
+    handler = _HANDLERS.get(event["type"])
+    if handler is None:
+        raise ValueError(f"Unknown progress event type: {event['type']}")
+    handler(progress, event)
+
+    if seq:
+        progress["seq"] = seq
+
+
+def summarize(progress: dict) -> dict:
+    """Numbers for progress reports, read straight from the running aggregates.
+
+    Both backends keep the same running stats, so this serves JSON and SQLite alike.
+    """
+    answered = progress["questions_answered"]
+    correct = progress["correct_answers"]
+    stats = progress["stats"]
+    recent_total = len(stats["recent"])
+    return {
+        "questions_answered": answered,
+        "correct_answers": correct,
+        "accuracy": (correct / answered) * 100 if answered else None,
+        "recent_accuracy": (stats["recent_correct"] / recent_total) * 100 if recent_total else None,
+        "recent_window": recent_total,
+        "streak": stats["streak"],
+        "best_streak": stats["best_streak"],
+        "topics_covered": len(progress["topics_covered"]),
+        "session_count": progress["session_count"],
+        "recent_sessions": [s.get("start_time", "Unknown") for s in progress["sessions_completed"][-3:]],
+        "weak_areas": list(progress["weak_areas"]),
+        "strong_areas": list(progress["strong_areas"]),
+        "domain_accuracy": {d: tuple(c) for d, c in sorted(stats["domains"].items())},
+        "topic_accuracy": {t: tuple(c) for t, c in sorted(stats["topics"].items())},
+    }
+
+
+def _apply_topic(progress: dict, event: dict) -> None:
+    progress["topics_covered"].add(f"{event['domain']}_{event['topic']}")
+    if event.get("current"):
+        progress["current_domain"] = event["domain"]
+        progress["current_topic"] = event["topic"]
+
+
+def _apply_quiz(progress: dict, event: dict) -> None:
+    progress["questions_answered"] += event["total"]
+    progress["correct_answers"] += event["correct"]
+    progress["ability"].update(event.get("ability", {}))
+    # A mock exam spans every domain, so its answers say nothing about the current topic
+    exam = event.get("exam", False)
+    topic = None
+    if progress.get("current_domain") and progress.get("current_topic") and not exam:
+        topic = f"{progress['current_domain']}_{progress['current_topic']}"
+    for qid, is_correct in zip(event.get("questions", []), event.get("results", [])):
+        if isinstance(qid, str):
+            _count_answer(progress["stats"], question_domain(qid), topic, is_correct)
+            record_answer(progress["reviews"], qid, is_correct, event["timestamp"])
+
+    entry = {key: event[key] for key in ("timestamp", "score", "correct", "total")}
+    # Only question IDs, chosen answers and results are kept (journals written before
+    # question IDs existed carry whole question dicts, which are dropped)
+    questions = event.get("questions", [])
+    if all(isinstance(q, str) for q in questions):
+        entry["questions"] = questions
+        entry["answers"] = event.get("answers", [])
+        entry["results"] = event.get("results", [])
+
+    history = progress["quiz_history"]
+    history.append(entry)
+    if len(history) > RECENT_QUIZZES:
+        _roll_up(progress["quiz_rollups"], history.pop(0))
+
+    # Update weak/strong areas based on performance: an exam by each domain's own
+    # answers, a quiz by its score against the current domain
+    if exam:
+        tallies: dict = {}
+        for qid, is_correct in zip(event.get("questions", []), event.get("results", [])):
+            counts = tallies.setdefault(question_domain(qid), [0, 0])
+            counts[0] += int(is_correct)
+            counts[1] += 1
+        for domain, (correct, total) in tallies.items():
+            _mark_area(progress, domain, correct / total * 100)
+    elif progress.get("current_domain"):
+        _mark_area(progress, progress["current_domain"], event["score"])
+
+
+def _mark_area(progress: dict, domain: str, score: float) -> None:
+    if score < 70:
+        if domain not in progress["weak_areas"]:
+            progress["weak_areas"].append(domain)
+    elif score >= 90:
+        if domain not in progress["strong_areas"]:
+            progress["strong_areas"].append(domain)
+
+
+def question_domain(question_id: str) -> str:
+    """Domain a question ID belongs to (IDs are '<domain>:<hash>')."""
+    return question_id.partition(":")[0]
+
+
+def _count_answer(stats: dict, domain: str, topic, is_correct: bool) -> None:
+    """Fold one graded answer into the running aggregates in O(1)."""
+    hit = int(is_correct)
+    for key, bucket in ((domain, stats["domains"]), (topic, stats["topics"])):
+        if key:
+            counts = bucket.setdefault(key, [0, 0])
+            counts[0] += hit
+            counts[1] += 1
+
+    # Fixed-size ring of recent results: overwrite the oldest slot once full
+    recent = stats["recent"]
+    if len(recent) < RECENT_WINDOW:
+        recent.append(hit)
+    else:
+        slot = stats["recent_next"] % len(recent)
+        stats["recent_correct"] -= recent[slot]
+        recent[slot] = hit
+        stats["recent_next"] = slot + 1
+    stats["recent_correct"] += hit
+
+    stats["streak"] = stats["streak"] + 1 if is_correct else 0
+    stats["best_streak"] = max(stats["best_streak"], stats["streak"])
+
+
+def _roll_up(rollups: list, entry: dict) -> None:
+    """Fold one quiz record into the per-day ring buffer of per-domain [correct, answered]."""
+    day = entry["timestamp"][:10]
+    if not rollups or rollups[-1]["day"] != day:
+        rollups.append({"day": day, "domains": {}})
+        if len(rollups) > ROLLUP_DAYS:
+            rollups.pop(0)
+    domains = rollups[-1]["domains"]
+
+    questions = entry.get("questions") or []
+    results = entry.get("results") or []
+    if len(results) == len(questions) and questions:
+        for qid, is_correct in zip(questions, results):
+            counts = domains.setdefault(question_domain(qid), [0, 0])
+            counts[0] += int(is_correct)
+            counts[1] += 1
+    else:
+        # Legacy records without per-question results only have totals
+        counts = domains.setdefault("unknown", [0, 0])
+        counts[0] += entry["correct"]
+        counts[1] += entry["total"]
+
+
+def _apply_quiz_served(progress: dict, event: dict) -> None:
+    rotation = {key: event[key] for key in ("seed", "cursor", "size")}
+    # Only adaptive selection serves out of order
+    if event.get("ahead"):
+        rotation["ahead"] = list(event["ahead"])
+    progress["quiz_rotation"][event["pool"]] = rotation
+
+
+def _apply_session_start(progress: dict, event: dict) -> None:
+    progress["current_session"] = dict(event["session"])
+
+
+def _apply_session_end(progress: dict, event: dict) -> None:
+    session = progress.pop("current_session", None)
+    if session is None:
+        return
+    session["end_time"] = event["end_time"]
+    progress["session_count"] += 1
+    completed = progress["sessions_completed"]
+    completed.append(session)
+    if len(completed) > RECENT_SESSIONS:
+        del completed[0]
+    progress["last_session"] = session
+
+
+_HANDLERS = {
+    "topic": _apply_topic,
+    "quiz": _apply_quiz,
+    "quiz_served": _apply_quiz_served,
+    "session_start": _apply_session_start,
+    "session_end": _apply_session_end,
+}
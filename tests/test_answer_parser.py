@@ -0,0 +1,96 @@
+"""
+Test script to verify spoken answers are graded to the right option letters
+"""
+
+import json
+import os
+
+from answer_parser import asks_question, exam_command, parse_answer, parse_answers
+from kb_snapshot import default_content
+
+MALWARE = {"id": "t:malware", "options": ["A) Virus", "B) Worm", "C) Trojan", "D) Rootkit"]}
+PHISHING = {"id": "t:phishing", "options": ["A) Phishing", "B) Vishing", "C) Smishing", "D) Spoofing"]}
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "spoken_answers.jsonl")
+
+
+def test_letters_and_homophones():
+    """Plain letters, homophones and NATO words"""
+    for spoken, letter in [("B", "B"), ("bee.", "B"), ("See", "C"), ("dee", "D"), ("a", "A"), ("Charlie", "C")]:
+        assert parse_answer(spoken, MALWARE) == letter, spoken
+
+
+def test_cued_letters_and_ordinals():
+    """Letters after a cue word, and positions"""
+    assert parse_answer("I think it's C", MALWARE) == "C"
+    assert parse_answer("It's a.", MALWARE) == "A"
+    assert parse_answer("I'll go with see", MALWARE) == "C"
+    assert parse_answer("B, because it spreads by itself", MALWARE) == "B"
+    assert parse_answer("the second one", MALWARE) == "B"
+    assert parse_answer("the last one", MALWARE) == "D"
+    assert parse_answer("number three", MALWARE) == "C"
+
+
+def test_weak_letter_forms_are_not_letters_inside_a_sentence():
+    """"a" in "it's a worm" is an article, so the option text decides"""
+    assert parse_answer("I think it's a worm", MALWARE) == "B"
+    assert parse_answer("a rootkit", MALWARE) == "D"
+
+
+def test_option_text_sound_alikes_and_misheard_words():
+    """Phonetic keys pick Phishing for "fishing"; close spellings catch misheard words"""
+    assert parse_answer("fishing", PHISHING) == "A"
+    assert parse_answer("it's vishing", PHISHING) == "B"
+    assert parse_answer("root kit", MALWARE) == "D"
+    assert parse_answer("worn", MALWARE) == "B"
+
+
+def test_unclear_answers_are_not_guessed():
+    """Nothing answer-like gives None, so the student is asked again"""
+    for spoken in ["I don't know", "um, hold on", "", "can you repeat the question?"]:
+        assert parse_answer(spoken, MALWARE) is None, spoken
+
+
+def test_multi_question_answers():
+    """Split on commas, "and" and "then", or read as a run of letters"""
+    quiz = [MALWARE, PHISHING, MALWARE]
+    assert parse_answers("B, C, A", quiz) == ["B", "C", "A"]
+    assert parse_answers("bee see a", quiz) == ["B", "C", "A"]
+    assert parse_answers("worm, fishing and the first one", quiz) == ["B", "A", "A"]
+    assert parse_answers("B", quiz) == [None, None, None]
+
+
+def test_exam_commands_and_questions():
+    """Skip and done are commands; questions to the tutor are not answers"""
+    assert exam_command("skip this one") == "skip"
+    assert exam_command("I'm done") == "done"
+    assert exam_command("B") is None
+    assert exam_command("I don't know, maybe B", MALWARE) is None
+    assert exam_command("I don't know", MALWARE) == "skip"
+    assert asks_question("What does trojan mean?")
+    assert not asks_question("Is it C?")
+
+
+def test_benchmark_corpus():
+    """Every transcribed answer in the benchmark corpus is graded as expected"""
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    for entry in corpus:
+        questions = [{"options": options} for options in entry["options"]]
+        assert parse_answers(entry["transcript"], questions) == entry["expected"], entry["transcript"]
+
+
+def test_options_read_verbatim_grade_as_themselves():
+    """Ordinals and letters inside option text never override the option the student read out"""
+    zero_day = {"id": "t:zero_day", "options": [
+        "A) Unknown vulnerability with no available patch",
+        "B) Virus that activates on January 1st",
+        "C) Exploit that requires zero user interaction",
+        "D) Security flaw in new software releases",
+    ]}
+    assert parse_answer("Virus that activates on January 1st", zero_day) == "B"
+    assert parse_answer("the first one", zero_day) == "A"
+
+    for q in default_content().questions:
+        for option in q["options"]:
+            letter, _, text = option.partition(") ")
+            assert parse_answer(text, q) == letter, option
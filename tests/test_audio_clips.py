@@ -0,0 +1,60 @@
+"""
+Test script to verify preallocated silence and earcon frames
+"""
+
+import asyncio
+from array import array
+
+from audio_clips import FRAME_MS, ClipLibrary
+from voice_cues import render_cues
+
+
+def test_silence_reuses_one_frame():
+    """Any pause length is the same preallocated frame repeated, rounded to whole frames"""
+    clips = ClipLibrary(24000)
+    frames = list(clips.silence(2.0))
+
+    assert len(frames) == 2000 // FRAME_MS
+    assert all(frame is frames[0] for frame in frames)
+    assert frames[0] == bytes(len(frames[0])) and len(frames[0]) == 24000 * FRAME_MS // 1000 * 2
+    assert list(clips.silence(0.004)) == []
+
+
+def test_earcons_are_prebuilt_whole_frames():
+    """Earcons are audible, cut into full frames once, and identical on every play"""
+    clips = ClipLibrary(48000, num_channels=2)
+    correct = clips.earcon("correct")
+
+    assert clips.earcon("correct") is correct
+    assert all(len(frame) == 48000 * FRAME_MS // 1000 * 2 * 2 for frame in correct)
+    assert max(array("h", b"".join(correct))) > 1000
+    assert 0.2 < len(clips.earcon("incorrect")) * FRAME_MS / 1000 < 0.5
+
+
+def test_checkpoint_marker_plays_earcon_then_pause():
+    """A [checkpoint] cue plays its chime and then silence, never reaching TTS"""
+    clips = ClipLibrary(16000)
+
+    async def synthesize(text, slow):
+        async for piece in text:
+            yield piece
+
+    async def silence(seconds):
+        for frame in clips.silence(seconds):
+            yield frame
+
+    async def earcon(name):
+        for frame in clips.earcon(name):
+            yield frame
+
+    async def chunks():
+        yield "Any questions? [checkpoint]"
+
+    async def run():
+        return [f async for f in render_cues(chunks(), synthesize, silence, earcon=earcon)]
+
+    frames = asyncio.run(run())
+    chime = clips.earcon("checkpoint")
+    assert frames[0] == "Any questions? "
+    assert frames[1:1 + len(chime)] == chime
+    assert len(frames) == 1 + len(chime) + 1000 // FRAME_MS
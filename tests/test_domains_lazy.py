@@ -0,0 +1,40 @@
+"""
+Test script to verify lazy domain loading and the domain manifest
+"""
+
+import importlib
+import sys
+
+import domains
+from domains import DOMAIN_MANIFEST, LazyDomains
+
+
+def test_manifest_matches_knowledge_modules():
+    """The manifest's names, weights and topic keys match the knowledge modules"""
+    for domain_id, entry in DOMAIN_MANIFEST.items():
+        knowledge = getattr(importlib.import_module(entry["module"]), entry["attr"])
+        assert entry["name"] == knowledge["name"], domain_id
+        assert entry["weight"] == knowledge["weight"], domain_id
+        assert entry["topics"] == list(knowledge["topics"]), domain_id
+
+
+def test_domains_load_on_first_access():
+    """Listing domains imports nothing; indexing imports only that domain"""
+    for domain_id, entry in DOMAIN_MANIFEST.items():
+        sys.modules.pop(entry["module"], None)
+    lazy = LazyDomains(DOMAIN_MANIFEST)
+
+    assert list(lazy) == ["domain_1", "domain_2", "domain_3", "domain_4", "domain_5"]
+    assert "domain_3" in lazy and len(lazy) == 5
+    assert lazy.loaded() == []
+
+    assert lazy["domain_3"]["name"] == "Security Architecture"
+    assert lazy.loaded() == ["domain_3"]
+    assert "domains.domain_4.knowledge" not in sys.modules
+
+
+def test_legacy_knowledge_names_still_import():
+    """DOMAIN_N_KNOWLEDGE names resolve lazily to the same objects as ALL_DOMAINS"""
+    from domains import DOMAIN_2_KNOWLEDGE
+
+    assert DOMAIN_2_KNOWLEDGE is domains.ALL_DOMAINS["domain_2"]
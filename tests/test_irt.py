@@ -0,0 +1,136 @@
+"""
+Test script to verify the incremental IRT model and information-based selection
+"""
+
+import datetime
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from irt import ItemBank, StudentModel, probability  # noqa: E402
+from quiz_sampler import draw_ranked  # noqa: E402
+from review_scheduler import record_answer  # noqa: E402
+
+
+def bank(per_domain=20, domains=("domain_1", "domain_2"), model="2pl"):
+    return ItemBank(
+        [{"id": f"{d}:{i:04d}", "domain": d} for d in domains for i in range(per_domain)],
+        model=model,
+    )
+
+
+def test_abilities_and_difficulties_converge():
+    """Simulated answers pull the student's ability and each question's difficulty toward the truth"""
+    rng = random.Random(0)
+    items = bank(per_domain=40)
+    true_b = {qid: rng.uniform(-2, 2) for qid in items.ids}
+    students = [StudentModel(items, {}, {}) for _ in range(150)]
+    true_theta = [rng.gauss(0, 1) for _ in students]
+
+    for _ in range(30):
+        for student, theta in zip(students, true_theta):
+            qid = rng.choice(items.ids)
+            correct = rng.random() < probability(theta, 1.0, true_b[qid])
+            student.observe([(qid, correct)])
+
+    estimated = [items.b[items.index[qid]] for qid in items.ids]
+    assert np.corrcoef(estimated, [true_b[qid] for qid in items.ids])[0, 1] > 0.7
+    abilities = [s.abilities()["domain_1"] + s.abilities()["domain_2"] for s in students]
+    assert np.corrcoef(abilities, true_theta)[0, 1] > 0.6
+
+
+def test_observe_reports_changed_domains_only():
+    """Only domains with graded answers come back for the progress event"""
+    items = bank()
+    student = StudentModel(items, {"domain_2": [0.5, 3]}, {})
+    changed = student.observe([("domain_1:0001", True)])
+
+    assert list(changed) == ["domain_1"]
+    assert changed["domain_1"][0] > 0 and changed["domain_1"][1] == 1
+    assert student.abilities()["domain_2"] == 0.5
+
+
+def test_selection_prefers_informative_due_questions():
+    """The most informative questions sit near the student's ability; not-yet-due ones are skipped"""
+    items = bank(per_domain=5, domains=("domain_1",), model="1pl")
+    items.b[:] = [-3.0, -1.0, 0.9, 1.1, 3.5]
+    student = StudentModel(items, {"domain_1": [1.0, 10]}, {"domain_1:0003": [2.5, 6, 2, 2e9]})
+
+    assert student.select(2, items.ids, now=1e9) == ["domain_1:0002", "domain_1:0001"]
+    assert student.select(1, items.ids, domain="domain_1", now=3e9) in (["domain_1:0002"], ["domain_1:0003"])
+
+
+def test_selection_only_serves_unseen_or_due_questions():
+    """Questions already served this rotation come back only once their review is due"""
+    items = bank(per_domain=5, domains=("domain_1",))
+    student = StudentModel(items, {}, {"domain_1:0001": [2.5, 1, 1, 2e9]})
+    unseen = ["domain_1:0002", "domain_1:0003"]
+
+    assert sorted(student.select(5, unseen, now=1e9)) == unseen
+    assert sorted(student.select(5, unseen, now=3e9)) == ["domain_1:0001"] + unseen
+
+
+def test_adaptive_quizzes_never_repeat_within_a_rotation():
+    """Same-day quizzes walk the whole pool, answered or not, before any question comes back"""
+    items = bank(per_domain=15, domains=("domain_1",))
+    student = StudentModel(items, {}, {}, rng=np.random.default_rng(3))
+    cards, rotation, served = {}, None, []
+    now = datetime.datetime(2026, 1, 5, 9)
+
+    def rank(n, unseen):
+        ids = student.select(n, [items.ids[i] for i in unseen], now=now.timestamp())
+        return [items.index[qid] for qid in ids]
+
+    for quiz in range(6):
+        indices, rotation = draw_ranked(rotation, len(items), 5, rank, random.Random(quiz))
+        served.append(indices)
+        # The second quiz is served but never answered
+        if quiz != 1:
+            for i in indices:
+                record_answer(cards, items.ids[i], quiz % 2 == 0, now.isoformat())
+                student.reschedule(items.ids[i], cards[items.ids[i]][3])
+                student.observe([(items.ids[i], quiz % 2 == 0)])
+
+    assert sorted(sum(served[:3], [])) == list(range(15))
+    assert sorted(sum(served[3:], [])) == list(range(15))
+
+
+def test_ties_are_broken_per_student():
+    """With no answers yet every question ties, and new students do not all get the same quiz"""
+    items = bank(per_domain=15, domains=("domain_1", "domain_2", "domain_3"))
+    quizzes = {tuple(sorted(StudentModel(items, {}, {}).select(5, items.ids))) for _ in range(5)}
+    assert len(quizzes) > 1
+
+
+def test_item_parameters_persist(tmp_path):
+    """Saved parameters are matched back by question ID"""
+    items = bank()
+    items.b[3] = 1.25
+    items.count[3] = 7
+    path = str(tmp_path / "items.npz")
+    items.save(path)
+
+    reloaded = bank()
+    assert reloaded.load(path) == len(items)
+    assert reloaded.b[3] == 1.25 and reloaded.count[3] == 7
+
+
+def test_saves_from_several_workers_merge(tmp_path):
+    """Each worker's save adds its own answers to the file instead of overwriting the other's"""
+    path = str(tmp_path / "items.npz")
+    first, second = bank(), bank()
+    first.load(path)
+    second.load(path)
+    first.update(0, 0.0, True)
+    second.update(0, 0.0, True)
+    second.update(1, 0.0, False)
+    first.save(path)
+    second.save(path)
+
+    reloaded = bank()
+    reloaded.load(path)
+    assert reloaded.count[0] == 2 and reloaded.count[1] == 1
+    assert reloaded.b[0] < first.b[0] < 0 and reloaded.b[1] > 0
+    assert np.array_equal(reloaded.b, second.b)
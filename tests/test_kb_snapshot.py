@@ -0,0 +1,44 @@
+"""
+Test script to verify the memory-mapped knowledge base snapshot
+"""
+
+import kb_snapshot
+from domains import ALL_DOMAINS
+from kb_snapshot import KnowledgeSnapshot, build_snapshot, load_content
+from security_plus_knowledge_base import DOMAIN_PRACTICE_QUESTIONS, QUESTIONS_BY_ID
+
+
+def test_snapshot_round_trips_content(tmp_path):
+    """Content loaded from the snapshot equals the content in the modules"""
+    path = build_snapshot(str(tmp_path / "kb.bin"))
+    content = load_content(path)
+
+    assert content.source == path
+    assert list(content.domains) == list(ALL_DOMAINS)
+    assert content.domains["domain_3"] == ALL_DOMAINS["domain_3"]
+    assert content.domain_questions == DOMAIN_PRACTICE_QUESTIONS
+    assert content.questions_by_id == QUESTIONS_BY_ID
+
+
+def test_sections_decode_on_first_access(tmp_path):
+    """Domains are decoded only when read, and only once"""
+    snapshot = KnowledgeSnapshot(build_snapshot(str(tmp_path / "kb.bin")))
+    domains = kb_snapshot.SnapshotDomains(snapshot)
+
+    assert len(domains) == 5 and "domain_5" in domains
+    assert snapshot._decoded == {}
+    assert domains["domain_1"] is domains["domain_1"]
+    assert list(snapshot._decoded) == ["domain/domain_1"]
+    snapshot.close()
+
+
+def test_stale_or_corrupt_snapshot_falls_back_to_modules(tmp_path, monkeypatch):
+    """A snapshot built from other sources, or not a snapshot at all, is ignored"""
+    path = build_snapshot(str(tmp_path / "kb.bin"))
+    monkeypatch.setattr(kb_snapshot, "source_fingerprint", lambda: b"\0" * 32)
+    assert load_content(path).source == "modules"
+
+    garbage = tmp_path / "garbage.bin"
+    garbage.write_bytes(b"not a snapshot")
+    assert load_content(str(garbage)).source == "modules"
+    assert load_content(str(tmp_path / "missing.bin")).domains is ALL_DOMAINS
@@ -0,0 +1,34 @@
+"""
+Test script to verify BM25 search over the knowledge base
+"""
+
+from domains import ALL_DOMAINS
+from knowledge_search import KnowledgeIndex, tokenize
+
+index = KnowledgeIndex(ALL_DOMAINS)
+
+
+def test_every_field_is_indexed():
+    """Descriptions, list items, key points and scripted lessons all become snippets"""
+    fields = {field for _, _, field, _ in index.docs}
+    assert {"description", "key_points", "control_types", "scripted_lesson"} <= fields
+
+
+def test_free_form_question_finds_the_right_snippet():
+    """A spoken-style question returns the matching item with its location"""
+    hit = index.search("what's a compensating control?", top_k=1)[0]
+    assert (hit.domain, hit.topic, hit.field) == ("domain_1", "security_controls", "control_types")
+    assert hit.text.startswith("Compensating")
+
+
+def test_top_k_and_no_match():
+    """Results are capped at top_k, best first, and unknown terms return nothing"""
+    hits = index.search("symmetric asymmetric encryption", top_k=3)
+    assert len(hits) == 3
+    assert hits[0].score >= hits[1].score >= hits[2].score
+    assert index.search("xyzzy plugh") == []
+
+
+def test_tokenize_folds_plurals_and_drops_stopwords():
+    """Query words normalize the same way as indexed text"""
+    assert tokenize("What are the Controls?") == ["control"]
@@ -0,0 +1,44 @@
+"""
+Test script to verify scripted lesson splitting for direct TTS playback
+"""
+
+import asyncio
+
+from domains import ALL_DOMAINS
+from lesson_playback import estimate_seconds, playing_result, sentence_stream, split_sentences
+
+
+def test_split_sentences_keeps_abbreviations_and_cues():
+    """Sentences split on terminal punctuation, not abbreviations; cue lines stand alone"""
+    text = 'Controls vary, e.g. locks and logs. Is that clear?\n[break:1s]\nSay "no prevention is perfect." Next topic'
+    assert split_sentences(text) == [
+        "Controls vary, e.g. locks and logs.",
+        "Is that clear?",
+        "[break:1s]",
+        'Say "no prevention is perfect."',
+        "Next topic",
+    ]
+
+
+def test_scripted_lesson_round_trips_through_the_stream():
+    """Every word of the script reaches the text stream, in order"""
+    script = ALL_DOMAINS["domain_1"]["topics"]["security_controls"]["scripted_lesson"]
+    sentences = split_sentences(script)
+
+    async def collect():
+        return [chunk async for chunk in sentence_stream(sentences)]
+
+    chunks = asyncio.run(collect())
+    assert len(chunks) == len(sentences) > 10
+    assert "".join(chunks).split() == script.split()
+    # The first chunk TTS waits on is one sentence, not the whole script
+    assert len(chunks[0]) < 200
+
+
+def test_playing_result_is_short():
+    """The LLM gets a short status instead of the script"""
+    sentences = split_sentences(ALL_DOMAINS["domain_1"]["topics"]["security_controls"]["scripted_lesson"])
+    result = playing_result("security_controls", "General Security Concepts", sentences)
+
+    assert "Security Controls" in result and len(result) < 400
+    assert estimate_seconds(sentences) > 60
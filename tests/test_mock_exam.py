@@ -0,0 +1,94 @@
+"""
+Test script to verify domain-weighted mock exams and table-based scoring
+"""
+
+import random
+
+from domains import DOMAIN_MANIFEST
+from kb_snapshot import default_content
+from mock_exam import (
+    DOMAIN_BANDS,
+    EXAM_QUESTIONS,
+    PASSING_SCORE,
+    SCALED_SCORES,
+    MockExam,
+    allocate,
+    build_exam,
+    domain_weights,
+    exam_report,
+)
+
+WEIGHTS = domain_weights(DOMAIN_MANIFEST)
+
+
+def test_weights_come_from_the_manifest():
+    """The five domains carry the exam's 12/22/18/28/20% weights"""
+    assert sorted(round(w * 100) for w in WEIGHTS.values()) == [12, 18, 20, 22, 28]
+
+
+def test_full_exam_follows_the_weights():
+    """With enough questions, 90 are split by largest remainder"""
+    counts = allocate(WEIGHTS, EXAM_QUESTIONS, {d: 100 for d in WEIGHTS})
+    assert sum(counts.values()) == EXAM_QUESTIONS
+    for domain, count in counts.items():
+        assert abs(count - EXAM_QUESTIONS * WEIGHTS[domain]) < 1
+
+
+def test_small_bank_shrinks_the_whole_exam():
+    """A domain short of questions shortens the exam instead of skewing its mix"""
+    counts = allocate(WEIGHTS, EXAM_QUESTIONS, {d: 15 for d in WEIGHTS})
+    assert max(counts.values()) <= 15
+    total = sum(counts.values())
+    for domain, count in counts.items():
+        assert abs(count - total * WEIGHTS[domain]) < 1
+
+
+def test_build_exam_draws_distinct_questions_per_domain():
+    """Each domain's share is sampled without replacement from that domain"""
+    content = default_content()
+    exam = build_exam(content.domain_questions, WEIGHTS, rng=random.Random(4))
+    ids = [q["id"] for q in exam.questions]
+    assert len(ids) == len(set(ids))
+    counts = allocate(WEIGHTS, EXAM_QUESTIONS, {d: len(qs) for d, qs in content.domain_questions.items()})
+    for domain, count in counts.items():
+        assert sum(q["domain"] == domain for q in exam.questions) == count
+    assert exam.minutes == len(ids)
+
+
+def test_scaled_score_table():
+    """Zero maps to 100, the pass fraction to 750, a perfect score to 900, monotonically"""
+    for total in (10, 55, EXAM_QUESTIONS):
+        row = SCALED_SCORES[total]
+        assert row[0] == 100 and row[-1] == 900
+        assert all(a <= b for a, b in zip(row, row[1:]))
+    assert SCALED_SCORES[90][72] == PASSING_SCORE
+    assert DOMAIN_BANDS[10][9] == (90, "Strong")
+    assert DOMAIN_BANDS[10][5] == (50, "Needs work")
+
+
+def questions(n, domain="domain_1"):
+    return [{"id": f"{domain}:{i}", "domain": domain, "correct": "A"} for i in range(n)]
+
+
+def test_grading_is_one_batch_pass():
+    """Answers are only judged at the end; skipped questions count as wrong"""
+    exam = MockExam(questions(8) + questions(2, "domain_2"), minutes=10)
+    for letter in ["A"] * 7 + [None, "B", "A"]:
+        assert not exam.finished
+        exam.answer(letter)
+    assert exam.finished
+    result = exam.grade()
+    assert (result.correct, result.total) == (8, 10)
+    assert result.scaled == SCALED_SCORES[10][8] and result.passed
+    assert result.domains == {"domain_1": (7, 8, 88, "Strong"), "domain_2": (1, 2, 50, "Needs work")}
+    report = exam_report(result, {"domain_1": "General Security Concepts"})
+    assert "General Security Concepts: 7/8 (88%)" in report and "domain_2: 1/2" in report
+
+
+def test_exam_ends_when_time_runs_out():
+    """An expired exam is finished and grades the unanswered rest as wrong"""
+    exam = MockExam(questions(5), minutes=5)
+    exam.answer("A")
+    exam.started -= 5 * 60
+    assert exam.remaining() == 0 and exam.finished
+    assert exam.grade().correct == 1
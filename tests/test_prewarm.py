@@ -0,0 +1,53 @@
+"""
+Test script to verify prewarmed, frozen knowledge content
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from kb_snapshot import build_snapshot
+from prewarm import memory_usage
+
+
+def test_prewarm_freezes_content_in_place(tmp_path):
+    """Prewarm freezes the loaded content without copying it, so snapshot domains stay mapped and lazy"""
+    path = build_snapshot(str(tmp_path / "kb.bin"))
+    script = (
+        "import gc, kb_snapshot, prewarm\n"
+        "content = prewarm.prewarm_content()\n"
+        "assert kb_snapshot.default_content() is content is prewarm.prewarm_content()\n"
+        "assert gc.get_freeze_count() > 0\n"
+        "snapshot = content.domains._snapshot\n"
+        "assert not snapshot._mm.closed\n"
+        "assert not [name for name in snapshot._decoded if name.startswith('domain/')]\n"
+        "print(type(content.domains).__name__)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True,
+        env={**os.environ, "KB_SNAPSHOT": path},
+    )
+    assert result.stdout.strip() == "SnapshotDomains"
+
+
+def test_prewarm_indexes_share_process_singletons():
+    """The resolver and index handed to jobs are the process-wide ones"""
+    script = (
+        "import prewarm, topic_resolver, knowledge_search\n"
+        "shared = prewarm.prewarm_indexes()\n"
+        "assert shared['topic_resolver'] is topic_resolver.default_resolver()\n"
+        "assert shared['knowledge_index'] is knowledge_search.default_index()\n"
+        "print(shared['topic_resolver'].resolve_topic('zero trussed').topic)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "zero_trust"
+
+
+def test_memory_usage_reports_unique_memory():
+    """USS is reported alongside RSS on Linux, and never exceeds it"""
+    usage = memory_usage()
+    if usage is None:
+        pytest.skip("smaps_rollup not available")
+    assert 0 < usage["uss"] <= usage["rss"]
@@ -0,0 +1,74 @@
+"""
+Test script to verify the SQLite progress backend
+"""
+
+from progress_sqlite import SQLiteProgressStore
+from student_progress import new_progress, record, summarize
+
+
+def quiz_event(answers, questions):
+    results = [a == q["correct"] for a, q in zip(answers, questions)]
+    return {
+        "type": "quiz",
+        "timestamp": "2024-01-01T00:00:00",
+        "score": sum(results) / len(questions) * 100,
+        "correct": sum(results),
+        "total": len(questions),
+        "questions": [q["id"] for q in questions],
+        "answers": answers,
+        "results": results,
+    }
+
+
+QUESTIONS = [
+    {"id": "domain_1:aaaa0001", "correct": "A"},
+    {"id": "domain_2:bbbb0002", "correct": "B"},
+]
+
+
+def test_load_matches_live_progress(tmp_path):
+    """Counters and profile loaded from SQLite match the in-memory reducer"""
+    store = SQLiteProgressStore(str(tmp_path / "progress.db"))
+    live = new_progress()
+    events = [
+        record(live, {"type": "topic", "domain": "domain_1", "topic": "malware", "current": True}),
+        record(live, {"type": "session_start", "session": {"session_id": "s1", "start_time": "2024-01-01T09:00:00"}}),
+        record(live, quiz_event(["A", "C"], QUESTIONS)),
+        record(live, {"type": "session_end", "end_time": "2024-01-01T10:00:00"}),
+    ]
+    store.append("alice", events)
+
+    loaded = store.load("alice")
+    for field in ("seq", "questions_answered", "correct_answers", "session_count",
+                  "topics_covered", "current_domain", "weak_areas", "last_session", "stats"):
+        assert loaded[field] == live[field], field
+    assert "current_session" not in loaded
+
+
+def test_group_commit(tmp_path):
+    """One batch commits several students, each with its own per-domain stats"""
+    store = SQLiteProgressStore(str(tmp_path / "progress.db"))
+    alice, bob = new_progress(), new_progress()
+
+    store.append_batch({
+        "alice": [record(alice, quiz_event(["A", "C"], QUESTIONS))],
+        "bob": [record(bob, quiz_event(["A", "B"], QUESTIONS))],
+    })
+
+    summary = summarize(store.load("alice"))
+    assert summary["questions_answered"] == 2
+    assert summary["accuracy"] == 50
+    assert summary["domain_accuracy"] == {"domain_1": (1, 1), "domain_2": (0, 1)}
+    assert store.load("bob")["correct_answers"] == 2
+
+
+def test_replayed_events_are_ignored(tmp_path):
+    """Re-sending an already committed batch does not double count"""
+    store = SQLiteProgressStore(str(tmp_path / "progress.db"))
+    live = new_progress()
+    events = [record(live, quiz_event(["A", "B"], QUESTIONS))]
+
+    store.append("alice", events)
+    store.append("alice", events)
+
+    assert store.load("alice")["questions_answered"] == 2
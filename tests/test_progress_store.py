@@ -0,0 +1,182 @@
+"""
+Test script to verify per-student progress persistence
+"""
+
+import asyncio
+import os
+
+from progress_store import JsonProgressStore, ProfileCache, ProgressWriter, student_key
+from student_progress import new_progress, record
+
+
+def topic_event(domain="domain_1", topic="security_controls"):
+    return {"type": "topic", "domain": domain, "topic": topic, "current": True}
+
+
+def quiz_event(correct, total=2):
+    return {
+        "type": "quiz",
+        "timestamp": "2024-01-01T00:00:00",
+        "score": correct / total * 100,
+        "correct": correct,
+        "total": total,
+        "answers": ["A"] * total,
+        "questions": [],
+    }
+
+
+def test_students_are_isolated(tmp_path):
+    """Journaling one student's progress never touches another student's record"""
+    store = JsonProgressStore(root=str(tmp_path))
+    alice, bob = new_progress(), new_progress()
+
+    store.append("alice", [record(alice, quiz_event(1))])
+    store.append("bob", [record(bob, quiz_event(2))])
+
+    assert store.load("alice")["correct_answers"] == 1
+    assert store.load("bob")["correct_answers"] == 2
+    assert store.path_for("alice") != store.path_for("bob")
+    assert store.load("carol") == new_progress()
+
+
+def test_student_key_is_filesystem_safe():
+    """Identities with path separators map to distinct, safe keys"""
+    key = student_key("../../etc/passwd")
+    assert os.sep not in key and "/" not in key
+    assert student_key("a/b") != student_key("a_b")
+
+
+def test_load_replays_snapshot_and_journal_tail(tmp_path):
+    """Replay after compaction matches the live state, and compaction empties the journal"""
+    store = JsonProgressStore(root=str(tmp_path))
+    live = new_progress()
+
+    store.append("alice", [record(live, topic_event()), record(live, quiz_event(0))])
+    store.compact("alice")
+    assert os.path.getsize(store.journal_path_for("alice")) == 0
+
+    store.append("alice", [record(live, quiz_event(2))])
+    loaded = store.load("alice")
+
+    assert loaded == live
+    assert loaded["weak_areas"] == ["domain_1"]
+    assert loaded["questions_answered"] == 4
+
+
+def test_replay_skips_events_already_in_snapshot(tmp_path):
+    """A crash between snapshot and journal truncation does not double-count events"""
+    store = JsonProgressStore(root=str(tmp_path))
+    live = new_progress()
+    store.append("alice", [record(live, quiz_event(1))])
+
+    # Simulate the snapshot landing but the journal never being truncated
+    store.save("alice", {"seq": live["seq"], "questions_answered": 2, "correct_answers": 1})
+
+    assert store.load("alice")["questions_answered"] == 2
+
+
+class CountingStore(JsonProgressStore):
+    """Store that counts how many appends actually reach disk"""
+
+    def __init__(self, root):
+        super().__init__(root=root)
+        self.writes = 0
+
+    def append(self, student_id, events):
+        self.writes += 1
+        return super().append(student_id, events)
+
+
+def test_writer_coalesces_rapid_updates(tmp_path):
+    """Many events inside the coalescing window become a single append"""
+    store = CountingStore(str(tmp_path))
+    writer = ProgressWriter(store, delay=0.05)
+    progress = new_progress()
+
+    async def run():
+        for _ in range(10):
+            writer.append("alice", record(progress, quiz_event(1)))
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+    assert store.writes == 1
+    assert store.load("alice")["questions_answered"] == 20
+
+
+def test_writer_flush_on_shutdown(tmp_path):
+    """flush() writes pending events without waiting for the coalescing delay"""
+    store = CountingStore(str(tmp_path))
+    writer = ProgressWriter(store, delay=60)
+    progress = new_progress()
+
+    async def run():
+        writer.append("bob", record(progress, quiz_event(2)))
+        return await writer.flush(timeout=1.0)
+
+    assert asyncio.run(run()) is True
+    assert store.load("bob")["correct_answers"] == 2
+
+
+def test_writer_compacts_large_journals(tmp_path):
+    """Journals past the size threshold are folded into the snapshot"""
+    store = JsonProgressStore(root=str(tmp_path))
+    writer = ProgressWriter(store, compact_bytes=1)
+    progress = new_progress()
+
+    writer.append("alice", record(progress, quiz_event(1)))
+
+    assert os.path.getsize(store.journal_path_for("alice")) == 0
+    assert store.load("alice") == progress
+
+
+class LoadCountingStore(JsonProgressStore):
+    """Store that counts how many times a record is read and parsed"""
+
+    def __init__(self, root):
+        super().__init__(root=root)
+        self.loads = 0
+
+    def load(self, student_id):
+        self.loads += 1
+        return super().load(student_id)
+
+
+def test_cache_serves_back_to_back_sessions(tmp_path):
+    """A second session for the same student reuses the cached profile, including our own writes"""
+    store = LoadCountingStore(str(tmp_path))
+    writer = ProgressWriter(store)
+
+    progress = writer.load("alice")
+    writer.append("alice", record(progress, quiz_event(1)))
+
+    assert writer.load("alice") is progress
+    assert store.loads == 1
+
+
+def test_cache_reloads_after_external_change(tmp_path):
+    """A write from another worker changes the record's version and invalidates the entry"""
+    store = LoadCountingStore(str(tmp_path))
+    writer = ProgressWriter(store)
+    writer.load("alice")
+
+    other_worker = JsonProgressStore(root=str(tmp_path))
+    other_worker.append("alice", [record(other_worker.load("alice"), quiz_event(2))])
+
+    assert writer.load("alice")["correct_answers"] == 2
+    assert store.loads == 2
+
+
+def test_cache_lru_bound_and_ttl():
+    """The cache evicts least recently used entries and expires stale ones"""
+    cache = ProfileCache(max_entries=2)
+    cache.put("a", {"n": 1}, 1)
+    cache.put("b", {"n": 2}, 1)
+    cache.get("a", 1)
+    cache.put("c", {"n": 3}, 1)
+
+    assert len(cache) == 2
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == {"n": 1}
+
+    cache.ttl = 0
+    assert cache.get("a", 1) is None
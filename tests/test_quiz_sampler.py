@@ -0,0 +1,87 @@
+"""
+Test script to verify no-repeat quiz rotation per student and pool
+"""
+
+import random
+
+from quiz_sampler import RANK_WINDOW, Rotation, draw, draw_ranked, permuted_index
+from student_progress import from_json, new_progress, record, to_json
+
+
+def test_permutation_is_a_bijection():
+    """Every pool size gets each index exactly once per rotation"""
+    rng = random.Random(7)
+    for size in (1, 2, 3, 10, 64, 65, 313, 1000):
+        seed = rng.getrandbits(64)
+        assert sorted(permuted_index(i, size, seed) for i in range(size)) == list(range(size))
+
+
+def test_no_repeats_until_pool_is_exhausted():
+    """Draws walk the whole pool before any question comes back"""
+    rng = random.Random(1)
+    rotation, seen = None, []
+    for _ in range(8):
+        picked, rotation = draw(rotation, 40, 5, rng)
+        seen += picked
+    assert sorted(seen) == list(range(40))
+
+    picked, rotation = draw(rotation, 40, 5, rng)
+    assert rotation.cursor == 5 and len(set(picked)) == 5
+
+
+def test_quiz_straddling_a_reshuffle_has_no_duplicates():
+    """The last question of one rotation and the first of the next never collide in one quiz"""
+    rng = random.Random(3)
+    for _ in range(200):
+        picked, _ = draw(Rotation(rng.getrandbits(64), 9, 10), 10, 5, rng)
+        assert len(set(picked)) == 5
+
+
+def test_bank_growth_joins_next_rotation():
+    """Questions added mid-rotation are served once the current rotation ends"""
+    rng = random.Random(5)
+    picked, rotation = draw(None, 10, 10, rng)
+    picked, rotation = draw(rotation, 12, 12, rng)
+    assert sorted(picked) == list(range(12))
+    assert rotation.size == 12
+
+
+def test_rotation_survives_save_and_reload():
+    """Rotations are recorded as progress events, so the next session continues where this one stopped"""
+    progress = new_progress()
+    picked, rotation = draw(None, 30, 5, random.Random(9))
+    record(progress, {"type": "quiz_served", "pool": "domain_2", **rotation._asdict()})
+
+    reloaded = from_json(to_json(progress))
+    assert Rotation(**reloaded["quiz_rotation"]["domain_2"]) == rotation
+    following, _ = draw(Rotation(**reloaded["quiz_rotation"]["domain_2"]), 30, 25)
+    assert sorted(picked + following) == list(range(30))
+
+
+def test_out_of_order_serving_is_remembered():
+    """Positions served ahead of the cursor are skipped by later draws, and survive a reload"""
+    rng = random.Random(11)
+    picked, rotation = draw_ranked(None, 20, 4, lambda n, unseen: unseen[-n:], rng)
+    assert rotation.cursor == 0 and len(rotation.ahead) == 4
+
+    progress = new_progress()
+    record(progress, {"type": "quiz_served", "pool": "all", **rotation._asdict()})
+    rotation = Rotation(**from_json(to_json(progress))["quiz_rotation"]["all"])
+    rest, rotation = draw(rotation, 20, 16, rng)
+    assert sorted(picked + rest) == list(range(20))
+    assert rotation.cursor == 20 and not rotation.ahead
+
+
+def test_ranked_draws_see_a_bounded_window():
+    """rank only gets the next RANK_WINDOW unseen questions, and a rotation still covers the pool once"""
+    rng = random.Random(12)
+    seen = []
+    _, rotation = draw_ranked(None, 100_000, 5, lambda n, unseen: seen.append(len(unseen)) or unseen[-n:], rng)
+    assert seen == [RANK_WINDOW] and len(rotation.ahead) == 5
+
+    rotation, served = None, []
+    for _ in range(40):
+        picked, rotation = draw_ranked(rotation, 200, 5, lambda n, unseen: unseen[-n:], rng)
+        served += picked
+    assert sorted(served) == list(range(200))
+    assert len(rotation.ahead) < RANK_WINDOW
@@ -0,0 +1,45 @@
+"""
+Test script to verify memoized rendering of static tool output
+"""
+
+import render_cache
+from kb_snapshot import load_content
+from render_cache import RenderCache
+
+content = load_content()
+
+
+def test_lazy_cache_renders_once():
+    """A lazy cache starts empty and returns the same string on repeat calls"""
+    cache = RenderCache(content)
+    assert len(cache) == 0
+
+    first = cache.render("explanation", "domain_1", "zero_trust")
+    assert first.startswith("📚 Zero Trust\n\n")
+    assert "🎯 Key Points:" in first
+    assert cache.render("explanation", "domain_1", "zero_trust") is first
+    assert len(cache) == 1
+
+
+def test_eager_cache_covers_every_domain_and_topic():
+    """Eager fill renders the overview, tips, quiz list, and every topic list, explanation and lesson"""
+    cache = RenderCache(content, eager=True)
+    topics = sum(len(content.domains[d]["topics"]) for d in content.domains)
+
+    assert len(cache) == 3 + len(content.domains) + 2 * topics
+    assert "Security Architecture - 18%" in cache.render("exam_overview")
+    assert len(cache) == 3 + len(content.domains) + 2 * topics
+
+
+def test_entries_are_keyed_by_content_version():
+    """Output rendered from an older knowledge base is not served after the content changes"""
+    cache = RenderCache(content)
+    cache.render("study_tips")
+
+    cache.content = content._replace(version="changed")
+    original = render_cache.STUDY_TIPS[:]
+    try:
+        render_cache.STUDY_TIPS[0] = "Sleep before the exam"
+        assert "1. Sleep before the exam" in cache.render("study_tips")
+    finally:
+        render_cache.STUDY_TIPS[:] = original
@@ -0,0 +1,66 @@
+"""
+Test script to verify SM-2 scheduling and the review due queue
+"""
+
+from review_scheduler import DAY, ReviewQueue, review
+from student_progress import from_json, new_progress, record, to_json
+
+
+def quiz_event(timestamp, questions, results):
+    return {
+        "type": "quiz",
+        "timestamp": timestamp,
+        "score": sum(results) / len(results) * 100,
+        "correct": sum(results),
+        "total": len(results),
+        "questions": questions,
+        "answers": ["A"] * len(results),
+        "results": results,
+    }
+
+
+def test_sm2_intervals():
+    """Right answers space a question out 1, 6, then interval x ease days; a miss resets it"""
+    card = review(None, True, 0)
+    assert (card.interval, card.reps) == (1, 1)
+    card = review(card, True, card.due)
+    assert card.interval == 6
+    card = review(card, True, card.due)
+    assert card.interval == round(6 * 2.5)
+
+    missed = review(card, False, card.due)
+    assert (missed.interval, missed.reps) == (1, 0)
+    assert missed.ease < card.ease
+    assert missed.due == card.due + DAY
+
+
+def test_grading_schedules_cards_and_survives_reload():
+    """check_answer's quiz event updates review cards, which reload with progress"""
+    progress = new_progress()
+    record(progress, quiz_event("2024-03-01T09:00:00", ["domain_1:a", "domain_2:b"], [True, False]))
+    record(progress, quiz_event("2024-03-02T09:00:00", ["domain_1:a"], [True]))
+
+    assert progress["reviews"]["domain_1:a"][1:3] == [6, 2]
+    assert progress["reviews"]["domain_2:b"][1:3] == [1, 0]
+    assert from_json(to_json(progress))["reviews"] == progress["reviews"]
+
+
+def test_queue_pops_most_overdue_first():
+    """Due questions come out in due order; rescheduled ones move and nothing repeats"""
+    cards = {
+        "q1": [2.5, 1, 1, 300.0],
+        "q2": [2.5, 1, 1, 100.0],
+        "q3": [2.5, 1, 1, 200.0],
+        "q4": [2.5, 1, 1, 900.0],
+    }
+    queue = ReviewQueue(cards)
+    assert queue.due(5, now=500) == ["q2", "q3", "q1"]
+    # Unanswered reviews stay due
+    assert queue.due(2, now=500) == ["q2", "q3"]
+
+    cards["q2"] = list(review(None, True, 500))
+    queue.update("q2")
+    cards["q1"][3] = 300.0
+    queue.update("q1")
+    assert queue.due(5, now=500) == ["q3", "q1"]
+    assert queue.next_due() == 200.0
@@ -0,0 +1,92 @@
+"""
+Test script to verify speculative synthesis of upcoming speech
+"""
+
+import asyncio
+
+from lesson_playback import quiz_sentences, sentence_stream
+from speech_prefetch import SpeechPrefetcher
+from tts_chunker import chunk_stream, plan_chunks
+from voice_cues import render_cues
+
+QUESTIONS = [
+    {"question": "Which malware can replicate without user interaction?", "options": ["A) Virus", "B) Worm"]},
+    {"question": "What does CIA stand for?", "options": ["A) Confidentiality, Integrity, Availability", "B) Control"]},
+]
+
+
+def test_plan_matches_what_playback_synthesizes():
+    """plan_chunks predicts the exact chunks tts_node asks for, so prefetched audio is a cache hit"""
+    sentences = quiz_sentences("Practice quiz", QUESTIONS) + ["[slow]Take your time.[/slow]"]
+    synthesized = []
+
+    async def synthesize(chunks, slow):
+        async for chunk in chunk_stream(chunks):
+            synthesized.append((chunk, slow))
+        return
+        yield
+
+    async def silence(seconds):
+        return
+        yield
+
+    async def play():
+        async for _ in render_cues(sentence_stream(sentences), synthesize, silence):
+            pass
+
+    asyncio.run(play())
+    assert plan_chunks("".join(f"{s} " for s in sentences)) == synthesized
+    assert synthesized[-1] == ("Take your time.", True)
+
+
+def test_prefetch_window_and_concurrency():
+    """At most max_concurrent syntheses run, and only `ahead` chunks past playback are warmed"""
+    running, peak, warmed = 0, 0, []
+
+    async def warm(key, text):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        warmed.append(key)
+
+    async def run():
+        prefetcher = SpeechPrefetcher(warm, ahead=3, max_concurrent=2)
+        prefetcher.schedule([(str(i), f"chunk {i}") for i in range(10)])
+        await asyncio.sleep(0.05)
+        assert sorted(warmed) == ["0", "1", "2"]
+        prefetcher.played("4")
+        await asyncio.sleep(0.05)
+        assert sorted(warmed) == ["0", "1", "2", "5", "6", "7"]
+
+    asyncio.run(run())
+    assert peak == 2
+
+
+def test_topic_change_and_interrupt_cancel_work():
+    """A new plan cancels chunks it no longer needs; an interruption cancels everything"""
+    cancelled = []
+
+    async def warm(key, text):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(key)
+            raise
+
+    async def run():
+        prefetcher = SpeechPrefetcher(warm, ahead=2, max_concurrent=2)
+        prefetcher.schedule([("a", "A"), ("b", "B")])
+        await asyncio.sleep(0)
+        prefetcher.schedule([("b", "B"), ("c", "C")])
+        await asyncio.sleep(0)
+        assert cancelled == ["a"]
+        assert prefetcher.in_flight("b") is not None
+
+        prefetcher.cancel()
+        await asyncio.sleep(0)
+        assert sorted(cancelled) == ["a", "b", "c"]
+        assert len(prefetcher) == 0
+
+    asyncio.run(run())
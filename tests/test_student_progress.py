@@ -0,0 +1,121 @@
+"""
+Test script to verify the progress event reducer and quiz history rollups
+"""
+
+import student_progress
+from security_plus_knowledge_base import DOMAIN_PRACTICE_QUESTIONS, QUESTIONS_BY_ID, question_id
+from student_progress import from_json, new_progress, record, summarize, to_json
+
+
+def quiz_event(day, questions, results):
+    return {
+        "type": "quiz",
+        "timestamp": f"{day}T12:00:00",
+        "score": sum(results) / len(results) * 100,
+        "correct": sum(results),
+        "total": len(results),
+        "questions": questions,
+        "answers": ["A"] * len(results),
+        "results": results,
+    }
+
+
+def test_question_ids_are_stable_and_unique():
+    """Every practice question has a unique ID derived from its domain and text"""
+    total = sum(len(questions) for questions in DOMAIN_PRACTICE_QUESTIONS.values())
+    assert len(QUESTIONS_BY_ID) == total
+
+    q = DOMAIN_PRACTICE_QUESTIONS["domain_2"][0]
+    assert q["id"] == question_id("domain_2", q["question"])
+    assert q["id"].startswith("domain_2:")
+
+
+def test_history_stores_ids_not_question_dicts():
+    """Quiz history keeps question IDs and answers, never question text"""
+    progress = new_progress()
+    record(progress, quiz_event("2024-01-01", ["domain_1:aaaa0001"], [True]))
+
+    entry = progress["quiz_history"][0]
+    assert entry["questions"] == ["domain_1:aaaa0001"]
+    assert entry["answers"] == ["A"]
+    assert all(not isinstance(q, dict) for q in entry["questions"])
+
+
+def test_old_history_rolls_up_into_bounded_ring(monkeypatch):
+    """History past the recent window rolls into per-day, per-domain counts with a day cap"""
+    monkeypatch.setattr(student_progress, "RECENT_QUIZZES", 2)
+    monkeypatch.setattr(student_progress, "ROLLUP_DAYS", 2)
+    progress = new_progress()
+
+    for day in ("2024-01-01", "2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"):
+        record(progress, quiz_event(day, ["domain_1:aaaa0001", "domain_3:cccc0003"], [True, False]))
+
+    assert [q["timestamp"][:10] for q in progress["quiz_history"]] == ["2024-01-04", "2024-01-05"]
+    assert progress["quiz_rollups"] == [
+        {"day": "2024-01-02", "domains": {"domain_1": [1, 1], "domain_3": [0, 1]}},
+        {"day": "2024-01-03", "domains": {"domain_1": [1, 1], "domain_3": [0, 1]}},
+    ]
+    # Lifetime counters are unaffected by rolling up
+    assert progress["questions_answered"] == 12
+
+
+def test_legacy_history_drops_question_dicts():
+    """Snapshots from before question IDs lose the copied question dicts on load"""
+    legacy = {"quiz_history": [{"timestamp": "2024-01-01", "score": 100, "correct": 1, "total": 1,
+                                "questions": [{"question": "Q?", "options": [], "correct": "A"}]}]}
+    progress = from_json(legacy)
+    assert "questions" not in progress["quiz_history"][0]
+    assert to_json(progress)["quiz_history"][0]["total"] == 1
+
+
+def test_running_stats_track_domains_topics_and_recent_window(monkeypatch):
+    """Each graded answer updates per-domain, per-topic, recent-window and streak stats"""
+    monkeypatch.setattr(student_progress, "RECENT_WINDOW", 3)
+    progress = new_progress()
+    record(progress, {"type": "topic", "domain": "domain_1", "topic": "malware", "current": True})
+
+    record(progress, quiz_event("2024-01-01", ["domain_1:a", "domain_2:b"], [False, True]))
+    record(progress, quiz_event("2024-01-01", ["domain_1:a", "domain_1:c"], [True, True]))
+
+    summary = summarize(progress)
+    assert summary["domain_accuracy"] == {"domain_1": (2, 3), "domain_2": (1, 1)}
+    assert summary["topic_accuracy"] == {"domain_1_malware": (3, 4)}
+    # Only the last three answers (True, True, True) are in the window
+    assert summary["recent_window"] == 3
+    assert summary["recent_accuracy"] == 100
+    assert summary["streak"] == 3 and summary["best_streak"] == 3
+    assert summary["accuracy"] == 75
+
+
+def test_mock_exam_counts_toward_each_domain_not_the_current_topic():
+    """An exam marks weak/strong areas by each domain's own answers and leaves topic stats alone"""
+    progress = new_progress()
+    record(progress, {"type": "topic", "domain": "domain_1", "topic": "malware", "current": True})
+    questions = ["domain_1:a", "domain_1:b", "domain_4:c", "domain_4:d", "domain_4:e"]
+    record(progress, {**quiz_event("2024-01-01", questions, [True, True, False, False, True]), "exam": True})
+
+    summary = summarize(progress)
+    assert summary["topic_accuracy"] == {}
+    assert summary["domain_accuracy"] == {"domain_1": (2, 2), "domain_4": (1, 3)}
+    assert summary["weak_areas"] == ["domain_4"]
+    assert summary["strong_areas"] == ["domain_1"]
+
+
+def test_completed_sessions_are_capped(monkeypatch):
+    """Only the most recent sessions are kept; the running count keeps the total"""
+    monkeypatch.setattr(student_progress, "RECENT_SESSIONS", 3)
+    progress = new_progress()
+    for i in range(5):
+        record(progress, {"type": "session_start", "session": {"session_id": f"s{i}", "start_time": f"t{i}"}})
+        record(progress, {"type": "session_end", "end_time": f"e{i}"})
+
+    assert [s["session_id"] for s in progress["sessions_completed"]] == ["s2", "s3", "s4"]
+    summary = summarize(progress)
+    assert summary["session_count"] == 5
+    assert summary["recent_sessions"] == ["t2", "t3", "t4"]
+
+    legacy = to_json(progress)
+    legacy["sessions_completed"] = [{"session_id": f"old{i}"} for i in range(6)]
+    del legacy["session_count"]
+    reloaded = from_json(legacy)
+    assert reloaded["session_count"] == 6 and len(reloaded["sessions_completed"]) == 3
@@ -0,0 +1,52 @@
+"""
+Test script to verify spoken domain/topic names resolve to knowledge base keys
+"""
+
+import time
+
+from domains import ALL_DOMAINS
+from topic_resolver import TopicResolver
+
+resolver = TopicResolver(ALL_DOMAINS)
+
+
+def test_domain_aliases():
+    """Domain numbers, spoken numbers, names and mishearings resolve to domain keys"""
+    assert resolver.resolve_domain("domain_3") == "domain_3"
+    assert resolver.resolve_domain("Domain three") == "domain_3"
+    assert resolver.resolve_domain("domain tree") == "domain_3"
+    assert resolver.resolve_domain("security architecture") == "domain_3"
+    assert resolver.resolve_domain("securty archetecture") == "domain_3"
+    assert resolver.resolve_domain("zero trust") == "domain_1"
+    assert resolver.resolve_domain("zero trust", via_topics=False) is None
+
+
+def test_topic_aliases_and_fuzzy_matches():
+    """Topic keys, aliases and STT mishearings resolve to (domain, topic)"""
+    cases = {
+        "zero trust": ("domain_1", "zero_trust"),
+        "ZTA": ("domain_1", "zero_trust"),
+        "zero trussed": ("domain_1", "zero_trust"),
+        "crypto graphy": ("domain_1", "cryptography"),
+        "Security Controls": ("domain_1", "security_controls"),
+        "incident response": ("domain_4", "modifying_enterprise_capabilities"),
+    }
+    for text, expected in cases.items():
+        match = resolver.resolve_topic(text)
+        assert match is not None and (match.domain, match.topic) == expected, text
+
+
+def test_topic_in_wrong_domain_still_resolves():
+    """A topic named under the wrong domain resolves to the domain that holds it"""
+    match = resolver.resolve_topic("malware", "domain_1")
+    assert (match.domain, match.topic) == ("domain_2", "malicious_activity")
+
+
+def test_unknown_topic_and_speed():
+    """Nonsense does not resolve, and lookups stay well under a millisecond"""
+    assert resolver.resolve_topic("banana bread") is None
+
+    start = time.perf_counter()
+    for _ in range(200):
+        resolver.resolve_topic("zero trussed architecture")
+    assert (time.perf_counter() - start) / 200 < 0.001
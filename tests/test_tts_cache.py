@@ -0,0 +1,107 @@
+"""
+Test script to verify the on-disk TTS audio cache
+"""
+
+import asyncio
+import os
+
+from tts_cache import READ_FRAMES, TTSAudioCache, Voice, cache_key
+
+VOICE = Voice(provider="openai", model="gpt-4o-mini-tts", voice="echo")
+
+
+def test_cache_key_ignores_whitespace_but_not_voice():
+    """The same sentence keys the same regardless of spacing; speed and format change the key"""
+    key = cache_key("Zero trust  means\nverify.", VOICE, 24000, 1)
+    assert key == cache_key(" Zero trust means verify. ", VOICE, 24000, 1)
+    assert key != cache_key("Zero trust means verify.", VOICE._replace(speed=0.85), 24000, 1)
+    assert key != cache_key("Zero trust means verify.", VOICE, 48000, 1)
+
+
+def test_entry_round_trip(tmp_path):
+    """Written audio streams back in frame-sized pieces"""
+    cache = TTSAudioCache(str(tmp_path), max_bytes=2**20)
+    key = cache_key("Hello.", VOICE, 24000, 1)
+    assert cache.frames(key, 960) is None
+
+    with cache.entry(key, 24000, 1) as entry:
+        entry.write(b"\x01" * 960)
+        entry.write(b"\x02" * 500)
+
+    pieces = list(cache.frames(key, 960))
+    assert [len(p) for p in pieces] == [960, 500]
+    assert pieces[0] == b"\x01" * 960
+
+
+def test_interrupted_entry_is_not_published(tmp_path):
+    """Audio from a sentence cut off mid-synthesis never becomes a cache hit"""
+    cache = TTSAudioCache(str(tmp_path), max_bytes=2**20)
+    key = cache_key("Interrupted.", VOICE, 24000, 1)
+    try:
+        with cache.entry(key, 24000, 1) as entry:
+            entry.write(b"\x01" * 960)
+            raise asyncio.CancelledError()
+    except asyncio.CancelledError:
+        pass
+
+    assert cache.frames(key, 960) is None
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Passing the size budget removes the oldest entries; a hit keeps an entry fresh"""
+    cache = TTSAudioCache(str(tmp_path), max_bytes=3000)
+    keys = [cache_key(f"Sentence {i}.", VOICE, 24000, 1) for i in range(3)]
+    for age, key in enumerate(keys[:2]):
+        with cache.entry(key, 24000, 1) as entry:
+            entry.write(b"\0" * 1000)
+        os.utime(cache.path_for(key), (1000 + age, 1000 + age))
+    list(cache.frames(keys[0], 960))
+
+    with cache.entry(keys[2], 24000, 1) as entry:
+        entry.write(b"\0" * 1000)
+
+    assert cache.frames(keys[1], 960) is None
+    assert cache.frames(keys[0], 960) is not None
+    assert cache.frames(keys[2], 960) is not None
+
+
+def test_async_entries_and_reads_run_off_the_event_loop(tmp_path, monkeypatch):
+    """async with publishes on a worker thread, hits stream back, and the directory is scanned once"""
+    cache = TTSAudioCache(str(tmp_path), max_bytes=2500)
+    scans = []
+    scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or scan())
+    keys = [cache_key(f"Sentence {i}.", VOICE, 24000, 1) for i in range(5)]
+
+    async def play():
+        for key in keys:
+            async with cache.entry(key, 24000, 1) as entry:
+                entry.write(b"\0" * 1000)
+        streams = [await cache.stream_frames(key, 960) for key in keys]
+        return streams[:3], [piece async for piece in streams[4]]
+
+    missing, pieces = asyncio.run(play())
+    assert missing == [None, None, None]
+    assert [len(p) for p in pieces] == [960, 40]
+    assert len(scans) == 1
+
+
+def test_hits_stream_in_fixed_size_reads(tmp_path, monkeypatch):
+    """A long entry is read READ_FRAMES frames at a time, not loaded whole before the first frame"""
+    cache = TTSAudioCache(str(tmp_path), max_bytes=2**20)
+    key = cache_key("A long lesson sentence.", VOICE, 24000, 1)
+    with cache.entry(key, 24000, 1) as entry:
+        entry.write(b"\0" * 960 * (READ_FRAMES * 3 + 1))
+    reads = []
+    to_thread = asyncio.to_thread
+    monkeypatch.setattr(asyncio, "to_thread", lambda fn, *args: reads.append(args) or to_thread(fn, *args))
+
+    async def first_frame():
+        stream = await cache.stream_frames(key, 960)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert len(asyncio.run(first_frame())) == 960
+    assert reads == [(key,), (960 * READ_FRAMES,)]
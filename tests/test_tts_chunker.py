@@ -0,0 +1,104 @@
+"""
+Test script to verify TTS chunking and pipelined synthesis
+"""
+
+import asyncio
+
+from tts_chunker import TextChunker, chunk_stream, pipeline
+
+LESSON = (
+    "Let's be real, no prevention is ever perfect, and attackers know it well. "
+    "So what happens next? Detective controls come in. "
+    "Their job is to identify the incident. Logs create the evidence trail. "
+    "Reviewing those logs spots anomalies. A guard patrols the grounds. "
+    "A motion detector trips an alarm. They tell you it is happening."
+)
+
+
+def chunks_of(pieces):
+    chunker = TextChunker()
+    chunks = []
+    for piece in pieces:
+        chunks += chunker.feed(piece)
+    return chunks + chunker.close()
+
+
+def test_first_chunk_is_short_and_chunks_grow():
+    """A long first sentence is cut at a clause; later chunks are whole sentences and get longer"""
+    chunks = chunks_of([LESSON])
+    assert chunks[0] == "Let's be real, no prevention is ever perfect,"
+    assert chunks[1].startswith("and attackers know it well.")
+    assert len(chunks[1]) > len(chunks[0])
+    assert all(chunk.endswith((".", "?")) for chunk in chunks[1:])
+    assert " ".join(chunks) == LESSON
+
+
+def test_chunks_do_not_depend_on_how_text_arrives():
+    """Streaming word by word gives the same chunks as one piece, so TTS cache keys are stable"""
+    words = [word + " " for word in LESSON.split(" ")]
+    assert chunks_of(words) == chunks_of([LESSON])
+
+
+def test_first_clause_is_emitted_before_its_sentence_ends():
+    """The opening clause goes to TTS as soon as it is known, without waiting for the period"""
+    chunker = TextChunker()
+    assert chunker.feed("Let's be real, no prevention is ever perfect, and attackers kno") == [
+        "Let's be real, no prevention is ever perfect,"
+    ]
+
+
+def test_lines_are_boundaries():
+    """Headings and list items without punctuation still end a chunk"""
+    chunks = chunks_of(["📚 Zero Trust\n\nNever trust, always verify\n• Control plane\n• Data plane\n"])
+    assert chunks[0] == "📚 Zero Trust"
+
+
+def test_pipeline_synthesizes_ahead_in_order():
+    """The next chunk synthesizes while the current one plays; frames stay in chunk order"""
+    started = []
+
+    async def synthesize(text):
+        started.append(text)
+        await asyncio.sleep(0.01)
+        for i in range(3):
+            yield f"{text}-{i}"
+
+    async def texts():
+        for text in ["a", "b", "c"]:
+            yield text
+
+    async def run():
+        frames = []
+        async for frame in pipeline(texts(), synthesize):
+            if frame == "a-0":
+                await asyncio.sleep(0)
+                assert started == ["a", "b"]
+            frames.append(frame)
+        return frames
+
+    assert asyncio.run(run()) == [f"{t}-{i}" for t in "abc" for i in range(3)]
+
+
+def test_closing_pipeline_cancels_synthesis():
+    """An interruption cancels chunks still synthesizing"""
+    cancelled = []
+
+    async def synthesize(text):
+        try:
+            yield text
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(text)
+            raise
+
+    async def texts():
+        for text in ["a", "b"]:
+            yield text
+
+    async def run():
+        frames = pipeline(chunk_stream(texts()), synthesize)
+        assert await frames.__anext__() == "ab"
+        await frames.aclose()
+
+    asyncio.run(run())
+    assert cancelled == ["ab"]
@@ -0,0 +1,81 @@
+"""
+Test script to verify voice cue parsing and execution
+"""
+
+import asyncio
+
+from voice_cues import (
+    MAX_PAUSE,
+    CueParser,
+    Marker,
+    Pause,
+    Speech,
+    parse_cues,
+    render_cues,
+)
+
+
+def test_parse_cues_into_segments():
+    """Breaks, pace, emphasis and markers become typed segments; no tag is left in the text"""
+    segments = parse_cues("Welcome back! [break:1.5s]\n[slow]Zero trust[/slow] means [emph]never[/emph] trust.\n[checkpoint]")
+    assert segments == [
+        Speech("Welcome back! "),
+        Pause(1.5),
+        Speech("Zero trust", slow=True),
+        Speech(" means "),
+        Speech("never", emphasis=True),
+        Speech(" trust.\n"),
+        Marker("checkpoint"),
+    ]
+
+
+def test_parser_handles_tags_split_across_chunks():
+    """A tag streamed in pieces is still recognised, and ordinary brackets pass through"""
+    parser = CueParser()
+    segments = []
+    for chunk in ["Let's pause [bre", "ak:2", "s] then see [Figure 1", "] now", " [silence:99s]"]:
+        segments += parser.feed(chunk)
+    segments += parser.close()
+
+    assert Pause(2.0) in segments and Pause(MAX_PAUSE) in segments
+    spoken = "".join(s.text for s in segments if isinstance(s, Speech))
+    assert spoken == "Let's pause  then see [Figure 1] now"
+
+
+def test_render_cues_streams_runs_and_plays_silence():
+    """Speech at one pace is one synthesis call; pauses never reach the synthesizer"""
+    calls = []
+
+    async def synthesize(text, slow):
+        pieces = [piece async for piece in text]
+        calls.append(("".join(pieces), slow))
+        yield f"audio:{''.join(pieces).strip()}"
+
+    async def silence(seconds):
+        yield f"silence:{seconds}"
+
+    async def chunks():
+        for chunk in ["Good morning", " everyone! [break:2s] [slow]CIA", "[/slow] triad. [recap]"]:
+            yield chunk
+
+    async def run():
+        return [frame async for frame in render_cues(chunks(), synthesize, silence)]
+
+    frames = asyncio.run(run())
+    assert frames == ["audio:Good morning everyone!", "silence:2.0", "audio:CIA", "audio:triad.", "silence:0.4"]
+    assert calls[1] == ("CIA", True)
+    assert all("[" not in text for text, _ in calls)
+
+
+def test_spoken_text_strips_tags_from_a_stream():
+    """Transcripts never show cue tags, even when a tag is split across deltas"""
+    from voice_cues import spoken_text
+
+    async def deltas():
+        for delta in ["Good morning! [sil", "ence:1s] Let's ", "[emph]begin[/emph]."]:
+            yield delta
+
+    async def run():
+        return "".join([delta async for delta in spoken_text(deltas())])
+
+    assert asyncio.run(run()) == "Good morning! Let's begin."
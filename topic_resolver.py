@@ -0,0 +1,208 @@
+"""
+Topic Resolver
+==============
+Maps what a student (or the LLM, relaying speech-to-text) says to a domain and
+topic key in ALL_DOMAINS.
+
+The resolver is compiled once from the knowledge base plus an alias table:
+- an exact index of normalized phrases ("domain three", "security architecture",
+  "zero trust", "zta")
+- a trigram index over the same phrases for near misses and STT mishearings
+  ("zero trussed", "crypto graphy", "domain tree")
+
+Lookups are a dict hit in the common case and a few hundred set operations in
+the worst, well under a millisecond.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Spoken forms of domain numbers, including common STT mishearings.
+# Only applied right after the word "domain" so "introduction to" stays intact.
+NUMBER_WORDS = {
+    "one": "1", "won": "1", "first": "1",
+    "two": "2", "to": "2", "too": "2", "second": "2",
+    "three": "3", "tree": "3", "free": "3", "third": "3",
+    "four": "4", "for": "4", "fore": "4", "fourth": "4",
+    "five": "5", "fifth": "5",
+}
+
+# Filler words that never distinguish one topic from another
+STOPWORDS = {"the", "a", "an", "on", "about", "of", "topic", "lesson", "and", "in", "please"}
+
+# Extra ways students refer to topics, beyond the topic key and description
+TOPIC_ALIASES = {
+    ("domain_1", "security_controls"): ["controls", "control types", "compensating controls"],
+    ("domain_1", "fundamental_concepts"): ["cia triad", "cia", "aaa", "non repudiation"],
+    ("domain_1", "zero_trust"): ["zta", "zero trust architecture", "never trust always verify"],
+    ("domain_1", "physical_security"): ["physical", "bollards", "access vestibule"],
+    ("domain_1", "deception_technology"): ["deception", "honeypots", "honeypot", "honeynet"],
+    ("domain_1", "change_management"): ["change control"],
+    ("domain_1", "cryptography"): ["crypto", "encryption", "pki", "hashing", "certificates"],
+    ("domain_2", "threat_actors"): ["hackers", "apt", "nation state", "insider threat"],
+    ("domain_2", "threat_vectors"): ["attack vectors", "attack surface", "supply chain"],
+    ("domain_2", "social_engineering"): ["phishing", "vishing", "pretexting"],
+    ("domain_2", "vulnerabilities"): ["vulns", "zero day", "buffer overflow"],
+    ("domain_2", "malicious_activity"): ["malware", "attacks", "indicators of compromise", "ioc", "ransomware"],
+    ("domain_2", "mitigation_techniques"): ["mitigations", "segmentation"],
+    ("domain_3", "architecture_models"): ["cloud", "iot", "ics", "scada", "containers"],
+    ("domain_3", "enterprise_infrastructure"): ["firewalls", "network security", "network appliances"],
+    ("domain_3", "data_protection"): ["data classification", "dlp", "data states"],
+    ("domain_3", "resilience_recovery"): ["disaster recovery", "backups", "high availability", "dr"],
+    ("domain_4", "security_techniques"): ["hardening", "wireless security", "secure baselines"],
+    ("domain_4", "asset_management"): ["assets", "inventory"],
+    ("domain_4", "vulnerability_management"): ["vuln management", "patching", "cvss"],
+    ("domain_4", "security_alerting_monitoring"): ["monitoring", "alerting", "siem"],
+    ("domain_4", "identity_access_management"): ["iam", "mfa", "sso", "access control", "identity management"],
+    ("domain_4", "modifying_enterprise_capabilities"): ["incident response", "automation", "orchestration", "soar"],
+    ("domain_4", "data_sources"): ["logs", "log analysis", "packet captures"],
+    ("domain_5", "security_governance"): ["governance", "policies"],
+    ("domain_5", "risk_management"): ["risk", "bia", "business impact analysis"],
+    ("domain_5", "third_party_risk"): ["vendor risk", "vendor management", "third party"],
+    ("domain_5", "compliance"): ["regulations", "regulatory compliance"],
+    ("domain_5", "audits_assessments"): ["audits", "penetration testing", "pen testing", "pentest"],
+    ("domain_5", "security_awareness"): ["awareness training", "training"],
+}
+
+
+class TopicMatch(NamedTuple):
+    domain: str
+    topic: str
+    score: float
+
+
+def normalize(text: str) -> str:
+    """Lowercase, split words/numbers apart, spell out domain numbers and drop filler words."""
+    text = (text or "").lower().replace("_", " ")
+    text = re.sub(r"(?<=[a-z])(?=\d)|(?<=\d)(?=[a-z])", " ", text)
+    words = re.findall(r"[a-z0-9]+", text)
+    for i in range(1, len(words)):
+        if words[i - 1] == "domain" and words[i] in NUMBER_WORDS:
+            words[i] = NUMBER_WORDS[words[i]]
+    return " ".join(w for w in words if w not in STOPWORDS)
+
+
+def _trigrams(phrase: str) -> frozenset:
+    # Spaces are dropped so "crypto graphy" and "cryptography" share every trigram
+    packed = f"  {phrase.replace(' ', '')} "
+    return frozenset(packed[i:i + 3] for i in range(len(packed) - 2))
+
+
+class _PhraseIndex:
+    """Exact and trigram lookup from normalized phrases to targets."""
+
+    def __init__(self):
+        self.exact: Dict[str, List[tuple]] = defaultdict(list)
+        self.phrases: List[Tuple[frozenset, tuple]] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+
+    def add(self, phrase: str, target: tuple) -> None:
+        key = normalize(phrase).replace(" ", "")
+        if not key or target in self.exact[key]:
+            return
+        self.exact[key].append(target)
+        grams = _trigrams(key)
+        index = len(self.phrases)
+        self.phrases.append((grams, target))
+        for gram in grams:
+            self.postings[gram].append(index)
+
+    def lookup(self, text: str, min_score: float) -> List[Tuple[float, tuple]]:
+        """Return (score, target) candidates, best first. Exact hits score 1.0."""
+        key = normalize(text).replace(" ", "")
+        if not key:
+            return []
+        if key in self.exact:
+            return [(1.0, target) for target in self.exact[key]]
+
+        grams = _trigrams(key)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for index in self.postings.get(gram, ()):
+                shared[index] += 1
+
+        # Dice coefficient on trigram sets; keep the best score per target
+        best: Dict[tuple, float] = {}
+        for index, common in shared.items():
+            phrase_grams, target = self.phrases[index]
+            score = 2 * common / (len(grams) + len(phrase_grams))
+            if score >= min_score and score > best.get(target, 0):
+                best[target] = score
+        return sorted(((score, target) for target, score in best.items()), reverse=True)
+
+
+class TopicResolver:
+    """Resolve free-form domain and topic names against the knowledge base.
+
+    Args:
+        domains: Knowledge base in the ALL_DOMAINS shape
+        aliases: Extra phrases per (domain, topic)
+        min_score: Minimum trigram similarity for a fuzzy match
+    """
+
+    def __init__(self, domains: dict, aliases: Optional[dict] = None, min_score: float = 0.5):
+        self.min_score = min_score
+        self._domains = _PhraseIndex()
+        self._topics = _PhraseIndex()
+
+        for domain_id, domain_data in domains.items():
+            number = domain_id.rsplit("_", 1)[-1]
+            for phrase in (domain_id, f"d{number}", number, domain_data["name"]):
+                self._domains.add(phrase, (domain_id,))
+            for topic_key, topic_data in domain_data["topics"].items():
+                target = (domain_id, topic_key)
+                self._topics.add(topic_key, target)
+                self._topics.add(topic_data.get("description", ""), target)
+
+        for target, phrases in (aliases if aliases is not None else TOPIC_ALIASES).items():
+            if target[0] in domains and target[1] in domains[target[0]]["topics"]:
+                for phrase in phrases:
+                    self._topics.add(phrase, target)
+
+    def resolve_domain(self, text: str, via_topics: bool = True) -> Optional[str]:
+        """Resolve a domain reference ("domain three", "security architecture", "d3").
+
+        With ``via_topics``, a topic name resolves to the domain that holds it,
+        since students often name a topic when asked for a domain ("zero trust").
+        """
+        candidates = self._domains.lookup(text, self.min_score)
+        if candidates:
+            return candidates[0][1][0]
+        if not via_topics:
+            return None
+        match = self.resolve_topic(text)
+        return match.domain if match else None
+
+    def resolve_topic(self, text: str, domain: Optional[str] = None) -> Optional[TopicMatch]:
+        """Resolve a topic reference, preferring topics in ``domain`` when it is given.
+
+        A topic that clearly belongs to another domain still resolves there, so a
+        wrong domain guess does not cost another round-trip.
+        """
+        candidates = self._topics.lookup(text, self.min_score)
+        if not candidates:
+            return None
+
+        domain_id = self.resolve_domain(domain, via_topics=False) if domain else None
+        best_score, best_target = candidates[0]
+        if domain_id:
+            for score, target in candidates:
+                # Near ties go to the domain the caller asked about
+                if target[0] == domain_id and score >= best_score - 0.1:
+                    best_score, best_target = score, target
+                    break
+        return TopicMatch(best_target[0], best_target[1], best_score)
+
+
+_default_resolver: Optional[TopicResolver] = None
+
+
+def default_resolver() -> TopicResolver:
+    """Process-wide resolver compiled from the knowledge base on first use."""
+    global _default_resolver
+    if _default_resolver is None:
+        from kb_snapshot import default_content
+
+        _default_resolver = TopicResolver(default_content().domains)
+    return _default_resolver
@@ -0,0 +1,283 @@
+"""
+TTS Audio Cache
+===============
+Content-addressed, on-disk cache of synthesized speech shared by every job
+process on a host.
+
+Scripted lessons and quiz questions are spoken with identical text for
+thousands of students; only that known text is cached, never free-form LLM
+replies. Each chunk's audio is stored under the SHA-256 of (text, provider,
+model, voice, speed, sample rate, channels), so repeated content costs no TTS
+request and starts playing from local disk.
+
+Layout: ``<root>/<key[:2]>/<key>.pcm``, a small header followed by raw 16-bit
+PCM. An entry's audio is buffered in memory while it is synthesized, then
+written to a temporary file and renamed into place, so readers in other
+processes only ever see complete audio; a sentence interrupted mid-synthesis is
+discarded, never cached. The cache is bounded by size: hits refresh a file's
+recency, and when the total passes ``max_bytes`` the least recently used files
+are removed down to EVICT_TO of the budget. The size and LRU order are kept in
+memory as entries are added, with a directory rescan every RESCAN_SECONDS to
+pick up other processes' entries.
+
+Disk work never runs on the audio event loop: ``stream_frames`` reads a hit
+READ_FRAMES frames at a time on a worker thread while earlier frames play, and
+``async with entry(...)`` writes, renames and evicts on one.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, BinaryIO, Iterator, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "tts_cache"
+DEFAULT_MAX_MB = 512
+# Eviction removes files until the cache is this fraction of max_bytes
+EVICT_TO = 0.9
+# How often a process rescans the directory for entries other processes added
+RESCAN_SECONDS = 600
+
+# Frames read from disk at a time when streaming a hit
+READ_FRAMES = 25
+
+HEADER = struct.Struct("<4sIH")
+MAGIC = b"TTSC"
+
+
+class Voice(NamedTuple):
+    """Everything besides the text that changes how speech sounds."""
+
+    provider: str
+    model: str
+    voice: str
+    speed: float = 1.0
+
+
+def cache_key(text: str, voice: Voice, sample_rate: int, num_channels: int) -> str:
+    """Content address for a piece of speech; whitespace differences do not matter."""
+    normalized = " ".join(text.split())
+    material = "\x1f".join(
+        [normalized, voice.provider, voice.model, voice.voice, f"{voice.speed:g}", str(sample_rate), str(num_channels)]
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    """Buffers one entry's audio in memory and publishes it atomically on commit.
+
+    Use ``async with`` on the event loop: the file is written, renamed into
+    place and the budget enforced on a worker thread. Plain ``with`` does the
+    same on the calling thread.
+    """
+
+    def __init__(self, cache: "TTSAudioCache", key: str, sample_rate: int, num_channels: int):
+        self._cache = cache
+        self._key = key
+        self._header = HEADER.pack(MAGIC, sample_rate, num_channels)
+        self._pcm = bytearray()
+
+    def write(self, pcm: bytes) -> None:
+        self._pcm += pcm
+
+    def __enter__(self) -> "_Entry":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Interrupted or failed synthesis is never published, and neither is empty audio
+        if exc_type is None and self._pcm:
+            self._cache._publish(self._key, self._header, bytes(self._pcm))
+
+    async def __aenter__(self) -> "_Entry":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None and self._pcm:
+            await asyncio.to_thread(self._cache._publish, self._key, self._header, bytes(self._pcm))
+
+
+class TTSAudioCache:
+    """Size-bounded, content-addressed store of PCM speech.
+
+    Args:
+        root: Cache directory (defaults to $TTS_CACHE_DIR or ./tts_cache)
+        max_bytes: Size budget (defaults to $TTS_CACHE_MAX_MB megabytes)
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = root or os.getenv("TTS_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("TTS_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 2**20)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Entries in least to most recently used order, with their sizes, and their
+        # total; built by one directory scan, then kept up to date as entries are
+        # added, hit and evicted
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._size = 0
+        self._scanned = 0.0
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.pcm")
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self.path_for(key))
+
+    def reader(self, key: str) -> Optional[BinaryIO]:
+        """A cached entry's file positioned at its audio, or None on a miss.
+
+        Refreshes the entry's recency. Blocking; on the event loop use
+        ``stream_frames``.
+        """
+        path = self.path_for(key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size or HEADER.unpack(header)[0] != MAGIC:
+            f.close()
+            return None
+        try:
+            # Refresh recency for LRU eviction, here and in other processes' scans
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            if self._index is not None and path in self._index:
+                self._index.move_to_end(path)
+        return f
+
+    def frames(self, key: str, frame_bytes: int) -> Optional[Iterator[bytes]]:
+        """A cached entry's audio read ``frame_bytes`` at a time, or None on a miss. Blocking."""
+        f = self.reader(key)
+        if f is None:
+            return None
+        return _pieces(f, frame_bytes)
+
+    async def stream_frames(self, key: str, frame_bytes: int) -> Optional[AsyncIterator[bytes]]:
+        """A cached entry's audio in ``frame_bytes`` pieces, or None on a miss.
+
+        The file is opened and read READ_FRAMES frames at a time on a worker
+        thread, so the first frame plays after one short read and playback
+        never blocks on disk. An entry evicted mid-playback still plays to the
+        end from the open file.
+        """
+        f = await asyncio.to_thread(self.reader, key)
+        if f is None:
+            return None
+        return _stream(f, frame_bytes)
+
+    def entry(self, key: str, sample_rate: int, num_channels: int) -> _Entry:
+        """Context manager that records audio for ``key``; published only if the block completes."""
+        return _Entry(self, key, sample_rate, num_channels)
+
+    def _publish(self, key: str, header: bytes, pcm: bytes) -> None:
+        path = self.path_for(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(pcm)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._added(path, len(header) + len(pcm))
+
+    def _added(self, path: str, size: int) -> None:
+        with self._lock:
+            index = self._load_index()
+            self._size += size - index.pop(path, 0)
+            index[path] = size
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        # Other processes add entries too; pick them up with an occasional rescan
+        if self._index is None or time.monotonic() - self._scanned > RESCAN_SECONDS:
+            files = sorted(self._scan())
+            self._index = OrderedDict((path, size) for _, size, path in files)
+            self._size = sum(self._index.values())
+            self._scanned = time.monotonic()
+        return self._index
+
+    def _scan(self):
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".pcm"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime_ns, stat.st_size, entry.path
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache is under budget; returns bytes freed.
+
+        Blocking; it runs on the worker thread that published the entry which
+        crossed the budget.
+        """
+        with self._lock:
+            index = self._load_index()
+            target = int(self.max_bytes * EVICT_TO)
+            freed = 0
+            while index and self._size > target:
+                path, size = index.popitem(last=False)
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                self._size -= size
+                freed += size
+        if freed:
+            logger.info("Evicted %d bytes from the TTS cache at %s", freed, self.root)
+        return freed
+
+
+def _pieces(f: BinaryIO, frame_bytes: int) -> Iterator[bytes]:
+    with f:
+        while True:
+            data = f.read(frame_bytes)
+            if not data:
+                return
+            yield data
+
+
+async def _stream(f: BinaryIO, frame_bytes: int) -> AsyncIterator[bytes]:
+    try:
+        while True:
+            data = await asyncio.to_thread(f.read, frame_bytes * READ_FRAMES)
+            for i in range(0, len(data), frame_bytes):
+                yield data[i:i + frame_bytes]
+            if len(data) < frame_bytes * READ_FRAMES:
+                return
+    finally:
+        f.close()
+
+
+_default_cache: Optional[TTSAudioCache] = None
+
+
+def default_tts_cache() -> Optional[TTSAudioCache]:
+    """Process-wide cache, or None when disabled with TTS_CACHE=off."""
+    global _default_cache
+    if os.getenv("TTS_CACHE", "on").lower() in ("off", "0", "false"):
+        return None
+    if _default_cache is None:
+        _default_cache = TTSAudioCache()
+    return _default_cache
@@ -0,0 +1,239 @@
+"""
+TTS Chunker
+===========
+Splits speech into chunks that get the first word out fast and keep the
+speaker busy after that, and synthesizes the next chunk while the current one
+plays.
+
+A long tool-driven answer (teach_lesson, explain_topic) used to reach the TTS
+as sentence after sentence, each synthesized only once the one before had
+finished playing: the student waited for a full sentence before the first
+word, then heard a gap at every sentence while the next one was synthesized.
+
+``TextChunker`` makes the first chunk short, cutting a long first sentence at a
+clause break (", ", "; ", ": ") as soon as one arrives, then lets each
+following chunk grow by CHUNK_GROWTH up to MAX_CHUNK_CHARS. Chunks always end
+at a sentence or line end after the first, and never span a voice cue, because
+render_cues hands each run of speech between cues to synthesis separately.
+``pipeline`` starts synthesizing up to ``lookahead`` chunks ahead of playback.
+
+Chunking depends only on the text, never on how it arrived, so the same lesson
+always produces the same chunks and keeps hitting the TTS cache.
+"""
+
+import asyncio
+import re
+from typing import AsyncIterable, AsyncIterator, Callable, List, NamedTuple, Optional, Tuple, TypeVar
+
+from lesson_playback import _last_boundary, split_sentences
+from voice_cues import Speech, parse_cues, ssml_text
+
+# The first chunk is cut at a clause break when its sentence is longer than this
+FIRST_CHUNK_CHARS = 60
+# ...but never before this many words, so the opening is not a fragment
+MIN_FIRST_WORDS = 4
+# Each later chunk may be this much longer than the one before, up to MAX_CHUNK_CHARS
+CHUNK_GROWTH = 2.0
+MAX_CHUNK_CHARS = 400
+# Chunks synthesized ahead of the one playing
+LOOKAHEAD = 1
+
+_CLAUSE_BREAK = re.compile(r"[,;:](?=\s)")
+
+T = TypeVar("T")
+
+
+def _split(text: str) -> List[str]:
+    # Lines end a unit too: headings and list items are spoken as their own phrases
+    return [sentence for line in text.splitlines() for sentence in split_sentences(line)]
+
+
+class TextChunker:
+    """Incremental text to chunk grouping: a short first chunk, then progressively larger ones."""
+
+    def __init__(
+        self,
+        first_chars: int = FIRST_CHUNK_CHARS,
+        max_chars: int = MAX_CHUNK_CHARS,
+        growth: float = CHUNK_GROWTH,
+    ):
+        self._buffer = ""
+        self._sentences: List[str] = []
+        self._first_chars = first_chars
+        self._max_chars = max_chars
+        self._growth = growth
+        self._budget: Optional[float] = None
+
+    def feed(self, text: str) -> List[str]:
+        """Take the next piece of text; returns the chunks it completes."""
+        self._buffer += text
+        end = max(_last_boundary(self._buffer), self._buffer.rfind("\n") + 1)
+        if end:
+            self._sentences += _split(self._buffer[:end])
+            self._buffer = self._buffer[end:]
+        elif self._budget is None:
+            # No sentence yet: a long opening can still start at its first clause
+            text = " ".join(self._buffer.split())
+            head = self._clause_head(text)
+            if head:
+                self._buffer = text[len(head):] + (" " if self._buffer[-1:].isspace() else "")
+                return [self._emit(head)]
+        return self._drain(final=False)
+
+    def close(self) -> List[str]:
+        """Flush everything left at the end of the stream."""
+        self._sentences += _split(self._buffer)
+        self._buffer = ""
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> List[str]:
+        chunks = []
+        while self._sentences:
+            if self._budget is None:
+                sentence = self._sentences[0]
+                head = self._clause_head(sentence)
+                if head and sentence[len(head):].strip():
+                    self._sentences[0] = sentence[len(head):].strip()
+                    chunks.append(self._emit(head))
+                else:
+                    chunks.append(self._emit(self._sentences.pop(0)))
+                continue
+
+            # Take whole sentences while they fit; one long sentence is a chunk by itself
+            count, size = 1, len(self._sentences[0])
+            while count < len(self._sentences) and size + 1 + len(self._sentences[count]) <= self._budget:
+                size += 1 + len(self._sentences[count])
+                count += 1
+            if count == len(self._sentences) and size < self._budget and not final:
+                # Still room: wait for more text unless the stream has ended
+                break
+            chunks.append(self._emit(" ".join(self._sentences[:count])))
+            del self._sentences[:count]
+        return chunks
+
+    def _clause_head(self, text: str) -> Optional[str]:
+        """Opening clause of a long first sentence, or None to keep the sentence whole.
+
+        The last clause break within FIRST_CHUNK_CHARS wins, else the first one
+        after it. ``text`` may be a sentence still arriving: once it is longer
+        than FIRST_CHUNK_CHARS both choices are already final.
+        """
+        if len(text) <= self._first_chars:
+            return None
+        head = None
+        for match in _CLAUSE_BREAK.finditer(text):
+            if len(text[:match.end()].split()) < MIN_FIRST_WORDS:
+                continue
+            if head is not None and match.end() > self._first_chars:
+                break
+            head = text[:match.end()]
+            if match.end() > self._first_chars:
+                break
+        return head
+
+    def _emit(self, chunk: str) -> str:
+        self._budget = self._first_chars if self._budget is None else self._budget
+        self._budget = min(self._budget * self._growth, self._max_chars)
+        return chunk
+
+
+async def chunk_stream(chunks: AsyncIterable[str], chunker: Optional[TextChunker] = None) -> AsyncIterator[str]:
+    """Regroup a text stream into TTS chunks as the text arrives."""
+    chunker = chunker or TextChunker()
+    async for text in chunks:
+        for chunk in chunker.feed(text):
+            yield chunk
+    for chunk in chunker.close():
+        yield chunk
+
+
+def plan_chunks(text: str, ssml: bool = False) -> List[Tuple[str, bool]]:
+    """The (chunk, slow) pieces tts_node will synthesize for cue-tagged ``text``, in order.
+
+    Mirrors render_cues: each run of speech at one pace between cues is
+    chunked on its own.
+    """
+    plan: List[Tuple[str, bool]] = []
+    run: List[str] = []
+    slow = False
+
+    def flush():
+        chunker = TextChunker()
+        plan.extend((chunk, slow) for chunk in chunker.feed("".join(run)) + chunker.close())
+        run.clear()
+
+    for segment in parse_cues(text):
+        if isinstance(segment, Speech) and (not run or segment.slow == slow):
+            run.append(ssml_text(segment, ssml))
+            slow = segment.slow
+            continue
+        flush()
+        if isinstance(segment, Speech):
+            run.append(ssml_text(segment, ssml))
+            slow = segment.slow
+    flush()
+    return plan
+
+
+class _Failed(NamedTuple):
+    error: BaseException
+
+
+_END = object()
+
+
+async def pipeline(
+    chunks: AsyncIterable[str],
+    synthesize: Callable[[str], AsyncIterable[T]],
+    lookahead: int = LOOKAHEAD,
+) -> AsyncIterator[T]:
+    """Frames of ``synthesize(chunk)`` for each chunk in order, synthesizing ahead of playback.
+
+    While the frames of one chunk are being consumed, up to ``lookahead`` later
+    chunks are already synthesizing. Closing the iterator (an interruption)
+    cancels all of them.
+    """
+    ready: asyncio.Queue = asyncio.Queue(maxsize=max(1, lookahead))
+    tasks: List[asyncio.Task] = []
+
+    async def synth(text: str, frames: asyncio.Queue) -> None:
+        try:
+            async for frame in synthesize(text):
+                frames.put_nowait(frame)
+        except Exception as e:
+            frames.put_nowait(_Failed(e))
+            return
+        frames.put_nowait(_END)
+
+    async def feed() -> None:
+        try:
+            async for text in chunks:
+                frames: asyncio.Queue = asyncio.Queue()
+                # Waits here while ``lookahead`` chunks are already queued behind the one playing
+                await ready.put(frames)
+                tasks.append(asyncio.create_task(synth(text, frames)))
+        except Exception as e:
+            await ready.put(_Failed(e))
+            return
+        await ready.put(_END)
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while True:
+            frames = await ready.get()
+            if frames is _END:
+                return
+            if isinstance(frames, _Failed):
+                raise frames.error
+            while True:
+                frame = await frames.get()
+                if frame is _END:
+                    break
+                if isinstance(frame, _Failed):
+                    raise frame.error
+                yield frame
+    finally:
+        feeder.cancel()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(feeder, *tasks, return_exceptions=True)
@@ -0,0 +1,247 @@
+"""
+Voice Cues
+==========
+Parses the lesson cue language (see domains/LESSON_TEMPLATE.py and the agent
+instructions) out of text on its way to TTS, and executes it:
+
+- [break:Xs] / [silence:Xs]: real silence of X seconds
+- [slow]...[/slow]: spoken at SLOW_SPEED
+- [emph]...[/emph]: SSML emphasis on providers that take SSML, plain speech elsewhere
+- [checkpoint], [exam], [recap]: section markers, played as a short pause
+  ([checkpoint] with a chime first)
+
+Cue tags never reach the synthesizer. ``CueParser`` is incremental: it takes
+text in whatever pieces the LLM streams it, holds back only a possibly
+unfinished tag, and emits typed segments. ``render_cues`` turns those segments
+into audio with two callbacks (synthesize text, produce silence), so it works
+with any TTS and is testable without one.
+"""
+
+import re
+from typing import AsyncIterable, AsyncIterator, Callable, List, NamedTuple, Optional, Union
+
+# Speaking rate inside [slow]...[/slow]
+SLOW_SPEED = 0.85
+# Pause played for a bare [break] and for section markers
+DEFAULT_BREAK = 1.0
+MARKER_PAUSES = {"checkpoint": 1.0, "exam": 0.4, "recap": 0.4}
+# Markers that also play an earcon (see audio_clips.py) before their pause
+MARKER_EARCONS = {"checkpoint": "checkpoint"}
+# Longest pause a cue can ask for, so a typo cannot stall a session
+MAX_PAUSE = 10.0
+# Providers whose synthesizers accept SSML markup
+SSML_PROVIDERS = ("azure", "google")
+
+_CUE = re.compile(
+    r"\[(/?)(break|silence|emph|slow|checkpoint|exam|recap)(?::\s*(\d+(?:\.\d+)?)\s*s?)?\]",
+    re.IGNORECASE,
+)
+# Longest possible tag, used to decide whether a trailing "[" may still become one
+_MAX_TAG = len("[checkpoint]") + 8
+
+
+class Speech(NamedTuple):
+    text: str
+    slow: bool = False
+    emphasis: bool = False
+
+
+class Pause(NamedTuple):
+    seconds: float
+
+
+class Marker(NamedTuple):
+    kind: str
+
+
+Segment = Union[Speech, Pause, Marker]
+
+
+class CueParser:
+    """Incremental parser from cue-tagged text to segments."""
+
+    def __init__(self):
+        self._buffer = ""
+        self._slow = False
+        self._emphasis = False
+
+    def feed(self, text: str) -> List[Segment]:
+        """Parse the next piece of text; returns the segments it completes."""
+        self._buffer += text
+        segments: List[Segment] = []
+        start = 0
+        for match in _CUE.finditer(self._buffer):
+            self._speech(self._buffer[start:match.start()], segments, at_cue=True)
+            self._cue(match, segments)
+            start = match.end()
+
+        rest = self._buffer[start:]
+        # Hold back a trailing "[..." that may be the start of a tag split across pieces
+        bracket = rest.rfind("[")
+        if bracket != -1 and "]" not in rest[bracket:] and len(rest) - bracket < _MAX_TAG:
+            self._buffer = rest[bracket:]
+            rest = rest[:bracket]
+        else:
+            self._buffer = ""
+        self._speech(rest, segments, at_cue=False)
+        return segments
+
+    def close(self) -> List[Segment]:
+        """Flush held-back text at the end of the stream."""
+        segments: List[Segment] = []
+        self._speech(self._buffer, segments, at_cue=True)
+        self._buffer = ""
+        return segments
+
+    def _speech(self, text: str, segments: List[Segment], at_cue: bool) -> None:
+        # Whitespace next to a tag is layout, not speech; elsewhere it joins streamed words
+        if text and (text.strip() or not at_cue):
+            segments.append(Speech(text, self._slow, self._emphasis))
+
+    def _cue(self, match, segments: List[Segment]) -> None:
+        closing, name, seconds = match.group(1), match.group(2).lower(), match.group(3)
+        if name in ("break", "silence"):
+            pause = float(seconds) if seconds else DEFAULT_BREAK
+            segments.append(Pause(min(pause, MAX_PAUSE)))
+        elif name == "slow":
+            self._slow = not closing
+        elif name == "emph":
+            self._emphasis = not closing
+        elif not closing:
+            segments.append(Marker(name))
+
+
+def parse_cues(text: str) -> List[Segment]:
+    """Parse a complete piece of text into segments."""
+    parser = CueParser()
+    return parser.feed(text) + parser.close()
+
+
+async def parse_stream(chunks: AsyncIterable[str]) -> AsyncIterator[Segment]:
+    """Parse a text stream into segments as the text arrives."""
+    parser = CueParser()
+    async for chunk in chunks:
+        for segment in parser.feed(chunk):
+            yield segment
+    for segment in parser.close():
+        yield segment
+
+
+async def spoken_text(chunks: AsyncIterable[str]) -> AsyncIterator[str]:
+    """A text stream with cue tags removed, for live transcripts."""
+    parser = CueParser()
+    after_space = True
+
+    def speech(segments):
+        nonlocal after_space
+        text = "".join(s.text for s in segments if isinstance(s, Speech))
+        # A removed tag leaves the spaces on both sides; keep only one
+        if after_space:
+            text = text.lstrip(" ")
+        if text:
+            after_space = text[-1].isspace()
+        return text
+
+    async for chunk in chunks:
+        text = speech(parser.feed(chunk))
+        if text:
+            yield text
+    text = speech(parser.close())
+    if text:
+        yield text
+
+
+def ssml_text(segment: Speech, ssml: bool) -> str:
+    """The text to synthesize for a speech segment, with SSML emphasis when supported."""
+    if ssml and segment.emphasis and segment.text.strip():
+        return f'<emphasis level="strong">{segment.text}</emphasis>'
+    return segment.text
+
+
+def supports_ssml(tts) -> bool:
+    """Whether a TTS object comes from a provider that accepts SSML."""
+    label = f"{getattr(tts, 'label', '')} {type(tts).__module__}".lower()
+    return any(provider in label for provider in SSML_PROVIDERS)
+
+
+def set_speed(tts, speed: float) -> bool:
+    """Change a TTS object's speaking rate if its provider supports it; returns whether it did."""
+    update = getattr(tts, "update_options", None)
+    if update is None:
+        return False
+    try:
+        update(speed=speed)
+    except TypeError:
+        return False
+    return True
+
+
+class _Peekable:
+    def __init__(self, iterator: AsyncIterator[Segment]):
+        self._iterator = iterator
+        self._next: Optional[Segment] = None
+        self._done = False
+
+    async def peek(self) -> Optional[Segment]:
+        if self._next is None and not self._done:
+            try:
+                self._next = await self._iterator.__anext__()
+            except StopAsyncIteration:
+                self._done = True
+        return self._next
+
+    def take(self) -> Optional[Segment]:
+        segment, self._next = self._next, None
+        return segment
+
+
+async def render_cues(
+    text: AsyncIterable[str],
+    synthesize: Callable[[AsyncIterable[str], bool], AsyncIterable],
+    silence: Callable[[float], AsyncIterable],
+    ssml: bool = False,
+    earcon: Optional[Callable[[str], AsyncIterable]] = None,
+) -> AsyncIterator:
+    """Turn cue-tagged text into audio frames.
+
+    Consecutive speech at the same pace is streamed into one ``synthesize(text,
+    slow)`` call, so synthesis starts before the run of speech has finished
+    arriving. Pauses and markers become ``silence(seconds)``, and markers with
+    an earcon play ``earcon(name)`` first when it is given.
+    """
+    segments = _Peekable(parse_stream(text).__aiter__())
+
+    while True:
+        segment = await segments.peek()
+        if segment is None:
+            return
+
+        if isinstance(segment, Speech):
+            slow = segment.slow
+            taken = 0
+
+            async def run_of_speech():
+                nonlocal taken
+                while True:
+                    nxt = await segments.peek()
+                    if not isinstance(nxt, Speech) or nxt.slow != slow:
+                        return
+                    segments.take()
+                    taken += 1
+                    yield ssml_text(nxt, ssml)
+
+            async for frame in synthesize(run_of_speech(), slow):
+                yield frame
+            if not taken:
+                # A synthesizer that read nothing must not see the same segment forever
+                segments.take()
+            continue
+
+        segments.take()
+        if isinstance(segment, Marker) and earcon is not None and segment.kind in MARKER_EARCONS:
+            async for frame in earcon(MARKER_EARCONS[segment.kind]):
+                yield frame
+        seconds = segment.seconds if isinstance(segment, Pause) else MARKER_PAUSES.get(segment.kind, 0)
+        if seconds:
+            async for frame in silence(seconds):
+                yield frame